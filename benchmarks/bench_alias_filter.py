@@ -0,0 +1,69 @@
+"""Alias Bloom filter: false-positive rate, memory and attribution of mostly unknown references.
+
+Run from the repository root with ``python -m benchmarks.bench_alias_filter``.
+"""
+
+from __future__ import annotations
+
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore
+from metaspn_entities.bloom import BloomFilter
+
+KNOWN = 50_000
+CLAIMS = 50_000
+UNKNOWN_SHARE = 0.9
+PROBES = 200_000
+
+
+def _filter_accuracy() -> None:
+    for capacity, error_rate in ((KNOWN, 0.01), (KNOWN, 0.001), (KNOWN * 2, 0.01)):
+        bloom = BloomFilter(capacity, error_rate)
+        bloom.update(("wallet_address", f"0xknown{i}") for i in range(KNOWN))
+        false_positives = sum(("wallet_address", f"0xunknown{i}") in bloom for i in range(PROBES))
+        print(
+            f"capacity {capacity:>7} target {error_rate:<6} measured fp {false_positives / PROBES:.4f}  "
+            f"estimated {bloom.estimated_false_positive_rate():.4f}  "
+            f"{bloom.size_bytes / 1024:>7.1f} KiB  {bloom.size_bytes * 8 / KNOWN:.1f} bits/key  k={bloom.hash_count}"
+        )
+
+
+def _attribution(path: str, claims: list) -> None:
+    for label, alias_filter in (("no filter", False), ("bloom", True)):
+        store = SQLiteEntityStore(path, alias_filter=alias_filter)
+        resolver = EntityResolver(store)
+        statements = []
+        store.conn.set_trace_callback(statements.append)
+        start = time.perf_counter()
+        for wallet in claims:
+            resolver.attribute_outcome({"wallet_address": wallet})
+        elapsed = time.perf_counter() - start
+        store.conn.set_trace_callback(None)
+        line = f"{label:<10} {CLAIMS / elapsed:>9.0f} claims/s  {len(statements) / CLAIMS:.2f} statements/claim"
+        stats = store.alias_filter_stats()
+        if stats:
+            line += f"  skipped {stats['skipped_lookups']}  filter {stats['bytes'] / 1024:.0f} KiB"
+        print(line)
+        store.close()
+
+
+def main() -> None:
+    _filter_accuracy()
+    rng = random.Random(11)
+    claims = [
+        f"0xunknown{rng.randrange(10**9)}" if rng.random() < UNKNOWN_SHARE else f"0xknown{rng.randrange(KNOWN)}"
+        for _ in range(CLAIMS)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "entities.db")
+        seed = SQLiteEntityStore(path)
+        EntityResolver(seed).resolve_many([("wallet_address", f"0xknown{i}", None) for i in range(KNOWN)])
+        seed.close()
+        _attribution(path, claims)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Per-call cost of entity alias lookups as the store grows.
+
+Run from the repository root with ``python -m benchmarks.bench_alias_lookup``.
+"""
+
+from __future__ import annotations
+
+import time
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore
+from metaspn_entities.models import utcnow_iso
+
+SIZES = (1_000, 10_000, 100_000)
+CALLS = 500
+
+
+def _fill(store: SQLiteEntityStore, count: int) -> None:
+    now = utcnow_iso()
+    store.conn.executemany(
+        "INSERT INTO entities(entity_id, entity_type, created_at, status) VALUES (?, 'person', ?, 'active')",
+        ((f"ent_fill_{i}", now) for i in range(count)),
+    )
+    store.conn.executemany(
+        "INSERT INTO identifiers(identifier_type, value, normalized_value, confidence, first_seen_at, last_seen_at, provenance) VALUES ('handle', ?, ?, 0.9, ?, ?, NULL)",
+        ((f"h{i}", f"h{i}", now, now) for i in range(count)),
+    )
+    store.conn.executemany(
+        "INSERT INTO aliases(identifier_type, normalized_value, entity_id, confidence, created_at, caused_by, provenance) VALUES ('handle', ?, ?, 0.9, ?, 'bench', NULL)",
+        ((f"h{i}", f"ent_fill_{i}", now) for i in range(count)),
+    )
+    store.conn.commit()
+
+
+def main() -> None:
+    print(f"{'aliases':>10} {'us/call':>10}")
+    for size in SIZES:
+        store = SQLiteEntityStore()
+        _fill(store, size)
+        resolver = EntityResolver(store)
+        a = resolver.resolve("twitter_handle", "bench_a")
+        b = resolver.resolve("twitter_handle", "bench_b")
+        resolver.merge_entities(a.entity_id, b.entity_id, reason="bench")
+
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            store.list_identifier_records_for_entity(a.entity_id)
+        elapsed = time.perf_counter() - start
+        print(f"{size:>10} {elapsed / CALLS * 1e6:>10.1f}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
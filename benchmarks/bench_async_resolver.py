@@ -0,0 +1,51 @@
+"""Thousands of concurrent ``resolve`` coroutines on the asyncio facade.
+
+Run from the repository root with ``python -m benchmarks.bench_async_resolver``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from metaspn_entities import AsyncEntityResolver, EntityResolver, SQLiteEntityStore
+
+COROUTINES = 5_000
+DISTINCT = 1_000
+
+
+async def _run(db_path: str) -> None:
+    rng = random.Random(11)
+    handles = [f"user_{rng.randrange(DISTINCT)}" for _ in range(COROUTINES)]
+    store = SQLiteEntityStore(db_path, wal=True, reader_pool_size=4)
+    async with AsyncEntityResolver(EntityResolver(store)) as resolver:
+        loop_lag = []
+
+        async def heartbeat() -> None:
+            while True:
+                tick = time.perf_counter()
+                await asyncio.sleep(0.01)
+                loop_lag.append(time.perf_counter() - tick - 0.01)
+
+        monitor = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        await asyncio.gather(*(resolver.resolve("twitter_handle", handle) for handle in handles))
+        elapsed = time.perf_counter() - start
+        monitor.cancel()
+
+        print(f"{COROUTINES} coroutines in {elapsed:.2f}s ({COROUTINES / elapsed:.0f} resolves/s)")
+        print(f"coalesced into in-flight requests: {resolver.coalesced}")
+        print(f"max event loop lag: {max(loop_lag, default=0.0) * 1000:.1f} ms")
+    store.close()
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(_run(str(Path(tmp) / "bench.db")))
+
+
+if __name__ == "__main__":
+    main()
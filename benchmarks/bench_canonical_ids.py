@@ -0,0 +1,35 @@
+"""Canonical id lookup latency after long auto-merge chains.
+
+Run from the repository root with ``python -m benchmarks.bench_canonical_ids``.
+"""
+
+from __future__ import annotations
+
+import time
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore
+
+CHAIN_LENGTH = 500
+LOOKUPS = 20_000
+
+
+def main() -> None:
+    print(f"{'cache':>8} {'us/lookup':>10} {'hit_rate':>9}")
+    for cached in (False, True):
+        store = SQLiteEntityStore(canonical_cache=cached)
+        resolver = EntityResolver(store)
+        ids = [resolver.resolve("email", f"chain{i}@example.com").entity_id for i in range(CHAIN_LENGTH)]
+        for current, following in zip(ids, ids[1:]):
+            resolver.merge_entities(current, following, reason="bench")
+
+        start = time.perf_counter()
+        for i in range(LOOKUPS):
+            store.canonical_entity_id(ids[i % CHAIN_LENGTH])
+        elapsed = time.perf_counter() - start
+        stats = store.canonical_cache_stats()
+        print(f"{str(cached):>8} {elapsed / LOOKUPS * 1e6:>10.2f} {stats['hit_rate']:>9.3f}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Change-data capture: write overhead of the change log, and delta versus full snapshot replication.
+
+Run from the repository root with ``python -m benchmarks.bench_change_log``.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore
+
+SIGNALS = 50_000
+BATCH = 500
+INCREMENT = 1_000
+
+
+def _ingest(resolver: EntityResolver, start: int, stop: int) -> float:
+    began = time.perf_counter()
+    for offset in range(start, stop, BATCH):
+        resolver.resolve_many(
+            [("email", f"user{i}@example.com", None) for i in range(offset, min(offset + BATCH, stop))]
+        )
+        resolver.drain_events()
+    return time.perf_counter() - began
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for label, change_log in (("no change log", False), ("change log", True)):
+            store = SQLiteEntityStore(str(root / f"{label}.db"), wal=True, change_log=change_log)
+            elapsed = _ingest(EntityResolver(store), 0, SIGNALS)
+            print(f"{label:<14} resolve_many {SIGNALS / elapsed:>9.0f} signals/s")
+            store.close()
+
+        source = SQLiteEntityStore(str(root / "change log.db"), wal=True)
+        resolver = EntityResolver(source)
+        replica = SQLiteEntityStore(str(root / "replica.db"), wal=True)
+        start = time.perf_counter()
+        source.export_delta(str(root / "full.ndjson"))
+        checkpoint = replica.apply_delta(str(root / "full.ndjson"))
+        print(f"initial delta  {checkpoint:,} changes exported and applied in {time.perf_counter() - start:.2f}s")
+
+        _ingest(resolver, SIGNALS, SIGNALS + INCREMENT)
+        start = time.perf_counter()
+        report = source.export_delta(str(root / "delta.ndjson"), checkpoint)
+        checkpoint = replica.apply_delta(str(root / "delta.ndjson"))
+        delta = time.perf_counter() - start
+        start = time.perf_counter()
+        source.export_snapshot_stream(str(root / "snapshot.ndjson"))
+        rebuilt = SQLiteEntityStore(str(root / "rebuilt.db"), wal=True)
+        rebuilt.import_snapshot_stream(str(root / "snapshot.ndjson"))
+        full = time.perf_counter() - start
+        print(
+            f"after {INCREMENT:,} more signals: delta ({report['changes']:,} changes) {delta * 1000:.0f} ms, "
+            f"full snapshot export + import {full * 1000:.0f} ms"
+        )
+        assert checkpoint == source.latest_change_seq()
+        for store in (source, replica, rebuilt):
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Merge compaction: rows rewritten and alias lookup cost before and after.
+
+Loads clusters whose redirects form multi-hop chains (as written before merges
+flattened them) with every alias still owned by its original entity, then
+times the resolver's read path (``find_alias`` plus canonicalization, with the
+canonical cache off as for multi-writer deployments) around a full compaction.
+
+Run from the repository root with ``python -m benchmarks.bench_compaction``.
+"""
+
+from __future__ import annotations
+
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from metaspn_entities import SQLiteEntityStore
+
+CLUSTERS = 50_000
+CLUSTER_SIZE = 4
+LOOKUPS = 50_000
+TIMESTAMP = "2026-01-01T00:00:00+00:00"
+
+
+def _rows():
+    for cluster in range(CLUSTERS):
+        for member in range(CLUSTER_SIZE):
+            yield "entities", {
+                "entity_id": f"ent_{cluster}_{member}",
+                "entity_type": "person",
+                "created_at": TIMESTAMP,
+                "status": "active" if member == CLUSTER_SIZE - 1 else "merged",
+            }
+    for cluster in range(CLUSTERS):
+        for member in range(CLUSTER_SIZE):
+            yield "aliases", {
+                "identifier_type": "email",
+                "normalized_value": f"user{cluster}_{member}@example.com",
+                "entity_id": f"ent_{cluster}_{member}",
+                "confidence": 0.9,
+                "created_at": TIMESTAMP,
+                "caused_by": "bench",
+                "provenance": None,
+            }
+    merge_id = 0
+    for cluster in range(CLUSTERS):
+        for member in range(CLUSTER_SIZE - 1):
+            merge_id += 1
+            yield "merge_records", {
+                "merge_id": merge_id,
+                "from_entity_id": f"ent_{cluster}_{member}",
+                "to_entity_id": f"ent_{cluster}_{member + 1}",
+                "reason": "bench",
+                "timestamp": TIMESTAMP,
+                "caused_by": "bench",
+            }
+    for cluster in range(CLUSTERS):
+        for member in range(CLUSTER_SIZE - 1):
+            yield "entity_redirects", {
+                "from_entity_id": f"ent_{cluster}_{member}",
+                "to_entity_id": f"ent_{cluster}_{member + 1}",
+                "timestamp": TIMESTAMP,
+                "reason": "bench",
+                "caused_by": "bench",
+            }
+
+
+def _lookups(store: SQLiteEntityStore, keys) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        store.canonical_entity_id(store.find_alias(*key)["entity_id"])
+    return LOOKUPS / (time.perf_counter() - start)
+
+
+def main() -> None:
+    rng = random.Random(7)
+    keys = [
+        ("email", f"user{rng.randrange(CLUSTERS)}_{rng.randrange(CLUSTER_SIZE)}@example.com") for _ in range(LOOKUPS)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteEntityStore(str(Path(tmp) / "entities.db"), wal=True, canonical_cache=False)
+        store.load_snapshot_rows(_rows())
+        before = _lookups(store, keys)
+        report = store.compact(batch_size=1000)
+        after = _lookups(store, keys)
+        print(
+            f"compacted {report.entities_scanned:,} entities in {report.elapsed_seconds:.2f}s "
+            f"({report.transactions} transactions): {report.aliases_reassigned:,} aliases reassigned, "
+            f"{report.redirects_flattened:,} redirects flattened"
+        )
+        print(f"alias lookups  before {before:>9.0f}/s  after {after:>9.0f}/s  ({after / before:.2f}x)")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Ingest throughput and retained memory by event sink.
+
+An undrained resolver used to keep every event in a list; compare that with
+the bounded ring buffer, the batched JSONL file sink and a no-op callback.
+
+Run from the repository root with ``python -m benchmarks.bench_event_sinks``.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore
+from metaspn_entities.sinks import CallbackSink, JsonlFileSink, RingBufferSink, read_event_log
+
+SIGNALS = 100_000
+BATCH = 500
+
+
+def _run(label: str, sink) -> None:
+    resolver = EntityResolver(SQLiteEntityStore(), matched_identifiers="skip", event_sink=sink)
+    tracemalloc.start()
+    start = time.perf_counter()
+    for offset in range(0, SIGNALS, BATCH):
+        resolver.resolve_many([("email", f"user{i}@example.com", None) for i in range(offset, offset + BATCH)])
+    elapsed = time.perf_counter() - start
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    resolver.close()
+    resolver.store.close()
+    print(f"{label:<22} {SIGNALS / elapsed:>9.0f} signals/s  retained {retained / 2**20:>7.1f} MiB")
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "events.jsonl"
+        _run("unbounded (undrained)", RingBufferSink(SIGNALS * 2))
+        _run("ring buffer 10k", RingBufferSink(10_000))
+        _run("jsonl file", JsonlFileSink(path))
+        _run("callback (no-op)", CallbackSink(lambda events: None))
+        logged = sum(1 for _ in read_event_log(path))
+        print(f"jsonl file holds {logged:,} events ({path.stat().st_size / 2**20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Signal ingestion throughput: sequential adapter calls against ``SignalIngestPipeline`` worker processes.
+
+Each envelope carries an email, a handle and, for one person in five, the profile URL of another
+person's envelope, so partitions auto-merge into each other. Scaling needs as many free cores as
+worker processes.
+
+Run from the repository root with ``python -m benchmarks.bench_ingest_pipeline``.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore, resolve_normalized_social_signal
+from metaspn_entities.pipeline import SignalIngestPipeline
+from metaspn_entities.sinks import CallbackSink
+
+SIGNALS = 20_000
+BATCH = 5_000
+PROCESS_COUNTS = (1, 2, 4)
+SHARD_COUNT = 4
+
+
+def _envelope(i: int) -> dict:
+    # One in four signals repeats an earlier person.
+    person = i - i % 4 if i % 4 == 3 else i
+    payload = {"email": f"user{person}@example.com", "handle": f"@user{person}", "platform": "twitter"}
+    if person % 5 == 1:
+        payload["profile_url"] = f"https://example.com/u/{person - 1}"
+    elif person % 5 == 0:
+        payload = {"profile_url": f"https://example.com/u/{person}", "name": f"User {person}"}
+    return {"source": "bench", "payload": payload}
+
+
+def main() -> None:
+    envelopes = [_envelope(i) for i in range(SIGNALS)]
+    print(f"{os.cpu_count()} CPU(s)")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        store = SQLiteEntityStore(str(root / "sequential.db"), wal=True)
+        resolver = EntityResolver(store, matched_identifiers="skip", event_sink=CallbackSink(lambda events: None))
+        start = time.perf_counter()
+        for envelope in envelopes:
+            resolve_normalized_social_signal(resolver, envelope)
+        print(f"sequential adapter      {SIGNALS / (time.perf_counter() - start):>8.0f} signals/s")
+        store.close()
+
+        for shard_count in (None, SHARD_COUNT):
+            label = f"{shard_count} shards" if shard_count else "WAL file"
+            for processes in PROCESS_COUNTS:
+                path = str(root / f"{label}_{processes}".replace(" ", "_"))
+                pipeline = SignalIngestPipeline(path, processes=processes, shard_count=shard_count, batch_size=BATCH)
+                with pipeline:
+                    report = pipeline.run(envelopes)
+                print(
+                    f"{label:<9} {processes} process(es) {report.signals_per_second:>8.0f} signals/s "
+                    f"({report.merges} merges, {report.reconciled} reconciled, {report.lock_retries} lock retries)"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""File size and lookup latency of text entity ids versus integer surrogate keys.
+
+Builds one text-id store, copies it, converts the copy with
+``migrate_to_integer_keys`` and compares both files.
+
+Run from the repository root with ``python -m benchmarks.bench_integer_keys``.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore
+from metaspn_entities.migrations import migrate_to_integer_keys
+
+ENTITIES = 50_000
+BATCH = 1_000
+MERGED_SHARE = 0.1
+LOOKUPS = 20_000
+
+
+def _build(path: str) -> list:
+    store = SQLiteEntityStore(path)
+    resolver = EntityResolver(store)
+    entity_ids = []
+    for start in range(0, ENTITIES, BATCH):
+        with resolver.transaction():
+            for i in range(start, start + BATCH):
+                entity_id = resolver.resolve("twitter_handle", f"user_{i}").entity_id
+                resolver.add_alias(entity_id, "email", f"user_{i}@example.com")
+                entity_ids.append(entity_id)
+        resolver.drain_events()
+    rng = random.Random(5)
+    with resolver.transaction():
+        for i in rng.sample(range(1, ENTITIES), int(ENTITIES * MERGED_SHARE)):
+            if store.canonical_entity_id(entity_ids[i]) != store.canonical_entity_id(entity_ids[i - 1]):
+                resolver.merge_entities(entity_ids[i], entity_ids[i - 1], reason="bench")
+    store.close()
+    return entity_ids
+
+
+def _report(label: str, path: str, entity_ids: list) -> None:
+    store = SQLiteEntityStore(path, canonical_cache=False)
+    sizes = store.conn.execute(
+        "SELECT name, sum(pgsize) AS bytes FROM dbstat WHERE name NOT LIKE 'sqlite_%' "
+        "OR name LIKE 'sqlite_autoindex_%' GROUP BY name ORDER BY name"
+    ).fetchall()
+    print(f"{label}: file {os.path.getsize(path) / 1024:,.0f} KiB")
+    for row in sizes:
+        print(f"    {row['name']:<40} {row['bytes'] / 1024:>8,.0f} KiB")
+
+    rng = random.Random(9)
+    handles = [f"user_{rng.randrange(ENTITIES)}" for _ in range(LOOKUPS)]
+    sample = [entity_ids[rng.randrange(ENTITIES)] for _ in range(LOOKUPS)]
+    timings = {}
+    start = time.perf_counter()
+    for handle in handles:
+        store.find_alias("twitter_handle", handle)
+    timings["alias lookup"] = time.perf_counter() - start
+    start = time.perf_counter()
+    for entity_id in sample:
+        store.canonical_entity_id(entity_id)
+    timings["canonical id (uncached)"] = time.perf_counter() - start
+    start = time.perf_counter()
+    for entity_id in sample:
+        store.list_aliases_for_entity(entity_id)
+    timings["cluster aliases"] = time.perf_counter() - start
+    for name, elapsed in timings.items():
+        print(f"    {name:<28} {elapsed / LOOKUPS * 1e6:>7.1f} us/op")
+    store.close()
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path = str(Path(tmp) / "text_ids.db")
+        integer_path = str(Path(tmp) / "integer_keys.db")
+        entity_ids = _build(text_path)
+        # The migration vacuums; do the same to the baseline so sizes compare like for like.
+        conn = sqlite3.connect(text_path)
+        conn.execute("VACUUM")
+        conn.close()
+        shutil.copyfile(text_path, integer_path)
+        start = time.perf_counter()
+        migrate_to_integer_keys(integer_path)
+        print(f"migration {time.perf_counter() - start:.2f}s")
+        _report("text ids", text_path, entity_ids)
+        _report("integer keys", integer_path, entity_ids)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Adapter ingest throughput by ``matched_identifiers`` mode.
+
+Each person sends several signals carrying an email, a handle and a display
+name, so most resolutions hit an existing entity whose identifiers the eager
+mode reads back without the adapter ever using them.
+
+Run from the repository root with ``python -m benchmarks.bench_matched_identifiers``.
+"""
+
+from __future__ import annotations
+
+import time
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore, resolve_normalized_social_signal
+
+PEOPLE = 5_000
+SIGNALS_PER_PERSON = 4
+REPEATS = 3
+
+
+def _envelopes():
+    for round_ in range(SIGNALS_PER_PERSON):
+        for person in range(PEOPLE):
+            yield {
+                "source": "bench",
+                "payload": {
+                    "platform": "twitter",
+                    "email": f"person{person}@example.com",
+                    "handle": f"@person{person}_{round_}",
+                    "display_name": f"Person {person}",
+                },
+            }
+
+
+def main() -> None:
+    envelopes = list(_envelopes())
+    for mode in ("eager", "lazy", "skip"):
+        best = float("inf")
+        for _ in range(REPEATS):
+            resolver = EntityResolver(SQLiteEntityStore(), matched_identifiers=mode)
+            start = time.perf_counter()
+            for envelope in envelopes:
+                resolve_normalized_social_signal(resolver, envelope)
+            best = min(best, time.perf_counter() - start)
+            resolver.store.close()
+        print(f"{mode:<6} {len(envelopes) / best:>9.0f} signals/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Resolution latency on ``SQLiteEntityStore(":memory:")`` versus ``InMemoryEntityStore``.
+
+Run from the repository root with ``python -m benchmarks.bench_memory_store``.
+"""
+
+from __future__ import annotations
+
+import time
+
+from metaspn_entities import EntityResolver, InMemoryEntityStore, SQLiteEntityStore
+
+ENTITIES = 20_000
+LOOKUPS = 20_000
+
+
+def _run(label: str, store) -> None:
+    resolver = EntityResolver(store)
+    start = time.perf_counter()
+    for i in range(ENTITIES):
+        resolver.resolve("twitter_handle", f"user_{i}")
+    create_elapsed = time.perf_counter() - start
+    resolver.drain_events()
+
+    start = time.perf_counter()
+    for i in range(LOOKUPS):
+        resolver.resolve("twitter_handle", f"user_{(i * 7919) % ENTITIES}")
+    hit_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(LOOKUPS):
+        resolver.attribute_outcome({"twitter_handle": f"user_{i % ENTITIES}"})
+    attribute_elapsed = time.perf_counter() - start
+    print(
+        f"{label:<10} new {create_elapsed / ENTITIES * 1e6:>7.1f} us/resolve   "
+        f"hit {hit_elapsed / LOOKUPS * 1e6:>7.1f} us/resolve   "
+        f"attribute {attribute_elapsed / LOOKUPS * 1e6:>7.1f} us/call"
+    )
+    store.close()
+
+
+def main() -> None:
+    _run("sqlite", SQLiteEntityStore())
+    _run("in-memory", InMemoryEntityStore())
+
+
+if __name__ == "__main__":
+    main()
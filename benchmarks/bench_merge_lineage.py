@@ -0,0 +1,85 @@
+"""Lineage snapshots: full merge-history scan versus indexed lineage queries.
+
+Run from the repository root with ``python -m benchmarks.bench_merge_lineage``.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore, canonical_lineage_snapshot
+
+CLUSTERS = 100_000
+CLUSTER_SIZE = 4
+SNAPSHOTS = 200
+TIMESTAMP = "2026-01-01T00:00:00+00:00"
+
+
+def _rows():
+    for cluster in range(CLUSTERS):
+        for member in range(CLUSTER_SIZE):
+            yield "entities", {
+                "entity_id": f"ent_{cluster}_{member}",
+                "entity_type": "person",
+                "created_at": TIMESTAMP,
+                "status": "active" if member == CLUSTER_SIZE - 1 else "merged",
+            }
+    merge_id = 0
+    for cluster in range(CLUSTERS):
+        for member in range(CLUSTER_SIZE - 1):
+            merge_id += 1
+            yield "merge_records", {
+                "merge_id": merge_id,
+                "from_entity_id": f"ent_{cluster}_{member}",
+                "to_entity_id": f"ent_{cluster}_{member + 1}",
+                "reason": "bench",
+                "timestamp": TIMESTAMP,
+                "caused_by": "bench",
+            }
+    for cluster in range(CLUSTERS):
+        for member in range(CLUSTER_SIZE - 1):
+            yield "entity_redirects", {
+                "from_entity_id": f"ent_{cluster}_{member}",
+                "to_entity_id": f"ent_{cluster}_{CLUSTER_SIZE - 1}",
+                "timestamp": TIMESTAMP,
+                "reason": "bench",
+                "caused_by": "bench",
+            }
+
+
+def _full_scan_snapshot(resolver: EntityResolver, entity_id: str) -> dict:
+    # The previous implementation: load every merge record and filter in Python.
+    chain = resolver.redirect_chain(entity_id)
+    canonical_id = resolver.canonical_entity_id(entity_id)
+    merges = [
+        item
+        for item in resolver.merge_history()
+        if item["from_entity_id"] in chain or item["to_entity_id"] in chain or item["to_entity_id"] == canonical_id
+    ]
+    return {"merge_count": len(merges)}
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteEntityStore(str(Path(tmp) / "entities.db"))
+        store.load_snapshot_rows(_rows())
+        resolver = EntityResolver(store)
+        targets = [f"ent_{cluster * (CLUSTERS // SNAPSHOTS)}_0" for cluster in range(SNAPSHOTS)]
+        print(f"{CLUSTERS * (CLUSTER_SIZE - 1):,} merge records")
+        for label, fn, count in (
+            ("full history scan", _full_scan_snapshot, 5),
+            ("indexed lineage", canonical_lineage_snapshot, SNAPSHOTS),
+        ):
+            start = time.perf_counter()
+            for entity_id in targets[:count]:
+                snapshot = fn(resolver, entity_id)
+                assert snapshot["merge_count"] == CLUSTER_SIZE - 1
+            elapsed = time.perf_counter() - start
+            print(f"{label:<18} {elapsed / count * 1000:>9.2f} ms/snapshot")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Store open cost and an online schema migration under concurrent writes.
+
+Builds an unversioned file without secondary indexes, upgrades it with
+``migrations.migrate`` while another thread keeps resolving, and reports
+per-step progress and the longest write stall.
+
+Run from the repository root with ``python -m benchmarks.bench_migrations``.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore
+from metaspn_entities.migrations import MigrationProgress, migrate
+from metaspn_entities.schema import SCHEMA_SQL, SECONDARY_INDEXES
+
+ENTITIES = 500_000
+BATCH = 5_000
+OPENS = 200
+
+
+TIMESTAMP = "2026-01-01T00:00:00+00:00"
+
+
+def _rows():
+    for i in range(ENTITIES):
+        yield "entities", {"entity_id": f"ent_{i}", "entity_type": "person", "created_at": TIMESTAMP, "status": "active"}
+    for i in range(ENTITIES):
+        yield "identifiers", {
+            "identifier_type": "email",
+            "value": f"user{i}@example.com",
+            "normalized_value": f"user{i}@example.com",
+            "confidence": 0.9,
+            "first_seen_at": TIMESTAMP,
+            "last_seen_at": TIMESTAMP,
+            "provenance": "seed",
+        }
+    for i in range(ENTITIES):
+        yield "aliases", {
+            "identifier_type": "email",
+            "normalized_value": f"user{i}@example.com",
+            "entity_id": f"ent_{i}",
+            "confidence": 0.9,
+            "created_at": TIMESTAMP,
+            "caused_by": "seed",
+            "provenance": "seed",
+        }
+
+
+def _build_legacy(path: str) -> None:
+    store = SQLiteEntityStore(path, wal=True)
+    store.load_snapshot_rows(_rows(), chunk_size=BATCH)
+    store.close()
+    conn = sqlite3.connect(path)
+    for name in SECONDARY_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+    conn.close()
+
+
+def _open_cost(path: str) -> None:
+    start = time.perf_counter()
+    for _ in range(OPENS):
+        # What every open used to do: re-run the schema script and index DDL.
+        conn = sqlite3.connect(path)
+        conn.executescript(SCHEMA_SQL)
+        for index_sql in SECONDARY_INDEXES.values():
+            conn.execute(index_sql)
+        conn.commit()
+        conn.close()
+    script = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(OPENS):
+        SQLiteEntityStore(path, canonical_cache=False).close()
+    checked = time.perf_counter() - start
+    print(f"open: schema script {script / OPENS * 1000:.2f} ms  version check {checked / OPENS * 1000:.2f} ms")
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "entities.db")
+        _build_legacy(path)
+
+        store = SQLiteEntityStore(path, wal=True, auto_migrate=False)
+        resolver = EntityResolver(store)
+        done = threading.Event()
+        stalls = []
+        writes = [0]
+
+        def writer() -> None:
+            i = 0
+            while not done.is_set():
+                start = time.perf_counter()
+                resolver.resolve("email", f"live{i}@example.com")
+                resolver.drain_events()
+                stalls.append(time.perf_counter() - start)
+                writes[0] += 1
+                i += 1
+
+        def report(event: MigrationProgress) -> None:
+            print(
+                f"  v{event.version} {event.description}: {event.step}/{event.steps} "
+                f"({event.elapsed_seconds:.2f}s)"
+            )
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        start = time.perf_counter()
+        version = migrate(path, progress=report)
+        elapsed = time.perf_counter() - start
+        done.set()
+        thread.join()
+        store.close()
+        print(
+            f"migrated {ENTITIES:,} entities to v{version} in {elapsed:.2f}s; "
+            f"{writes[0]} concurrent writes, longest stall {max(stalls) * 1000:.0f} ms"
+        )
+        _open_cost(path)
+
+
+if __name__ == "__main__":
+    main()
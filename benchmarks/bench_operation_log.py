@@ -0,0 +1,83 @@
+"""Operation log: live ingest overhead, and replay throughput when rebuilding a store from the log.
+
+Two workloads are logged: single ``resolve`` calls (replayed as ``resolve_many`` runs) and adapter
+envelopes (one ``resolve`` plus one ``add_alias`` each, replayed call by call).
+
+Run from the repository root with ``python -m benchmarks.bench_operation_log``.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore, resolve_normalized_social_signal
+from metaspn_entities.oplog import OperationLog
+from metaspn_entities.sinks import CallbackSink
+
+SIGNALS = 20_000
+REPLAY_BATCH = 5_000
+
+
+def _person(i: int) -> int:
+    # One in four signals repeats an earlier person.
+    return i - i % 4 if i % 4 == 3 else i
+
+
+def _resolve_call(resolver: EntityResolver, i: int) -> None:
+    resolver.resolve("email", f"user{_person(i)}@example.com")
+
+
+def _adapter_envelope(resolver: EntityResolver, i: int) -> None:
+    person = _person(i)
+    envelope = {"source": "bench", "payload": {"email": f"user{person}@example.com", "handle": f"@user{person}"}}
+    resolve_normalized_social_signal(resolver, envelope)
+
+
+def _resolver(path: Path, log: Optional[OperationLog] = None) -> EntityResolver:
+    return EntityResolver(
+        SQLiteEntityStore(str(path), wal=True),
+        matched_identifiers="skip",
+        event_sink=CallbackSink(lambda events: None),
+        operation_log=log,
+    )
+
+
+def _run(root: Path, label: str, ingest: Callable[[EntityResolver, int], None]) -> None:
+    rates = {}
+    for logged in (False, True):
+        log = OperationLog(root / f"{label}.jsonl") if logged else None
+        resolver = _resolver(root / f"{label}_{logged}.db", log)
+        start = time.perf_counter()
+        for i in range(SIGNALS):
+            ingest(resolver, i)
+        rates[logged] = SIGNALS / (time.perf_counter() - start)
+        resolver.close()
+        if not logged:
+            resolver.store.close()
+    live = resolver
+
+    replayer = _resolver(root / f"{label}_replica.db")
+    report = replayer.replay_operation_log(str(root / f"{label}.jsonl"), batch_size=REPLAY_BATCH)
+    replay_rate = SIGNALS / report.elapsed_seconds
+    print(
+        f"{label:<17} live {rates[False]:>7.0f} signals/s, with log {rates[True]:>7.0f}; "
+        f"replay {replay_rate:>7.0f} signals/s ({report.operations / report.elapsed_seconds:,.0f} operations/s, "
+        f"{replay_rate / rates[True]:.1f}x live)"
+    )
+    assert sorted(map(repr, replayer.store.iter_snapshot_rows())) == sorted(map(repr, live.store.iter_snapshot_rows()))
+    live.store.close()
+    replayer.store.close()
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _run(root, "resolve calls", _resolve_call)
+        _run(root, "adapter envelopes", _adapter_envelope)
+
+
+if __name__ == "__main__":
+    main()
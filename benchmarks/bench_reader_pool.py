@@ -0,0 +1,58 @@
+"""Read throughput with one ingest writer, with and without the WAL reader pool.
+
+Run from the repository root with ``python -m benchmarks.bench_reader_pool``.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore
+
+KNOWN = 5_000
+READERS = 4
+READS_PER_THREAD = 5_000
+
+
+def _run(label: str, **store_options) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteEntityStore(str(Path(tmp) / "bench.db"), **store_options)
+        resolver = EntityResolver(store)
+        resolver.resolve_many([("twitter_handle", f"known_{i}", None) for i in range(KNOWN)])
+        stop = threading.Event()
+
+        def ingest() -> None:
+            i = 0
+            while not stop.is_set():
+                resolver.resolve("twitter_handle", f"new_{i}")
+                i += 1
+
+        def read(offset: int) -> None:
+            for i in range(READS_PER_THREAD):
+                resolver.attribute_outcome({"twitter_handle": f"known_{(offset + i * 7) % KNOWN}"})
+
+        writer = threading.Thread(target=ingest)
+        readers = [threading.Thread(target=read, args=(n,)) for n in range(READERS)]
+        writer.start()
+        start = time.perf_counter()
+        for thread in readers:
+            thread.start()
+        for thread in readers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        writer.join()
+        store.close()
+    print(f"{label:<24} {READERS * READS_PER_THREAD / elapsed:>10.0f} attributions/s")
+
+
+def main() -> None:
+    _run("single connection")
+    _run("wal + 4 readers", wal=True, reader_pool_size=READERS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Sequential ``resolve`` versus ``resolve_many`` on the same batch.
+
+Run from the repository root with ``python -m benchmarks.bench_resolve_many``.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore
+
+BATCH = 20_000
+DISTINCT = 15_000
+
+
+def _items() -> list:
+    rng = random.Random(7)
+    return [("twitter_handle", f"user_{rng.randrange(DISTINCT)}", {"provenance": "bench"}) for _ in range(BATCH)]
+
+
+def main() -> None:
+    items = _items()
+
+    resolver = EntityResolver(SQLiteEntityStore())
+    start = time.perf_counter()
+    with resolver.transaction():
+        for item in items:
+            resolver.resolve(*item)
+    sequential = time.perf_counter() - start
+
+    resolver = EntityResolver(SQLiteEntityStore())
+    start = time.perf_counter()
+    resolver.resolve_many(items)
+    batched = time.perf_counter() - start
+
+    print(f"sequential resolve: {BATCH / sequential:>10.0f} items/s")
+    print(f"resolve_many:       {BATCH / batched:>10.0f} items/s ({sequential / batched:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
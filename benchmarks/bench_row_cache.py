@@ -0,0 +1,57 @@
+"""Zipf-skewed lookups with and without the read-through row cache.
+
+Run from the repository root with ``python -m benchmarks.bench_row_cache``.
+"""
+
+from __future__ import annotations
+
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore
+
+ACCOUNTS = 20_000
+LOOKUPS = 100_000
+ZIPF_S = 1.1
+CACHE_SIZE = 2_000
+
+
+def _zipf_keys(rng: random.Random) -> list:
+    weights = [1.0 / (rank**ZIPF_S) for rank in range(1, ACCOUNTS + 1)]
+    return rng.choices(range(ACCOUNTS), weights=weights, k=LOOKUPS)
+
+
+def _run(label: str, path: str, row_cache_size: int, keys: list) -> None:
+    store = SQLiteEntityStore(path, row_cache_size=row_cache_size)
+    resolver = EntityResolver(store)
+    statements = []
+    store.conn.set_trace_callback(statements.append)
+    start = time.perf_counter()
+    for key in keys:
+        resolver.attribute_outcome({"twitter_handle": f"user_{key}"})
+    elapsed = time.perf_counter() - start
+    store.conn.set_trace_callback(None)
+    line = f"{label:<10} {LOOKUPS / elapsed:>9.0f} attributions/s  {len(statements) / LOOKUPS:>5.2f} statements/lookup"
+    stats = store.row_cache_stats()
+    if stats:
+        line += f"  alias hit rate {stats['aliases']['hit_rate']:.3f}  evictions {stats['aliases']['evictions']}"
+    print(line)
+    store.close()
+
+
+def main() -> None:
+    rng = random.Random(7)
+    keys = _zipf_keys(rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "entities.db")
+        seed = SQLiteEntityStore(path)
+        EntityResolver(seed).resolve_many([("twitter_handle", f"user_{i}", None) for i in range(ACCOUNTS)])
+        seed.close()
+        _run("uncached", path, 0, keys)
+        _run("lru", path, CACHE_SIZE, keys)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Ingest throughput of ``ShardedEntityStore`` with one writer thread per shard.
+
+Run from the repository root with ``python -m benchmarks.bench_sharded_store``.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from metaspn_entities import EntityResolver, ShardedEntityStore
+from metaspn_entities.normalize import normalize_identifier
+
+SIGNALS = 40_000
+BATCH = 50
+SHARD_COUNTS = (1, 2, 4, 8)
+
+
+def _run(shard_count: int, directory: Path) -> None:
+    store = ShardedEntityStore(str(directory / f"shards_{shard_count}"), shard_count=shard_count)
+    partitions = [[] for _ in range(shard_count)]
+    for i in range(SIGNALS):
+        handle = f"user_{i % (SIGNALS // 2)}"
+        partitions[store.shard_index("twitter_handle", normalize_identifier("twitter_handle", handle))].append(handle)
+
+    def writer(handles) -> None:
+        resolver = EntityResolver(store)
+        for start in range(0, len(handles), BATCH):
+            resolver.resolve_many([("twitter_handle", handle, None) for handle in handles[start : start + BATCH]])
+            resolver.drain_events()
+
+    threads = [threading.Thread(target=writer, args=(handles,)) for handles in partitions]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    print(f"{shard_count} shard(s) {SIGNALS / elapsed:>10.0f} signals/s")
+    store.close()
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        for shard_count in SHARD_COUNTS:
+            _run(shard_count, Path(tmp))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Peak Python memory of ``export_snapshot`` versus ``export_snapshot_stream``.
+
+Run from the repository root with ``python -m benchmarks.bench_snapshot_export``.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore
+
+IDENTIFIERS = 50_000
+
+
+def _measure(label: str, fn) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} {elapsed:>7.2f}s {peak / 1e6:>9.1f} MB peak")
+
+
+def main() -> None:
+    resolver = EntityResolver(SQLiteEntityStore())
+    resolver.resolve_many([("twitter_handle", f"user_{i}", None) for i in range(IDENTIFIERS)])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _measure("export_snapshot", lambda: resolver.export_snapshot(str(root / "full.json")))
+        _measure("stream", lambda: resolver.export_snapshot_stream(str(root / "stream.ndjson")))
+        _measure("stream + gzip", lambda: resolver.export_snapshot_stream(str(root / "stream.ndjson.gz")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Cold-start restore time from a snapshot versus replaying ``resolve``.
+
+Run from the repository root with ``python -m benchmarks.bench_snapshot_import``.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore
+
+IDENTIFIERS = 50_000
+
+
+def main() -> None:
+    items = [("twitter_handle", f"user_{i}", None) for i in range(IDENTIFIERS)]
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        source = EntityResolver(SQLiteEntityStore(str(root / "source.db")))
+        source.resolve_many(items)
+        source.export_snapshot_stream(str(root / "snapshot.ndjson.gz"))
+
+        replica = EntityResolver(SQLiteEntityStore(str(root / "replayed.db")))
+        start = time.perf_counter()
+        with replica.transaction():
+            for item in items:
+                replica.resolve(*item)
+        replayed = time.perf_counter() - start
+
+        restored = EntityResolver(SQLiteEntityStore(str(root / "restored.db")))
+        start = time.perf_counter()
+        restored.import_snapshot(str(root / "snapshot.ndjson.gz"))
+        imported = time.perf_counter() - start
+
+    print(f"replay via resolve: {replayed:>7.2f}s")
+    print(f"import_snapshot:    {imported:>7.2f}s ({replayed / imported:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Timestamp cost: clock reads, resolve throughput by storage mode, and recommendation-context builds.
+
+Run from the repository root with ``python -m benchmarks.bench_timestamps``.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore
+from metaspn_entities.context import _parse_iso_text, build_recommendation_context
+from metaspn_entities.models import frozen_clock, utcnow_iso
+
+CLOCK_READS = 200_000
+SIGNALS = 40_000
+BATCH = 200
+REPEATS = 3
+CONTEXTS = 20_000
+IDENTIFIERS_PER_CONTEXT = 8
+
+
+def _per_call_datetime() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
+def _clock() -> None:
+    def run(label: str, fn) -> None:
+        start = time.perf_counter()
+        for _ in range(CLOCK_READS):
+            fn()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<26} {elapsed / CLOCK_READS * 1e9:>7.0f} ns/read")
+
+    run("datetime per call", _per_call_datetime)
+    run("utcnow_iso", utcnow_iso)
+    with frozen_clock():
+        run("utcnow_iso (frozen)", utcnow_iso)
+
+
+def _writes() -> None:
+    for label, epoch in (("iso text", False), ("epoch seconds", True)):
+        best = float("inf")
+        for _ in range(REPEATS):
+            resolver = EntityResolver(SQLiteEntityStore(epoch_timestamps=epoch))
+            start = time.perf_counter()
+            for offset in range(0, SIGNALS, BATCH):
+                resolver.resolve_many(
+                    [("email", f"user{i}@example.com", None) for i in range(offset, offset + BATCH)]
+                )
+                resolver.drain_events()
+            best = min(best, time.perf_counter() - start)
+            store = resolver.store
+            start = time.perf_counter()
+            for i in range(SIGNALS):
+                store.get_identifier("email", f"user{i}@example.com")
+            reads = time.perf_counter() - start
+            start = time.perf_counter()
+            scanned = sum(1 for _ in store.iter_snapshot_rows())
+            scan = time.perf_counter() - start
+            store.close()
+        print(
+            f"{label:<14} resolve_many {SIGNALS / best:>9.0f} signals/s  get_identifier {SIGNALS / reads:>9.0f} rows/s  "
+            f"snapshot scan {scanned / scan:>9.0f} rows/s"
+        )
+
+
+def _contexts() -> None:
+    identifiers = [
+        {
+            "identifier_type": "email",
+            "normalized_value": f"u{i}@example.com",
+            "confidence": 0.9,
+            "last_seen_at": f"2026-01-{1 + i:02d}T00:00:00+00:00",
+            "provenance": "crm",
+        }
+        for i in range(IDENTIFIERS_PER_CONTEXT)
+    ]
+    now = datetime(2026, 2, 1, tzinfo=timezone.utc)
+    for label, cached in (("uncached parse", False), ("cached parse", True)):
+        start = time.perf_counter()
+        for _ in range(CONTEXTS):
+            if not cached:
+                _parse_iso_text.cache_clear()
+            build_recommendation_context("ent_x", [], identifiers, now=now)
+        elapsed = time.perf_counter() - start
+        print(f"recommendation context {label:<15} {CONTEXTS / elapsed:>9.0f} contexts/s")
+
+
+def main() -> None:
+    _clock()
+    _writes()
+    _contexts()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Adapter ingest throughput on a file-backed store by transaction size.
+
+Run from the repository root with ``python -m benchmarks.bench_transactions``.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+
+from metaspn_entities import EntityResolver, SQLiteEntityStore, resolve_normalized_social_signal
+
+SIGNALS = 2_000
+BATCH_SIZES = (1, 50, 500)
+
+
+def _signal(i: int) -> dict:
+    return {
+        "source": "social.ingest",
+        "payload": {
+            "platform": "twitter",
+            "author_handle": f"author_{i}",
+            "profile_url": f"https://example.com/u/{i}",
+            "display_name": f"Author {i}",
+        },
+    }
+
+
+def main() -> None:
+    print(f"{'batch':>6} {'signals/s':>10}")
+    for batch_size in BATCH_SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SQLiteEntityStore(str(Path(tmp) / "bench.db"))
+            resolver = EntityResolver(store)
+            start = time.perf_counter()
+            for offset in range(0, SIGNALS, batch_size):
+                with resolver.transaction():
+                    for i in range(offset, min(offset + batch_size, SIGNALS)):
+                        resolve_normalized_social_signal(resolver, _signal(i))
+            elapsed = time.perf_counter() - start
+            store.close()
+        print(f"{batch_size:>6} {SIGNALS / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
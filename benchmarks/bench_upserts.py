@@ -0,0 +1,80 @@
+"""Select-then-write upserts versus single-statement ``ON CONFLICT`` upserts.
+
+Run from the repository root with ``python -m benchmarks.bench_upserts``.
+"""
+
+from __future__ import annotations
+
+import time
+
+from metaspn_entities import SQLiteEntityStore
+from metaspn_entities.models import utcnow_iso
+
+KEYS = 5_000
+ROUNDS = 4
+
+
+def _legacy_upsert_identifier(store: SQLiteEntityStore, identifier_type: str, value: str, confidence: float) -> None:
+    now = utcnow_iso()
+    existing = store.conn.execute(
+        "SELECT * FROM identifiers WHERE identifier_type = ? AND normalized_value = ?",
+        (identifier_type, value),
+    ).fetchone()
+    if existing:
+        store.conn.execute(
+            "UPDATE identifiers SET value = ?, confidence = ?, last_seen_at = ?, provenance = ? WHERE identifier_type = ? AND normalized_value = ?",
+            (value, max(confidence, existing["confidence"]), now, existing["provenance"], identifier_type, value),
+        )
+    else:
+        store.conn.execute(
+            "INSERT INTO identifiers(identifier_type, value, normalized_value, confidence, first_seen_at, last_seen_at, provenance) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (identifier_type, value, value, confidence, now, now, None),
+        )
+
+
+def _legacy_add_alias(store: SQLiteEntityStore, identifier_type: str, value: str, entity_id: str, confidence: float) -> None:
+    existing = store.find_alias(identifier_type, value)
+    target = store.canonical_entity_id(entity_id)
+    if existing:
+        if store.canonical_entity_id(existing["entity_id"]) == target:
+            store.conn.execute(
+                "UPDATE aliases SET confidence = ?, provenance = ? WHERE identifier_type = ? AND normalized_value = ?",
+                (max(confidence, existing["confidence"]), existing["provenance"], identifier_type, value),
+            )
+        return
+    store.conn.execute(
+        "INSERT INTO aliases(identifier_type, normalized_value, entity_id, confidence, created_at, caused_by, provenance) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (identifier_type, value, target, confidence, utcnow_iso(), "bench", None),
+    )
+
+
+def _run(label: str, upsert, add_alias) -> None:
+    store = SQLiteEntityStore(canonical_cache=False)
+    entity_id = store.create_entity("person")
+    start = time.perf_counter()
+    with store.transaction():
+        for round_number in range(ROUNDS):
+            for i in range(KEYS):
+                value = f"user_{i}"
+                upsert(store, value, 0.5 + round_number / 10)
+                add_alias(store, value, entity_id, 0.5 + round_number / 10)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {KEYS * ROUNDS / elapsed:>10.0f} identifier+alias writes/s")
+    store.close()
+
+
+def main() -> None:
+    _run(
+        "legacy",
+        lambda store, value, conf: _legacy_upsert_identifier(store, "handle", value, conf),
+        lambda store, value, entity_id, conf: _legacy_add_alias(store, "handle", value, entity_id, conf),
+    )
+    _run(
+        "on-conflict",
+        lambda store, value, conf: store.upsert_identifier("handle", value, value, conf, None),
+        lambda store, value, entity_id, conf: store.add_alias("handle", value, entity_id, conf, "bench"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 from .adapter import SignalResolutionResult, resolve_normalized_social_signal
+from .async_resolver import AsyncEntityResolver
 from .attribution import OutcomeAttribution
 from .context import RecommendationContext, EntityContext, build_confidence_summary, build_recommendation_context
 from .demo import resolve_demo_social_identity
 from .events import EmittedEvent
+from .memory_backend import InMemoryEntityStore
 from .models import EntityResolution
+from .pipeline import IngestReport, SignalIngestPipeline
 from .resolver import EntityResolver
 from .season1 import (
     attribute_season_reward,
@@ -12,7 +15,9 @@ from .season1 import (
     resolve_founder_wallet,
     resolve_player_wallet,
 )
+from .sharded_backend import ShardedEntityStore
 from .sqlite_backend import SQLiteEntityStore
+from .store import EntityStore
 from .token_links import (
     TokenProjectCreatorLinks,
     attribute_token_outcome,
@@ -25,6 +30,8 @@ from .token_links import (
 __all__ = [
     "resolve_normalized_social_signal",
     "SignalResolutionResult",
+    "SignalIngestPipeline",
+    "IngestReport",
     "OutcomeAttribution",
     "resolve_demo_social_identity",
     "TokenProjectCreatorLinks",
@@ -38,6 +45,7 @@ __all__ = [
     "build_confidence_summary",
     "build_recommendation_context",
     "EntityResolver",
+    "AsyncEntityResolver",
     "EntityResolution",
     "EmittedEvent",
     "resolve_player_wallet",
@@ -46,4 +54,7 @@ __all__ = [
     "player_confidence_summary",
     "canonical_lineage_snapshot",
     "SQLiteEntityStore",
+    "InMemoryEntityStore",
+    "ShardedEntityStore",
+    "EntityStore",
 ]
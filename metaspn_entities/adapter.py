@@ -5,6 +5,7 @@ from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
 from .events import EmittedEvent
 from .models import EntityType
+from .normalize import normalize_identifier
 from .resolver import EntityResolver
 
 
@@ -28,42 +29,39 @@ def resolve_normalized_social_signal(
     - Identifier extraction order is fixed.
     - Primary resolution always uses the highest-priority available identifier.
     - Remaining identifiers are added as aliases in deterministic order.
-    """
-
-    # Keep adapter call output scoped to actions taken in this invocation only.
-    resolver.drain_events()
 
-    envelope = _coerce_envelope(signal_envelope)
-    payload = _coerce_payload(envelope.get("payload"))
-    source = str(envelope.get("source") or "unknown-source")
-
-    identifiers = _extract_identifiers(payload)
-    if not identifiers:
-        raise ValueError("No resolvable identifiers found in normalized social signal payload")
+    ``emitted_events`` holds this envelope's events. Called inside an open
+    ``resolver.transaction()``, they are still pending: the sink receives them
+    when that transaction commits, and none are published if it rolls back.
+    """
 
+    source, identifiers = _signal_identifiers(signal_envelope)
     primary_type, primary_value, primary_confidence = identifiers[0]
-    resolution = resolver.resolve(
-        primary_type,
-        primary_value,
-        context={
-            "confidence": primary_confidence,
-            "entity_type": default_entity_type,
-            "caused_by": caused_by,
-            "provenance": source,
-        },
-    )
-
-    for alias_type, alias_value, alias_confidence in identifiers[1:]:
-        resolver.add_alias(
-            resolution.entity_id,
-            alias_type,
-            alias_value,
-            confidence=alias_confidence,
-            caused_by=caused_by,
-            provenance=source,
+    keys = _identifier_keys(identifiers)
+    # One commit per envelope, locking all of its identifiers up front; a conflicting alias rolls back the whole signal.
+    # The result carries this envelope's events; the resolver's sink receives them too.
+    with resolver.capture_events() as emitted, resolver.transaction(keys):
+        resolution = resolver.resolve(
+            primary_type,
+            primary_value,
+            context={
+                "confidence": primary_confidence,
+                "entity_type": default_entity_type,
+                "caused_by": caused_by,
+                "provenance": source,
+            },
         )
 
-    emitted = resolver.drain_events()
+        for alias_type, alias_value, alias_confidence in identifiers[1:]:
+            resolver.add_alias(
+                resolution.entity_id,
+                alias_type,
+                alias_value,
+                confidence=alias_confidence,
+                caused_by=caused_by,
+                provenance=source,
+            )
+
     return SignalResolutionResult(
         entity_id=resolution.entity_id,
         confidence=resolution.confidence,
@@ -71,6 +69,27 @@ def resolve_normalized_social_signal(
     )
 
 
+def signal_identifier_keys(signal_envelope: Mapping[str, Any] | Any) -> List[Tuple[str, str]]:
+    """``(identifier_type, normalized_value)`` keys the adapter writes for ``signal_envelope``, primary first."""
+    _, identifiers = _signal_identifiers(signal_envelope)
+    return _identifier_keys(identifiers)
+
+
+def _identifier_keys(identifiers: List[Tuple[str, str, float]]) -> List[Tuple[str, str]]:
+    return [(id_type, normalize_identifier(id_type, id_value)) for id_type, id_value, _ in identifiers]
+
+
+def _signal_identifiers(signal_envelope: Mapping[str, Any] | Any) -> Tuple[str, List[Tuple[str, str, float]]]:
+    envelope = _coerce_envelope(signal_envelope)
+    payload = _coerce_payload(envelope.get("payload"))
+    source = str(envelope.get("source") or "unknown-source")
+
+    identifiers = _extract_identifiers(payload)
+    if not identifiers:
+        raise ValueError("No resolvable identifiers found in normalized social signal payload")
+    return source, identifiers
+
+
 def _coerce_envelope(signal_envelope: Mapping[str, Any] | Any) -> Dict[str, Any]:
     if isinstance(signal_envelope, Mapping):
         return dict(signal_envelope)
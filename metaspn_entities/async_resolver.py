@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple, TypeVar
+
+from .adapter import SignalResolutionResult, resolve_normalized_social_signal
+from .attribution import OutcomeAttribution
+from .context import EntityContext, RecommendationContext
+from .events import EmittedEvent
+from .models import DEFAULT_MATCH_CONFIDENCE, EntityResolution, LazyIdentifiers
+from .normalize import normalize_identifier
+from .resolver import EntityResolver
+
+T = TypeVar("T")
+
+
+class AsyncEntityResolver:
+    """Awaitable facade over ``EntityResolver`` for asyncio services.
+
+    Store work never runs on the event loop. Writes go through a single
+    worker thread, which serializes them in submission order; reads use a
+    separate pool when the store serves concurrent reads (a WAL store with a
+    reader pool) and share the writer thread otherwise. Concurrent ``resolve``
+    calls for the same identifier and context are coalesced into one store
+    operation. Each caller gets its own copy of the resolution; the operation's
+    events are published once, to the resolver's event sink, and belong to no
+    caller in particular.
+    """
+
+    def __init__(self, resolver: Optional[EntityResolver] = None, *, read_workers: int = 4) -> None:
+        self.resolver = resolver or EntityResolver()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="metaspn-entities-writer")
+        if self.resolver.store.concurrent_reads:
+            self._reader: ThreadPoolExecutor = ThreadPoolExecutor(
+                max_workers=read_workers, thread_name_prefix="metaspn-entities-reader"
+            )
+        else:
+            self._reader = self._writer
+        self._inflight: Dict[Hashable, "asyncio.Future[EntityResolution]"] = {}
+        self.coalesced = 0
+
+    async def __aenter__(self) -> "AsyncEntityResolver":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._shutdown)
+
+    def _shutdown(self) -> None:
+        self._writer.shutdown(wait=True)
+        if self._reader is not self._writer:
+            self._reader.shutdown(wait=True)
+
+    async def _write(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._writer, partial(fn, *args, **kwargs))
+
+    async def _read(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._reader, partial(fn, *args, **kwargs))
+
+    async def resolve(
+        self,
+        identifier_type: str,
+        value: str,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> EntityResolution:
+        key = (identifier_type, normalize_identifier(identifier_type, value), _freeze(context or {}))
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return _own_copy(await asyncio.shield(pending))
+
+        future = asyncio.ensure_future(self._write(self.resolver.resolve, identifier_type, value, context))
+        self._inflight[key] = future
+        try:
+            return _own_copy(await asyncio.shield(future))
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def resolve_many(self, items: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]]) -> List[EntityResolution]:
+        return await self._write(self.resolver.resolve_many, list(items))
+
+    async def resolve_signal(self, signal_envelope: Mapping[str, Any] | Any, **kwargs: Any) -> SignalResolutionResult:
+        return await self._write(resolve_normalized_social_signal, self.resolver, signal_envelope, **kwargs)
+
+    async def add_alias(
+        self,
+        entity_id: str,
+        identifier_type: str,
+        value: str,
+        confidence: float = DEFAULT_MATCH_CONFIDENCE,
+        caused_by: str = "manual",
+        provenance: Optional[str] = None,
+    ) -> List[EmittedEvent]:
+        return await self._write(
+            self.resolver.add_alias,
+            entity_id,
+            identifier_type,
+            value,
+            confidence=confidence,
+            caused_by=caused_by,
+            provenance=provenance,
+        )
+
+    async def merge_entities(
+        self, from_entity_id: str, to_entity_id: str, reason: str, caused_by: str = "manual"
+    ) -> EmittedEvent:
+        return await self._write(self.resolver.merge_entities, from_entity_id, to_entity_id, reason, caused_by)
+
+    async def undo_merge(self, from_entity_id: str, to_entity_id: str, caused_by: str = "manual") -> EmittedEvent:
+        return await self._write(self.resolver.undo_merge, from_entity_id, to_entity_id, caused_by)
+
+    async def attribute_outcome(self, references: Any) -> OutcomeAttribution:
+        return await self._read(self.resolver.attribute_outcome, references)
+
+    async def entity_context(self, entity_id: str, recent_limit: int = 10) -> EntityContext:
+        return await self._read(self.resolver.entity_context, entity_id, recent_limit)
+
+    async def recommendation_context(self, entity_id: str) -> RecommendationContext:
+        return await self._read(self.resolver.recommendation_context, entity_id)
+
+    async def confidence_summary(self, entity_id: str) -> Dict[str, Any]:
+        return await self._read(self.resolver.confidence_summary, entity_id)
+
+    async def drain_events(self) -> List[EmittedEvent]:
+        # Drained on the writer thread so it never races an in-flight write.
+        return await self._write(self.resolver.drain_events)
+
+
+def _own_copy(resolution: EntityResolution) -> EntityResolution:
+    # Every coalesced caller copies the shared result, so none can see another's mutations.
+    matched = resolution.matched_identifiers
+    if isinstance(matched, LazyIdentifiers) and not matched.loaded:
+        identifiers: Sequence[Dict[str, Any]] = LazyIdentifiers(lambda: [dict(item) for item in matched])
+    else:
+        identifiers = [dict(item) for item in matched]
+    return replace(resolution, matched_identifiers=identifiers)
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, Mapping):
+        return tuple(sorted((str(key), _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, Hashable):
+        return value
+    return repr(value)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+from typing import Any, Dict, Iterable
+
+from .store import IdentifierKey
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over ``(identifier_type, normalized_value)`` keys.
+
+    ``capacity`` and ``error_rate`` size the bit array and the number of hash
+    probes. Membership tests never return false negatives for keys that were
+    added, so a negative answer is a definite miss; positives are wrong with
+    roughly ``error_rate`` probability while ``count <= capacity``. ``count``
+    only grows when an added key sets a new bit, so re-adding known keys
+    leaves it unchanged (a new key colliding on every probe is not counted).
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        if capacity < 1:
+            raise ValueError("BloomFilter capacity must be at least 1")
+        if not 0.0 < error_rate < 1.0:
+            raise ValueError("BloomFilter error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bit_count = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.bit_count / capacity * math.log(2))))
+        self._bits = bytearray((self.bit_count + 7) // 8)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def _positions(self, key: IdentifierKey) -> Iterable[int]:
+        # Kirsch-Mitzenmacher double hashing from one 128-bit digest.
+        digest = hashlib.blake2b(f"{key[0]}\x00{key[1]}".encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + probe * second) % self.bit_count for probe in range(self.hash_count)]
+
+    def add(self, key: IdentifierKey) -> None:
+        positions = self._positions(key)
+        with self._lock:
+            bits = self._bits
+            added = False
+            for position in positions:
+                mask = 1 << (position & 7)
+                if not bits[position >> 3] & mask:
+                    bits[position >> 3] |= mask
+                    added = True
+            if added:
+                self.count += 1
+
+    def update(self, keys: Iterable[IdentifierKey]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: IdentifierKey) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+    def estimated_false_positive_rate(self) -> float:
+        """Expected false-positive probability for the keys added so far."""
+        return (1.0 - math.exp(-self.hash_count * self.count / self.bit_count)) ** self.hash_count
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "capacity": self.capacity,
+            "bits": self.bit_count,
+            "bytes": self.size_bytes,
+            "hash_count": self.hash_count,
+            "estimated_false_positive_rate": round(self.estimated_false_positive_rate(), 6),
+        }
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+
+class CanonicalIdCache:
+    """Process-local union-find forest mirroring ``entity_redirects``.
+
+    Each known entity id points at a parent id; roots point at themselves.
+    Lookups compress the path they walk, merges link one root under another,
+    and anything that splits a cluster (redirect removal, rollback) clears the
+    forest. The cache only sees writes made through its owning store, which
+    clears it when ``PRAGMA data_version`` shows another connection committed.
+
+    ``version`` changes on every union and clear; a lookup that walked the
+    redirects passes the version it started from to ``record``, which ignores
+    the result if a merge landed in between.
+    """
+
+    def __init__(self) -> None:
+        self._parent: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def find(self, entity_id: str) -> Optional[str]:
+        with self._lock:
+            parent = self._parent.get(entity_id)
+            if parent is None:
+                self.misses += 1
+                return None
+            path = []
+            node = entity_id
+            while parent != node:
+                path.append(node)
+                node = parent
+                parent = self._parent[node]
+            for member in path:
+                self._parent[member] = node
+            self.hits += 1
+            return node
+
+    def record(self, path: Iterable[str], root: str, version: Optional[int] = None) -> None:
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            for member in path:
+                self._parent[member] = root
+            self._parent[root] = root
+
+    def union(self, from_root: str, to_root: str) -> None:
+        with self._lock:
+            self._parent[to_root] = to_root
+            self._parent[from_root] = to_root
+            self.version += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._parent.clear()
+            self.invalidations += 1
+            self.version += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 6) if lookups else 0.0,
+                "size": len(self._parent),
+                "invalidations": self.invalidations,
+            }
+
+
+MISSING = object()
+
+
+class LRUCache:
+    """Bounded, thread-safe least-recently-used map with hit/miss/eviction counters.
+
+    ``get`` returns ``MISSING`` for absent keys so that ``None`` can be cached
+    as a negative result. ``version`` changes on every discard and clear; a
+    reader that passes the version it saw before querying to ``put`` never
+    caches a row that a concurrent write invalidated meanwhile.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("LRUCache capacity must be at least 1")
+        self.capacity = capacity
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            value = self._entries.get(key, MISSING)
+            if value is MISSING:
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, version: Optional[int] = None) -> None:
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self.version += 1
+            if self._entries.pop(key, MISSING) is not MISSING:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self.version += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 6) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "capacity": self.capacity,
+            }
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Dict, List
 
 
@@ -130,7 +131,7 @@ def build_recommendation_context(
 
 def _latest_seen(identifiers: List[Dict[str, Any]]) -> datetime | None:
     timestamps = [
-        _parse_iso(str(item.get("last_seen_at")))
+        _parse_iso(item.get("last_seen_at"))
         for item in identifiers
         if item.get("last_seen_at")
     ]
@@ -140,7 +141,15 @@ def _latest_seen(identifiers: List[Dict[str, Any]]) -> datetime | None:
     return max(clean)
 
 
-def _parse_iso(raw: str) -> datetime | None:
+def _parse_iso(raw: Any) -> datetime | None:
+    if isinstance(raw, (int, float)) and not isinstance(raw, bool):
+        return datetime.fromtimestamp(raw, timezone.utc)
+    return _parse_iso_text(str(raw))
+
+
+# Store timestamps have one-second resolution, so a context build sees few distinct values.
+@lru_cache(maxsize=4096)
+def _parse_iso_text(raw: str) -> datetime | None:
     text = raw.strip()
     if not text:
         return None
@@ -21,42 +21,43 @@ def resolve_demo_social_identity(
     handle = handle.strip()
 
     handle_type = f"{platform}_handle" if platform else "handle"
-    resolution = resolver.resolve(
-        handle_type,
-        handle,
-        context={
-            "entity_type": EntityType.PERSON,
-            "caused_by": caused_by,
-            "provenance": source,
-            "confidence": 0.93,
-        },
-    )
+    with resolver.capture_events() as emitted:
+        resolution = resolver.resolve(
+            handle_type,
+            handle,
+            context={
+                "entity_type": EntityType.PERSON,
+                "caused_by": caused_by,
+                "provenance": source,
+                "confidence": 0.93,
+            },
+        )
+
+        for key in ("profile_url", "author_url", "canonical_url"):
+            url = social_payload.get(key)
+            if isinstance(url, str) and url.strip():
+                resolver.add_alias(
+                    resolution.entity_id,
+                    "canonical_url",
+                    url.strip(),
+                    confidence=0.96,
+                    caused_by=caused_by,
+                    provenance=source,
+                )
+                break
 
-    for key in ("profile_url", "author_url", "canonical_url"):
-        url = social_payload.get(key)
-        if isinstance(url, str) and url.strip():
+        email = social_payload.get("email")
+        if isinstance(email, str) and email.strip():
             resolver.add_alias(
                 resolution.entity_id,
-                "canonical_url",
-                url.strip(),
-                confidence=0.96,
+                "email",
+                email.strip(),
+                confidence=0.98,
                 caused_by=caused_by,
                 provenance=source,
             )
-            break
-
-    email = social_payload.get("email")
-    if isinstance(email, str) and email.strip():
-        resolver.add_alias(
-            resolution.entity_id,
-            "email",
-            email.strip(),
-            confidence=0.98,
-            caused_by=caused_by,
-            provenance=source,
-        )
 
-    canonical_id = resolver.store.canonical_entity_id(resolution.entity_id)
+    canonical_id = resolver.canonical_entity_id(resolution.entity_id)
     context = resolver.entity_context(canonical_id)
     digest_payload = {
         "entity_id": canonical_id,
@@ -76,6 +77,6 @@ def resolve_demo_social_identity(
             "confidence_summary": context.confidence_summary,
             "relationship_stage_hint": resolver.recommendation_context(canonical_id).relationship_stage_hint,
         },
-        "events": [event.payload for event in resolver.drain_events()],
+        "events": [event.payload for event in emitted],
     }
     return digest_payload
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime, timezone
 from typing import Any, Dict
 
+from .models import utcnow_iso
+
 DEFAULT_SCHEMA_VERSION = "0.1"
 try:
     from metaspn_schemas.core import DEFAULT_SCHEMA_VERSION as _SCHEMA_VERSION
@@ -22,8 +23,8 @@ class EmittedEvent:
 
 class EventFactory:
     @staticmethod
-    def _now() -> datetime:
-        return datetime.now(timezone.utc).replace(microsecond=0)
+    def _now() -> str:
+        return utcnow_iso()
 
     @staticmethod
     def entity_resolved(entity_id: str, resolver: str, confidence: float) -> EmittedEvent:
@@ -32,7 +33,7 @@ class EventFactory:
             payload={
                 "entity_id": entity_id,
                 "resolver": resolver,
-                "resolved_at": EventFactory._now().isoformat(),
+                "resolved_at": EventFactory._now(),
                 "confidence": confidence,
                 "schema_version": DEFAULT_SCHEMA_VERSION,
             },
@@ -45,7 +46,7 @@ class EventFactory:
             payload={
                 "entity_id": entity_id,
                 "merged_from": list(merged_from),
-                "merged_at": EventFactory._now().isoformat(),
+                "merged_at": EventFactory._now(),
                 "reason": reason,
                 "schema_version": DEFAULT_SCHEMA_VERSION,
             },
@@ -59,7 +60,7 @@ class EventFactory:
                 "entity_id": entity_id,
                 "alias": alias,
                 "alias_type": alias_type,
-                "added_at": EventFactory._now().isoformat(),
+                "added_at": EventFactory._now(),
                 "schema_version": DEFAULT_SCHEMA_VERSION,
             },
         )
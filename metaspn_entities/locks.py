@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Hashable, Iterable, Iterator
+
+DEFAULT_LOCK_STRIPES = 64
+
+
+class StripedLock:
+    """Fixed pool of re-entrant locks shared by hashing keys onto stripes.
+
+    Equal keys always map to the same lock, so work on one key serializes
+    while unrelated keys mostly land on different stripes and proceed in
+    parallel. ``hold`` takes the stripes of several keys in index order, so
+    overlapping key sets cannot deadlock each other.
+    """
+
+    def __init__(self, stripes: int = DEFAULT_LOCK_STRIPES) -> None:
+        if stripes < 1:
+            raise ValueError("stripes must be positive")
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def stripe(self, key: Hashable) -> int:
+        return hash(key) % len(self._locks)
+
+    @contextmanager
+    def hold(self, keys: Iterable[Hashable]) -> Iterator[None]:
+        locks = [self._locks[index] for index in sorted({self.stripe(key) for key in keys})]
+        acquired = 0
+        try:
+            for lock in locks:
+                lock.acquire()
+                acquired += 1
+            yield
+        finally:
+            for lock in reversed(locks[:acquired]):
+                lock.release()
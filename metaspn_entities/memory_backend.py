@@ -0,0 +1,625 @@
+from __future__ import annotations
+
+import functools
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .models import EntityStatus, utcnow_iso
+from .snapshot import (
+    SNAPSHOT_COLUMNS,
+    SNAPSHOT_TABLES,
+    read_snapshot,
+    read_snapshot_stream,
+    write_snapshot_json,
+    write_snapshot_stream,
+)
+from .store import IdentifierKey
+
+_MISSING = object()
+
+
+def _locked(method: Callable[..., Any]) -> Callable[..., Any]:
+    # Reads wait for an open transaction, so other threads never see uncommitted or rolled-back rows.
+    @functools.wraps(method)
+    def locked(self: "InMemoryEntityStore", *args: Any, **kwargs: Any) -> Any:
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+
+    return locked
+
+
+class InMemoryEntityStore:
+    """Dict-backed entity store with the same interface as ``SQLiteEntityStore``.
+
+    Rows are plain dicts indexed the way the SQLite tables are: aliases and
+    identifiers by ``(identifier_type, normalized_value)``, aliases by entity,
+    redirects by both ends. Every write runs in a transaction backed by an undo
+    journal, so rollback and nested savepoints behave like the SQLite store.
+    Writers are serialized by a lock held for the whole transaction, and reads
+    take the same lock, so they only observe committed state from other
+    threads. Nothing is persisted until ``flush_to`` copies the state into a
+    SQLite store.
+    """
+
+    concurrent_reads = False
+
+    def __init__(self) -> None:
+        self._entities: Dict[str, Dict[str, Any]] = {}
+        self._identifiers: Dict[IdentifierKey, Dict[str, Any]] = {}
+        self._aliases: Dict[IdentifierKey, Dict[str, Any]] = {}
+        self._aliases_by_entity: Dict[str, Set[IdentifierKey]] = {}
+        self._redirects: Dict[str, Dict[str, Any]] = {}
+        self._redirects_by_target: Dict[str, Set[str]] = {}
+        self._merge_records: Dict[int, Dict[str, Any]] = {}
+        self._latest_merge_by_from: Dict[str, int] = {}
+        self._merges_by_from: Dict[str, Set[int]] = {}
+        self._merges_by_to: Dict[str, Set[int]] = {}
+        self._next_merge_id = 1
+        self._checkpoints: Dict[str, int] = {}
+        self._journal: List[Callable[[], None]] = []
+        self._savepoints: List[int] = []
+        self._write_lock = threading.RLock()
+        self._writer_thread: Optional[int] = None
+
+    @classmethod
+    def load_from(cls, store: Any, *, chunk_size: int = 1000) -> "InMemoryEntityStore":
+        """Build an in-memory copy of ``store`` (typically a ``SQLiteEntityStore``)."""
+        memory = cls()
+        memory.load_snapshot_rows(store.iter_snapshot_rows(chunk_size), chunk_size=chunk_size)
+        return memory
+
+    def flush_to(self, store: Any, *, chunk_size: int = 1000) -> Dict[str, int]:
+        """Bulk load this store's rows into an empty ``store``; returns per-table row counts."""
+        return store.load_snapshot_rows(self.iter_snapshot_rows(chunk_size), chunk_size=chunk_size)
+
+    def close(self) -> None:
+        pass
+
+    @contextmanager
+    def transaction(self) -> Iterator["InMemoryEntityStore"]:
+        """Group writes into one unit of work; nested blocks act as savepoints."""
+        with self._write_lock:
+            outermost = not self._savepoints
+            self._savepoints.append(len(self._journal))
+            if outermost:
+                self._writer_thread = threading.get_ident()
+            try:
+                yield self
+            except BaseException:
+                self._rollback_to(self._savepoints.pop())
+                if outermost:
+                    self._writer_thread = None
+                raise
+            self._savepoints.pop()
+            if outermost:
+                self._writer_thread = None
+                self._journal.clear()
+
+    def reserve_identifiers(self, keys: Iterable[IdentifierKey]) -> None:
+        # The transaction's single writer lock already covers every key.
+        pass
+
+    def _in_own_transaction(self) -> bool:
+        return bool(self._savepoints) and self._writer_thread == threading.get_ident()
+
+    def _rollback_to(self, mark: int) -> None:
+        while len(self._journal) > mark:
+            self._journal.pop()()
+
+    def _put(self, table: Dict[Any, Any], key: Any, row: Any) -> None:
+        previous = table.get(key, _MISSING)
+        if previous is _MISSING:
+            self._journal.append(lambda: table.pop(key, None))
+        else:
+            self._journal.append(lambda: table.__setitem__(key, previous))
+        table[key] = row
+
+    def _delete(self, table: Dict[Any, Any], key: Any) -> None:
+        previous = table.pop(key, _MISSING)
+        if previous is not _MISSING:
+            self._journal.append(lambda: table.__setitem__(key, previous))
+
+    def _index_add(self, index: Dict[Any, Set[Any]], owner: Any, member: Any) -> None:
+        members = index.setdefault(owner, set())
+        if member not in members:
+            members.add(member)
+            self._journal.append(lambda: members.discard(member))
+
+    def _index_remove(self, index: Dict[Any, Set[Any]], owner: Any, member: Any) -> None:
+        members = index.get(owner)
+        if members is not None and member in members:
+            members.discard(member)
+            self._journal.append(lambda: members.add(member))
+
+    def create_entity(self, entity_type: str, entity_id: Optional[str] = None) -> str:
+        return self.create_entities([entity_type], None if entity_id is None else [entity_id])[0]
+
+    def create_entities(self, entity_types: Sequence[str], entity_ids: Optional[Sequence[str]] = None) -> List[str]:
+        now = utcnow_iso()
+        entity_ids = list(entity_ids) if entity_ids is not None else [f"ent_{uuid.uuid4().hex}" for _ in entity_types]
+        with self.transaction():
+            for entity_id, entity_type in zip(entity_ids, entity_types):
+                if entity_id in self._entities:
+                    raise ValueError(f"Entity already exists: {entity_id}")
+                self._put(
+                    self._entities,
+                    entity_id,
+                    {"entity_id": entity_id, "entity_type": entity_type, "created_at": now, "status": EntityStatus.ACTIVE},
+                )
+        return entity_ids
+
+    @_locked
+    def get_checkpoint(self, name: str) -> Optional[int]:
+        return self._checkpoints.get(name)
+
+    def set_checkpoint(self, name: str, seq: int) -> None:
+        with self.transaction():
+            self._put(self._checkpoints, name, seq)
+
+    @_locked
+    def get_entity(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        row = self._entities.get(entity_id)
+        return dict(row) if row is not None else None
+
+    @_locked
+    def ensure_entity(self, entity_id: str) -> None:
+        if entity_id not in self._entities:
+            raise ValueError(f"Unknown entity_id: {entity_id}")
+
+    def set_entity_status(self, entity_id: str, status: str) -> None:
+        with self.transaction():
+            row = self._entities.get(entity_id)
+            if row is not None:
+                self._put(self._entities, entity_id, {**row, "status": status})
+
+    @_locked
+    def canonical_entity_id(self, entity_id: str) -> str:
+        current = entity_id
+        visited = set()
+        while True:
+            if current in visited:
+                raise ValueError(f"Cycle detected in merge redirects for {entity_id}")
+            visited.add(current)
+            redirect = self._redirects.get(current)
+            if redirect is None:
+                return current
+            current = redirect["to_entity_id"]
+
+    @_locked
+    def find_alias(self, identifier_type: str, normalized_value: str) -> Optional[Dict[str, Any]]:
+        row = self._aliases.get((identifier_type, normalized_value))
+        return dict(row) if row is not None else None
+
+    @_locked
+    def find_aliases(self, keys: Iterable[IdentifierKey]) -> Dict[IdentifierKey, Dict[str, Any]]:
+        return {key: dict(self._aliases[key]) for key in keys if key in self._aliases}
+
+    @_locked
+    def get_identifier(self, identifier_type: str, normalized_value: str) -> Optional[Dict[str, Any]]:
+        row = self._identifiers.get((identifier_type, normalized_value))
+        return dict(row) if row is not None else None
+
+    @_locked
+    def get_identifiers(self, keys: Iterable[IdentifierKey]) -> Dict[IdentifierKey, Dict[str, Any]]:
+        return {key: dict(self._identifiers[key]) for key in keys if key in self._identifiers}
+
+    def upsert_identifier(
+        self,
+        identifier_type: str,
+        value: str,
+        normalized_value: str,
+        confidence: float,
+        provenance: Optional[str],
+    ) -> None:
+        now = utcnow_iso()
+        if self._in_own_transaction():
+            self._upsert_identifier_row(identifier_type, value, normalized_value, confidence, provenance, now)
+            return
+        with self.transaction():
+            self._upsert_identifier_row(identifier_type, value, normalized_value, confidence, provenance, now)
+
+    def upsert_identifiers(
+        self,
+        rows: Sequence[Tuple[str, str, str, float, Optional[str]]],
+    ) -> Dict[IdentifierKey, Dict[str, Any]]:
+        now = utcnow_iso()
+        touched: Dict[IdentifierKey, None] = {}
+        with self.transaction():
+            for identifier_type, value, normalized_value, confidence, provenance in rows:
+                self._upsert_identifier_row(identifier_type, value, normalized_value, confidence, provenance, now)
+                touched[(identifier_type, normalized_value)] = None
+        return {key: dict(self._identifiers[key]) for key in touched}
+
+    def _upsert_identifier_row(
+        self,
+        identifier_type: str,
+        value: str,
+        normalized_value: str,
+        confidence: float,
+        provenance: Optional[str],
+        now: str,
+    ) -> None:
+        key = (identifier_type, normalized_value)
+        existing = self._identifiers.get(key)
+        if existing is None:
+            row = {
+                "identifier_type": identifier_type,
+                "value": value,
+                "normalized_value": normalized_value,
+                "confidence": float(confidence),
+                "first_seen_at": now,
+                "last_seen_at": now,
+                "provenance": provenance,
+            }
+        else:
+            row = {
+                **existing,
+                "value": value,
+                "confidence": max(existing["confidence"], float(confidence)),
+                "last_seen_at": now,
+                "provenance": provenance or existing["provenance"],
+            }
+        self._put(self._identifiers, key, row)
+
+    def add_alias(
+        self,
+        identifier_type: str,
+        normalized_value: str,
+        entity_id: str,
+        confidence: float,
+        caused_by: str,
+        provenance: Optional[str] = None,
+    ) -> Tuple[bool, Optional[str]]:
+        key = (identifier_type, normalized_value)
+        with self.transaction():
+            canonical_target = self.canonical_entity_id(entity_id)
+            existing = self._aliases.get(key)
+            if existing is None:
+                self._insert_alias(key, canonical_target, confidence, caused_by, provenance, utcnow_iso())
+                return True, None
+            existing_entity = self.canonical_entity_id(existing["entity_id"])
+            if existing_entity != canonical_target:
+                return False, existing_entity
+            self._put(
+                self._aliases,
+                key,
+                {
+                    **existing,
+                    "confidence": max(existing["confidence"], float(confidence)),
+                    "provenance": provenance or existing["provenance"],
+                },
+            )
+        return False, None
+
+    def insert_aliases(self, rows: Sequence[Tuple[str, str, str, float, str, Optional[str]]]) -> None:
+        now = utcnow_iso()
+        with self.transaction():
+            for identifier_type, normalized_value, entity_id, confidence, caused_by, provenance in rows:
+                key = (identifier_type, normalized_value)
+                if key in self._aliases:
+                    raise ValueError(f"Alias already exists: {identifier_type}:{normalized_value}")
+                self._insert_alias(key, entity_id, confidence, caused_by, provenance, now)
+
+    def _insert_alias(
+        self,
+        key: IdentifierKey,
+        entity_id: str,
+        confidence: float,
+        caused_by: str,
+        provenance: Optional[str],
+        created_at: str,
+    ) -> None:
+        self._put(
+            self._aliases,
+            key,
+            {
+                "identifier_type": key[0],
+                "normalized_value": key[1],
+                "entity_id": entity_id,
+                "confidence": float(confidence),
+                "created_at": created_at,
+                "caused_by": caused_by,
+                "provenance": provenance,
+            },
+        )
+        self._index_add(self._aliases_by_entity, entity_id, key)
+
+    def reassign_aliases(self, from_entity_id: str, to_entity_id: str) -> None:
+        with self.transaction():
+            for key in list(self._aliases_by_entity.get(from_entity_id, ())):
+                self._put(self._aliases, key, {**self._aliases[key], "entity_id": to_entity_id})
+                self._index_remove(self._aliases_by_entity, from_entity_id, key)
+                self._index_add(self._aliases_by_entity, to_entity_id, key)
+
+    @_locked
+    def get_redirect_target(self, from_entity_id: str) -> Optional[str]:
+        redirect = self._redirects.get(from_entity_id)
+        return str(redirect["to_entity_id"]) if redirect is not None else None
+
+    @_locked
+    def get_redirect_origin(self, from_entity_id: str) -> Optional[str]:
+        """Return the entity the active redirect was originally merged into."""
+        if from_entity_id not in self._redirects:
+            return None
+        merge_id = self._latest_merge_by_from.get(from_entity_id)
+        if merge_id is None:
+            return self.get_redirect_target(from_entity_id)
+        return str(self._merge_records[merge_id]["to_entity_id"])
+
+    def remove_redirect(self, from_entity_id: str) -> None:
+        with self.transaction():
+            redirect = self._redirects.get(from_entity_id)
+            if redirect is not None:
+                self._delete(self._redirects, from_entity_id)
+                self._index_remove(self._redirects_by_target, redirect["to_entity_id"], from_entity_id)
+
+    def _put_redirect(self, row: Dict[str, Any]) -> None:
+        from_entity_id = row["from_entity_id"]
+        previous = self._redirects.get(from_entity_id)
+        if previous is not None:
+            self._index_remove(self._redirects_by_target, previous["to_entity_id"], from_entity_id)
+        self._put(self._redirects, from_entity_id, row)
+        self._index_add(self._redirects_by_target, row["to_entity_id"], from_entity_id)
+
+    def _put_merge_record(self, row: Dict[str, Any]) -> None:
+        merge_id = int(row["merge_id"])
+        self._put(self._merge_records, merge_id, row)
+        self._index_add(self._merges_by_from, row["from_entity_id"], merge_id)
+        self._index_add(self._merges_by_to, row["to_entity_id"], merge_id)
+        latest = self._latest_merge_by_from.get(row["from_entity_id"])
+        if latest is None or merge_id > latest:
+            self._put(self._latest_merge_by_from, row["from_entity_id"], merge_id)
+        if merge_id >= self._next_merge_id:
+            previous_next = self._next_merge_id
+            self._journal.append(lambda: setattr(self, "_next_merge_id", previous_next))
+            self._next_merge_id = merge_id + 1
+
+    def merge_entities(self, from_entity_id: str, to_entity_id: str, reason: str, caused_by: str) -> int:
+        timestamp = utcnow_iso()
+        with self.transaction():
+            from_canonical = self.canonical_entity_id(from_entity_id)
+            to_canonical = self.canonical_entity_id(to_entity_id)
+            if from_canonical == to_canonical:
+                raise ValueError("Entities are already merged")
+
+            # Keep redirects one hop deep, exactly like the SQLite store.
+            for member in list(self._redirects_by_target.get(from_canonical, ())):
+                self._put_redirect({**self._redirects[member], "to_entity_id": to_canonical})
+            self._put_redirect(
+                {
+                    "from_entity_id": from_canonical,
+                    "to_entity_id": to_canonical,
+                    "timestamp": timestamp,
+                    "reason": reason,
+                    "caused_by": caused_by,
+                }
+            )
+            self.set_entity_status(from_canonical, EntityStatus.MERGED)
+            self.set_entity_status(to_canonical, EntityStatus.ACTIVE)
+            merge_id = self._next_merge_id
+            self._put_merge_record(
+                {
+                    "merge_id": merge_id,
+                    "from_entity_id": from_canonical,
+                    "to_entity_id": to_canonical,
+                    "reason": reason,
+                    "timestamp": timestamp,
+                    "caused_by": caused_by,
+                }
+            )
+        return merge_id
+
+    @_locked
+    def list_cluster_entity_ids(self, entity_id: str) -> List[str]:
+        return sorted(self._cluster(self.canonical_entity_id(entity_id)))
+
+    def _cluster(self, canonical_id: str) -> List[str]:
+        members = [canonical_id]
+        seen = {canonical_id}
+        for member in members:
+            for child in self._redirects_by_target.get(member, ()):
+                if child not in seen:
+                    seen.add(child)
+                    members.append(child)
+        return members
+
+    def _cluster_alias_keys(self, entity_id: str) -> List[IdentifierKey]:
+        keys: List[IdentifierKey] = []
+        for member in self._cluster(self.canonical_entity_id(entity_id)):
+            keys.extend(self._aliases_by_entity.get(member, ()))
+        return sorted(keys)
+
+    @_locked
+    def list_aliases_for_entity(self, entity_id: str) -> List[Dict[str, Any]]:
+        return [
+            {
+                "identifier_type": row["identifier_type"],
+                "normalized_value": row["normalized_value"],
+                "entity_id": row["entity_id"],
+                "confidence": row["confidence"],
+            }
+            for row in (self._aliases[key] for key in self._cluster_alias_keys(entity_id))
+        ]
+
+    @_locked
+    def iter_identifiers_for_entity(self, entity_id: str) -> Iterable[Dict[str, Any]]:
+        return [
+            {
+                "identifier_type": row["identifier_type"],
+                "value": row["value"],
+                "normalized_value": row["normalized_value"],
+                "confidence": row["confidence"],
+            }
+            for row in (self._identifiers.get(key) for key in self._cluster_alias_keys(entity_id))
+            if row is not None
+        ]
+
+    @_locked
+    def list_identifier_records_for_entity(self, entity_id: str) -> List[Dict[str, Any]]:
+        return [
+            dict(self._identifiers[key])
+            for key in self._cluster_alias_keys(entity_id)
+            if key in self._identifiers
+        ]
+
+    @_locked
+    def list_merge_history(self, entity_ids: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        if entity_ids is None:
+            merge_ids: Iterable[int] = self._merge_records
+        else:
+            merge_ids = set()
+            for entity_id in entity_ids:
+                merge_ids.update(self._merges_by_from.get(entity_id, ()))
+                merge_ids.update(self._merges_by_to.get(entity_id, ()))
+        return [dict(self._merge_records[merge_id]) for merge_id in sorted(merge_ids)]
+
+    @_locked
+    def list_merge_lineage(self, entity_id: str) -> List[Dict[str, Any]]:
+        merge_ids: Set[int] = set()
+        pending = [entity_id]
+        seen = {entity_id}
+        while pending:
+            target = pending.pop()
+            for merge_id in self._merges_by_to.get(target, ()):
+                merge_ids.add(merge_id)
+                source = self._merge_records[merge_id]["from_entity_id"]
+                if source not in seen:
+                    seen.add(source)
+                    pending.append(source)
+        return [dict(self._merge_records[merge_id]) for merge_id in sorted(merge_ids)]
+
+    def iter_snapshot_rows(self, chunk_size: int = 1000) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        # chunk_size is accepted for interface parity; rows are already in memory.
+        with self._write_lock:
+            tables = {
+                "entities": list(self._entities.values()),
+                "identifiers": list(self._identifiers.values()),
+                "aliases": list(self._aliases.values()),
+                "merge_records": [self._merge_records[merge_id] for merge_id in sorted(self._merge_records)],
+                "entity_redirects": list(self._redirects.values()),
+            }
+        for table in SNAPSHOT_TABLES:
+            for row in tables[table]:
+                yield table, dict(row)
+
+    def export_snapshot(self, output_path: str) -> None:
+        write_snapshot_json(self.iter_snapshot_rows(), output_path)
+
+    def export_snapshot_stream(
+        self,
+        output_path: str,
+        *,
+        chunk_size: int = 1000,
+        compression: Optional[str] = None,
+    ) -> Dict[str, int]:
+        return write_snapshot_stream(
+            self.iter_snapshot_rows(chunk_size),
+            output_path,
+            chunk_size=chunk_size,
+            compression=compression,
+        )
+
+    def import_snapshot_stream(self, input_path: str, *, chunk_size: int = 1000) -> Dict[str, int]:
+        self._ensure_empty_for_import()
+        return self.load_snapshot_rows(read_snapshot_stream(input_path), chunk_size=chunk_size)
+
+    def import_snapshot(self, input_path: str, *, chunk_size: int = 1000) -> Dict[str, int]:
+        """Restore an empty store from ``export_snapshot`` or ``export_snapshot_stream`` output."""
+        self._ensure_empty_for_import()
+        return self.load_snapshot_rows(read_snapshot(input_path), chunk_size=chunk_size)
+
+    def _is_empty(self) -> bool:
+        return not (self._entities or self._identifiers or self._aliases or self._merge_records or self._redirects)
+
+    def _ensure_empty_for_import(self) -> None:
+        tables = {
+            "entities": self._entities,
+            "identifiers": self._identifiers,
+            "aliases": self._aliases,
+            "merge_records": self._merge_records,
+            "entity_redirects": self._redirects,
+        }
+        for table in SNAPSHOT_TABLES:
+            if tables[table]:
+                raise ValueError(f"Snapshot import requires an empty store; {table} has rows")
+
+    def load_snapshot_rows(
+        self,
+        rows: Iterable[Tuple[str, Dict[str, Any]]],
+        *,
+        chunk_size: int = 1000,
+    ) -> Dict[str, int]:
+        """Insert ``(table, row)`` pairs in one transaction.
+
+        A load into an empty store journals a single entry that empties the
+        tables again on rollback, and drops the per-row undo entries every
+        ``chunk_size`` rows, so the journal stays bounded however many rows
+        are loaded.
+        """
+        counts = {table: 0 for table in SNAPSHOT_TABLES}
+        with self.transaction():
+            mark: Optional[int] = None
+            if self._is_empty():
+                next_merge_id = self._next_merge_id
+                self._journal.append(lambda: self._clear_rows(next_merge_id))
+                mark = len(self._journal)
+            for position, (table, row) in enumerate(rows, start=1):
+                columns = SNAPSHOT_COLUMNS.get(table)
+                if columns is None:
+                    raise ValueError(f"Unknown snapshot table: {table}")
+                unknown = set(row) - set(columns)
+                if unknown:
+                    raise ValueError(f"Unknown columns for {table}: {sorted(unknown)}")
+                record = {column: row.get(column) for column in columns}
+                self._load_row(table, record)
+                counts[table] += 1
+                if mark is not None and position % chunk_size == 0:
+                    del self._journal[mark:]
+            if mark is not None:
+                del self._journal[mark:]
+        return counts
+
+    def _clear_rows(self, next_merge_id: int) -> None:
+        for table in (
+            self._entities,
+            self._identifiers,
+            self._aliases,
+            self._aliases_by_entity,
+            self._redirects,
+            self._redirects_by_target,
+            self._merge_records,
+            self._latest_merge_by_from,
+            self._merges_by_from,
+            self._merges_by_to,
+        ):
+            table.clear()
+        self._next_merge_id = next_merge_id
+
+    def _load_row(self, table: str, row: Dict[str, Any]) -> None:
+        if table == "entities":
+            if row["entity_id"] in self._entities:
+                raise ValueError(f"Duplicate entity_id: {row['entity_id']}")
+            self._put(self._entities, row["entity_id"], row)
+        elif table == "identifiers":
+            key = (row["identifier_type"], row["normalized_value"])
+            if key in self._identifiers:
+                raise ValueError(f"Duplicate identifier: {key[0]}:{key[1]}")
+            self._put(self._identifiers, key, row)
+        elif table == "aliases":
+            key = (row["identifier_type"], row["normalized_value"])
+            if key in self._aliases:
+                raise ValueError(f"Alias already exists: {key[0]}:{key[1]}")
+            self._put(self._aliases, key, row)
+            self._index_add(self._aliases_by_entity, row["entity_id"], key)
+        elif table == "merge_records":
+            if row["merge_id"] is None:
+                row["merge_id"] = self._next_merge_id
+            if int(row["merge_id"]) in self._merge_records:
+                raise ValueError(f"Duplicate merge_id: {row['merge_id']}")
+            self._put_merge_record(row)
+        else:
+            if row["from_entity_id"] in self._redirects:
+                raise ValueError(f"Duplicate redirect for {row['from_entity_id']}")
+            self._put_redirect(row)
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .schema import (
+    IDENTIFIER_INDEXES,
+    INTEGER_KEY_SCHEMA_SQL,
+    INTEGER_KEY_SECONDARY_INDEXES,
+    INTEGER_KEY_TABLES_SQL,
+    INTEGER_KEY_VIEWS_SQL,
+    KEYED_TABLES,
+    SCHEMA_SQL,
+    SECONDARY_INDEXES,
+    change_log_statements,
+    detect_change_log,
+    detect_epoch_timestamps,
+    detect_integer_keys,
+    epoch_timestamp_schema,
+)
+from .snapshot import SNAPSHOT_COLUMNS, SNAPSHOT_TABLES
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema version step; ``statements(integer_keys)`` returns idempotent SQL for that layout."""
+
+    version: int
+    description: str
+    statements: Callable[[bool], Sequence[str]]
+
+
+@dataclass(frozen=True)
+class MigrationProgress:
+    version: int
+    description: str
+    step: int
+    steps: int
+    elapsed_seconds: float
+
+
+ProgressCallback = Callable[[MigrationProgress], None]
+
+
+def _indexes(text_names: Sequence[str], keyed_names: Sequence[str]) -> Callable[[bool], List[str]]:
+    def statements(integer_keys: bool) -> List[str]:
+        if integer_keys:
+            return [INTEGER_KEY_SECONDARY_INDEXES[name] for name in keyed_names]
+        return [SECONDARY_INDEXES[name] for name in text_names]
+
+    return statements
+
+
+# Files created before versioning report ``user_version`` 0 and have the
+# version 1 tables, so upgrades start from there.
+BASELINE_VERSION = 1
+
+MIGRATIONS: Tuple[Migration, ...] = (
+    Migration(
+        2,
+        "entity reference indexes",
+        _indexes(
+            (
+                "idx_aliases_entity_id",
+                "idx_entity_redirects_to_entity_id",
+                "idx_merge_records_from_entity_id",
+                "idx_merge_records_to_entity_id",
+            ),
+            (
+                "idx_alias_keys_entity_key",
+                "idx_redirect_keys_to_entity_key",
+                "idx_merge_record_keys_from_entity_key",
+                "idx_merge_record_keys_to_entity_key",
+            ),
+        ),
+    ),
+    Migration(3, "identifier recency index", _indexes(tuple(IDENTIFIER_INDEXES), tuple(IDENTIFIER_INDEXES))),
+)
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Return the schema version recorded in the database header."""
+    version = int(conn.execute("PRAGMA user_version").fetchone()[0])
+    if version == 0 and detect_integer_keys(conn) is not None:
+        return BASELINE_VERSION
+    return version
+
+
+def initialize_schema(conn: sqlite3.Connection, *, integer_keys: bool, epoch_timestamps: bool) -> None:
+    """Create the current schema, indexes included, in an empty database."""
+    schema_sql = INTEGER_KEY_SCHEMA_SQL if integer_keys else SCHEMA_SQL
+    if epoch_timestamps:
+        schema_sql = epoch_timestamp_schema(schema_sql)
+    indexes = INTEGER_KEY_SECONDARY_INDEXES if integer_keys else SECONDARY_INDEXES
+    conn.executescript(
+        "BEGIN;\n"
+        + schema_sql
+        + "".join(f"{index_sql};\n" for index_sql in indexes.values())
+        + f"PRAGMA user_version = {SCHEMA_VERSION};\nCOMMIT;"
+    )
+
+
+def pending_migrations(conn: sqlite3.Connection, target: int = SCHEMA_VERSION) -> List[Migration]:
+    current = schema_version(conn)
+    return [migration for migration in MIGRATIONS if current < migration.version <= target]
+
+
+def apply_migrations(
+    conn: sqlite3.Connection,
+    *,
+    target: int = SCHEMA_VERSION,
+    progress: Optional[ProgressCallback] = None,
+    pause_seconds: float = 0.0,
+) -> int:
+    """Upgrade the database behind ``conn`` to ``target`` and return the resulting version.
+
+    Every statement runs in its own short write transaction and a step's
+    version bump commits with its last statement, so other connections keep
+    reading and writing in between (use WAL to keep readers going during an
+    index build). ``pause_seconds`` sleeps after each statement so writers
+    polling for the lock get a turn. Statements are idempotent, so an
+    interrupted run can simply be repeated.
+    """
+    if conn.in_transaction:
+        raise RuntimeError("apply_migrations needs a connection without an open transaction")
+    current = schema_version(conn)
+    if current > SCHEMA_VERSION:
+        raise ValueError(f"Database schema version {current} is newer than this library ({SCHEMA_VERSION})")
+    integer_keys = bool(detect_integer_keys(conn))
+    for migration in pending_migrations(conn, target):
+        started = time.perf_counter()
+        statements = list(migration.statements(integer_keys))
+        for step, statement in enumerate(statements, start=1):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if schema_version(conn) >= migration.version:
+                    # Another connection finished this step while we waited for the lock.
+                    conn.rollback()
+                    break
+                conn.execute(statement)
+                if step == len(statements):
+                    conn.execute(f"PRAGMA user_version = {migration.version}")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            if pause_seconds:
+                time.sleep(pause_seconds)
+            if progress is not None:
+                progress(
+                    MigrationProgress(
+                        migration.version,
+                        migration.description,
+                        step,
+                        len(statements),
+                        time.perf_counter() - started,
+                    )
+                )
+    return schema_version(conn)
+
+
+def migrate(
+    db_path: str,
+    *,
+    target: int = SCHEMA_VERSION,
+    progress: Optional[ProgressCallback] = None,
+    timeout: float = 30.0,
+    pause_seconds: float = 0.1,
+) -> int:
+    """Upgrade the store file at ``db_path`` in place, alongside any open stores.
+
+    ``timeout`` is how long each statement waits for other writers to release
+    the database; ``pause_seconds`` is the gap left for them between
+    statements (SQLite's busy handler polls at up to 100 ms intervals).
+    Returns the resulting schema version.
+    """
+    conn = sqlite3.connect(db_path, timeout=timeout, isolation_level=None)
+    try:
+        if detect_integer_keys(conn) is None:
+            raise ValueError(f"{db_path} is not a metaspn-entities store")
+        return apply_migrations(conn, target=target, progress=progress, pause_seconds=pause_seconds)
+    finally:
+        conn.close()
+
+
+def migrate_to_integer_keys(
+    db_path: str,
+    *,
+    vacuum: bool = True,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, int]:
+    """Convert a text-id store file to the integer-key storage mode in place.
+
+    Pending version steps run first. Entities keep their ``ent_...`` ids and
+    creation order; aliases, merge records and redirects are rewritten to
+    reference ``entities.entity_key``. The conversion runs in one transaction
+    and is verified by row counts, so a reference to a missing entity rolls
+    everything back with ``ValueError``. ``vacuum`` reclaims the space freed
+    by the text-id tables afterwards.
+
+    Returns the number of rows per table; already converted files are left
+    untouched and report their current counts. Unlike ``migrate`` this is an
+    offline operation: close every store using the file first.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        mode = detect_integer_keys(conn)
+        if mode is None:
+            raise ValueError(f"{db_path} is not a metaspn-entities store")
+        apply_migrations(conn, progress=progress)
+        if not mode:
+            _convert(conn)
+            if vacuum:
+                conn.execute("VACUUM")
+        return {table: conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0] for table in SNAPSHOT_TABLES}
+    finally:
+        conn.close()
+
+
+def _convert(conn: sqlite3.Connection) -> None:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        expected = {table: conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0] for table in SNAPSHOT_TABLES}
+        tables_sql = INTEGER_KEY_TABLES_SQL
+        if detect_epoch_timestamps(conn):
+            tables_sql = epoch_timestamp_schema(tables_sql)
+        # Capture triggers are dropped with the renamed tables and recreated
+        # on the keyed ones after the copy, which is not itself logged.
+        change_log = detect_change_log(conn)
+        # Indexes move with the renamed tables and are dropped with them below.
+        for table in ("entities",) + tuple(KEYED_TABLES):
+            conn.execute(f"ALTER TABLE {table} RENAME TO legacy_{table}")
+        # The identifiers table does not reference entities and stays as is.
+        _execute_script(conn, tables_sql)
+
+        entity_columns = ", ".join(SNAPSHOT_COLUMNS["entities"])
+        conn.execute(
+            f"INSERT INTO entities({entity_columns}) SELECT {entity_columns} FROM legacy_entities ORDER BY rowid"
+        )
+        for table, (base, key_columns) in KEYED_TABLES.items():
+            targets = []
+            values = []
+            joins = []
+            for column in SNAPSHOT_COLUMNS[table]:
+                key_column = key_columns.get(column)
+                targets.append(key_column or column)
+                if key_column is None:
+                    values.append(f"l.{column}")
+                    continue
+                alias = f"e{len(joins)}"
+                joins.append(f"JOIN entities {alias} ON {alias}.entity_id = l.{column}")
+                values.append(f"{alias}.entity_key")
+            conn.execute(
+                f"INSERT INTO {base}({', '.join(targets)}) "
+                f"SELECT {', '.join(values)} FROM legacy_{table} l {' '.join(joins)} ORDER BY l.rowid"
+            )
+            migrated = conn.execute(f"SELECT count(*) FROM {base}").fetchone()[0]
+            if migrated != expected[table]:
+                raise ValueError(
+                    f"{expected[table] - migrated} {table} row(s) reference entities that do not exist; "
+                    "repair them before migrating"
+                )
+
+        for table in ("entities",) + tuple(KEYED_TABLES):
+            conn.execute(f"DROP TABLE legacy_{table}")
+        _execute_script(conn, INTEGER_KEY_VIEWS_SQL)
+        for index_sql in INTEGER_KEY_SECONDARY_INDEXES.values():
+            conn.execute(index_sql)
+        if change_log:
+            for statement in change_log_statements(True):
+                conn.execute(statement)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _execute_script(conn: sqlite3.Connection, script: str) -> None:
+    # ``executescript`` would commit the open transaction first.
+    for statement in script.split(";"):
+        if statement.strip():
+            conn.execute(statement)
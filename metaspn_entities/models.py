@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+import copy
+import threading
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
 
 
 DEFAULT_MATCH_CONFIDENCE = 0.95
 DEFAULT_NEW_ENTITY_CONFIDENCE = 0.6
+# Context keys ``resolve`` and ``resolve_many`` read; the rest of a context is ignored.
+RESOLVE_CONTEXT_KEYS = ("confidence", "provenance", "entity_type", "caused_by")
 
 
 class EntityStatus:
@@ -60,14 +67,137 @@ class MergeRecord:
     caused_by: str
 
 
+@dataclass(frozen=True)
+class CompactionReport:
+    """Outcome of ``SQLiteEntityStore.compact``; pass ``last_merge_id`` to the next incremental run."""
+
+    entities_scanned: int
+    aliases_reassigned: int
+    redirects_flattened: int
+    transactions: int
+    last_merge_id: int
+    elapsed_seconds: float
+
+
+@dataclass(frozen=True)
+class ReplayReport:
+    """Outcome of ``EntityResolver.replay_operation_log``; ``last_seq`` is the checkpoint it stored."""
+
+    operations: int
+    transactions: int
+    since_seq: int
+    last_seq: int
+    elapsed_seconds: float
+
+
+class LazyIdentifiers(Sequence[Dict[str, Any]]):
+    """Read-only sequence of matched identifiers, loaded from the store on first access.
+
+    Compares equal to a list with the same items, and copies, deep copies
+    (``dataclasses.asdict``) and pickles as a plain list.
+    """
+
+    __slots__ = ("_loader", "_items")
+
+    def __init__(self, loader: Callable[[], Iterable[Dict[str, Any]]]) -> None:
+        self._loader: Optional[Callable[[], Iterable[Dict[str, Any]]]] = loader
+        self._items: Optional[List[Dict[str, Any]]] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._items is not None
+
+    def _load(self) -> List[Dict[str, Any]]:
+        if self._items is None:
+            assert self._loader is not None
+            self._items = list(self._loader())
+            self._loader = None
+        return self._items
+
+    def __getitem__(self, index):  # type: ignore[override]
+        return self._load()[index]
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._load())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, LazyIdentifiers):
+            other = other._load()
+        if not isinstance(other, (list, tuple)):
+            return NotImplemented
+        return self._load() == list(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"LazyIdentifiers({self._items!r})" if self.loaded else "LazyIdentifiers(<not loaded>)"
+
+    def __copy__(self) -> List[Dict[str, Any]]:
+        return list(self._load())
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> List[Dict[str, Any]]:
+        return copy.deepcopy(self._load(), memo)
+
+    def __reduce__(self):
+        return (list, (self._load(),))
+
+
+# How EntityResolver fills ``EntityResolution.matched_identifiers``.
+MATCHED_IDENTIFIER_MODES = ("eager", "lazy", "skip")
+
+
 @dataclass(frozen=True)
 class EntityResolution:
     entity_id: str
     confidence: float
     created_new_entity: bool
-    matched_identifiers: List[Dict[str, Any]] = field(default_factory=list)
+    matched_identifiers: Sequence[Dict[str, Any]] = field(default_factory=list)
+
+
+_clock = threading.local()
+
+
+def utcnow_epoch() -> int:
+    """Current UTC time in whole seconds, or the value pinned by an enclosing ``frozen_clock``."""
+    frozen = getattr(_clock, "frozen", None)
+    return int(time.time()) if frozen is None else frozen
+
+
+@lru_cache(maxsize=4096)
+def epoch_to_iso(seconds: int) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+
 
+def iso_to_epoch(value: str) -> int:
+    text = value.strip()
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
 
 
 def utcnow_iso() -> str:
-    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+    return epoch_to_iso(utcnow_epoch())
+
+
+@contextmanager
+def frozen_clock(at: Optional[int] = None) -> Iterator[int]:
+    """Read the clock once for a batch of writes on this thread.
+
+    Inside the block ``utcnow_epoch``/``utcnow_iso`` return ``at`` (default:
+    the current second). Nested blocks without ``at`` keep the outer value.
+    """
+    previous = getattr(_clock, "frozen", None)
+    if at is None and previous is not None:
+        yield previous
+        return
+    _clock.frozen = utcnow_epoch() if at is None else int(at)
+    try:
+        yield _clock.frozen
+    finally:
+        _clock.frozen = previous
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Sequence, Tuple
+
+OPERATION_LOG_FORMAT = "metaspn-entities-oplog"
+OPERATION_LOG_VERSION = 1
+OPERATIONS = ("resolve", "resolve_many", "add_alias", "merge_entities", "undo_merge")
+
+
+class OperationLog:
+    def __init__(self, path: str | Path, *, fsync: bool = False) -> None:
+        """Append-only record of resolver writes, one JSON object per line.
+
+        The first line is a header carrying the log's ``log_id``; every other
+        line is ``{"seq", "at", "op", "args", "created"}`` for one resolver
+        call: its inputs, the epoch second its writes were stamped with and
+        the entity ids it created. Records are written (and with ``fsync=True``
+        synced) right after the store commits, so the log never holds work
+        that did not commit. An existing file is reopened for appending after dropping a
+        partially written last line.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self.log_id, self.last_seq = _open_log(self.path)
+        self._handle = self.path.open("a", encoding="utf-8")
+
+    def append(self, operations: Sequence[Dict[str, Any]]) -> int:
+        """Number and write ``{"at", "op", "args", "created"}`` records; returns the last ``seq``."""
+        with self._lock:
+            if self._handle.closed:
+                raise ValueError(f"Operation log {self.path} is closed")
+            seq = self.last_seq
+            lines = []
+            for operation in operations:
+                seq += 1
+                lines.append(_dumps({"seq": seq, **operation}))
+            self._handle.write("\n".join(lines) + "\n")
+            self._handle.flush()
+            if self.fsync:
+                os.fsync(self._handle.fileno())
+            self.last_seq = seq
+            return seq
+
+    def close(self) -> None:
+        with self._lock:
+            self._handle.close()
+
+    def __enter__(self) -> "OperationLog":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def read_operation_log_header(path: str | Path) -> Dict[str, Any]:
+    with Path(path).open("rb") as handle:
+        return _parse_header(handle.readline(), path)
+
+
+def read_operation_log(path: str | Path, since_seq: int = 0) -> Iterator[Dict[str, Any]]:
+    """Yield the records after ``since_seq`` in order, skipping a partially written last line."""
+    with Path(path).open("rb") as handle:
+        _parse_header(handle.readline(), path)
+        previous = 0
+        for line in handle:
+            if not line.endswith(b"\n"):
+                return
+            record = json.loads(line)
+            seq = record.get("seq")
+            if not isinstance(seq, int) or seq <= previous:
+                raise ValueError(f"{path} has out-of-order operation seq {seq!r} after {previous}")
+            if record.get("op") not in OPERATIONS:
+                raise ValueError(f"{path} has unknown operation {record.get('op')!r} at seq {seq}")
+            previous = seq
+            if seq > since_seq:
+                yield record
+
+
+def _open_log(path: Path) -> Tuple[str, int]:
+    if not path.exists() or path.stat().st_size == 0:
+        return _write_header(path), 0
+    with path.open("rb+") as handle:
+        header = _parse_header(handle.readline(), path)
+        size = handle.seek(0, os.SEEK_END)
+        start, tail = _read_tail(handle, size)
+        complete = tail.rfind(b"\n") + 1
+        if start + complete < size:
+            handle.truncate(start + complete)
+        lines = tail[:complete].splitlines()
+    if start == 0 and len(lines) <= 1:
+        return str(header["log_id"]), 0
+    return str(header["log_id"]), int(json.loads(lines[-1])["seq"])
+
+
+def _read_tail(handle: BinaryIO, size: int) -> Tuple[int, bytes]:
+    # Read backwards until the tail holds a complete last line (two newlines) or the whole file.
+    block = 4096
+    while True:
+        start = max(0, size - block)
+        handle.seek(start)
+        data = handle.read(size - start)
+        if start == 0 or data.count(b"\n") >= 2:
+            return start, data
+        block *= 2
+
+
+def _write_header(path: Path) -> str:
+    log_id = uuid.uuid4().hex
+    header = {"format": OPERATION_LOG_FORMAT, "version": OPERATION_LOG_VERSION, "log_id": log_id}
+    with path.open("w", encoding="utf-8") as handle:
+        handle.write(_dumps(header) + "\n")
+    return log_id
+
+
+def _parse_header(line: bytes, path: Any) -> Dict[str, Any]:
+    try:
+        header = json.loads(line) if line.endswith(b"\n") else None
+    except ValueError:
+        header = None
+    if not isinstance(header, dict) or header.get("format") != OPERATION_LOG_FORMAT:
+        raise ValueError(f"{path} is not a metaspn-entities operation log")
+    if header.get("version") != OPERATION_LOG_VERSION:
+        raise ValueError(f"Unsupported operation log version: {header.get('version')!r}")
+    return header
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, sort_keys=True, separators=(",", ":"))
+
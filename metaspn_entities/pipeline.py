@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .adapter import SignalResolutionResult, resolve_normalized_social_signal, signal_identifier_keys
+from .models import EntityType
+from .resolver import EntityResolver
+from .sharded_backend import ShardedEntityStore, shard_for_key
+from .sinks import CallbackSink
+from .sqlite_backend import SQLiteEntityStore
+from .store import EntityStore
+
+DEFAULT_PIPELINE_BATCH_SIZE = 5_000
+# A write that finds the database locked past SQLite's busy timeout (or a WAL snapshot gone stale
+# under a merge) rolls back its envelope, which is retried after a jittered backoff.
+LOCK_RETRY_ATTEMPTS = 20
+LOCK_RETRY_DELAY_SECONDS = 0.01
+
+# (position, entity_id, confidence, events) for a resolved envelope, (position, None, None, error) for a failed one.
+_Outcome = Tuple[int, Optional[str], Optional[float], Any]
+
+_worker_resolver: Optional[EntityResolver] = None
+_worker_options: Dict[str, Any] = {}
+
+
+@dataclass(frozen=True)
+class IngestReport:
+    """Totals of one ``SignalIngestPipeline.run``; ``failed`` lists ``(position, error)`` per rejected envelope."""
+
+    signals: int
+    resolved: int
+    failed: Tuple[Tuple[int, str], ...]
+    batches: int
+    merges: int
+    reconciled: int
+    lock_retries: int
+    elapsed_seconds: float
+
+    @property
+    def signals_per_second(self) -> float:
+        return self.signals / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+class SignalIngestPipeline:
+    def __init__(
+        self,
+        path: str,
+        *,
+        processes: Optional[int] = None,
+        shard_count: Optional[int] = None,
+        batch_size: int = DEFAULT_PIPELINE_BATCH_SIZE,
+        default_entity_type: str = EntityType.PERSON,
+        caused_by: str = "m0-ingestion",
+        mp_context: Any = None,
+    ) -> None:
+        """Resolve streams of normalized social signals on a pool of worker processes.
+
+        ``path`` is a SQLite file, opened in WAL mode by every process, or a
+        ``ShardedEntityStore`` directory when ``shard_count`` is given. Each
+        batch of ``batch_size`` envelopes is partitioned by the primary
+        identifier ``resolve_normalized_social_signal`` would resolve, and each
+        worker runs its partition through the adapter in stream order, one
+        transaction per envelope. Envelopes with the same primary identifier
+        therefore always resolve in stream order; envelopes in different
+        partitions interleave. With ``processes == shard_count`` each worker's
+        primary identifiers all live in its own shard.
+
+        Workers share the store, so an auto-merge triggered by an envelope in
+        one partition is visible to every later write in the others. Once a
+        batch finishes, its results are reconciled: each entity id is replaced
+        by its canonical id, so envelopes whose entity another partition merged
+        away report the surviving entity. Canonical id caches are disabled in
+        every process because other processes merge entities.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.path = path
+        self.processes = processes or os.cpu_count() or 1
+        self.shard_count = shard_count
+        self.batch_size = batch_size
+        # Opening the store here creates (or migrates) its schema before any worker connects.
+        self.store: EntityStore = _open_store(path, shard_count)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=mp_context,
+            initializer=_start_worker,
+            initargs=(path, shard_count, default_entity_type, caused_by),
+        )
+
+    def __enter__(self) -> "SignalIngestPipeline":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        self.store.close()
+
+    def partition(self, signal_envelope: Any) -> int:
+        """Worker partition of ``signal_envelope``; raises ``ValueError`` when it has no identifiers."""
+        identifier_type, normalized_value = signal_identifier_keys(signal_envelope)[0]
+        return shard_for_key(identifier_type, normalized_value, self.processes)
+
+    def run(
+        self,
+        envelopes: Iterable[Any],
+        *,
+        on_batch: Optional[Callable[[List[Optional[SignalResolutionResult]]], None]] = None,
+    ) -> IngestReport:
+        """Resolve ``envelopes`` batch by batch and report throughput.
+
+        ``on_batch`` receives each batch's reconciled results in stream order,
+        with ``None`` for envelopes that failed (listed in ``IngestReport.failed``).
+        Batches run one after another, so a batch only starts once every
+        envelope of the previous one has committed.
+        """
+        start = time.perf_counter()
+        signals = resolved = batches = merges = reconciled = lock_retries = 0
+        failed: List[Tuple[int, str]] = []
+        iterator = iter(envelopes)
+        while True:
+            batch = list(islice(iterator, self.batch_size))
+            if not batch:
+                break
+            results, batch_failed, stats = self._run_batch(batch, signals)
+            failed.extend(batch_failed)
+            if on_batch is not None:
+                on_batch(results)
+            signals += len(batch)
+            resolved += sum(result is not None for result in results)
+            batches += 1
+            merges += stats["merges"]
+            reconciled += stats["reconciled"]
+            lock_retries += stats["lock_retries"]
+        return IngestReport(
+            signals=signals,
+            resolved=resolved,
+            failed=tuple(failed),
+            batches=batches,
+            merges=merges,
+            reconciled=reconciled,
+            lock_retries=lock_retries,
+            elapsed_seconds=time.perf_counter() - start,
+        )
+
+    def _run_batch(
+        self, batch: Sequence[Any], offset: int
+    ) -> Tuple[List[Optional[SignalResolutionResult]], List[Tuple[int, str]], Dict[str, int]]:
+        failed: List[Tuple[int, str]] = []
+        partitions: List[List[Tuple[int, Any]]] = [[] for _ in range(self.processes)]
+        for position, envelope in enumerate(batch, start=offset):
+            try:
+                partitions[self.partition(envelope)].append((position, envelope))
+            except (TypeError, ValueError) as exc:
+                failed.append((position, str(exc)))
+        futures = [self._pool.submit(_resolve_partition, items) for items in partitions if items]
+        outcomes: List[_Outcome] = []
+        lock_retries = 0
+        for future in futures:
+            partition_outcomes, retries = future.result()
+            outcomes.extend(partition_outcomes)
+            lock_retries += retries
+
+        # Reconcile: merges committed by other partitions after an envelope resolved move it to the survivor.
+        entity_ids = {entity_id for _, entity_id, _, _ in outcomes if entity_id is not None}
+        canonical = {entity_id: self.store.canonical_entity_id(entity_id) for entity_id in entity_ids}
+        results: List[Optional[SignalResolutionResult]] = [None] * len(batch)
+        merges = reconciled = 0
+        for position, entity_id, confidence, detail in sorted(outcomes, key=lambda outcome: outcome[0]):
+            if entity_id is None:
+                failed.append((position, detail))
+                continue
+            merges += sum(event.event_type == "EntityMerged" for event in detail)
+            reconciled += canonical[entity_id] != entity_id
+            results[position - offset] = SignalResolutionResult(
+                entity_id=canonical[entity_id], confidence=confidence, emitted_events=detail
+            )
+        failed.sort()
+        return results, failed, {"merges": merges, "reconciled": reconciled, "lock_retries": lock_retries}
+
+
+def _open_store(path: str, shard_count: Optional[int]) -> EntityStore:
+    if shard_count is not None:
+        return ShardedEntityStore(path, shard_count, canonical_cache=False)
+    return SQLiteEntityStore(path, wal=True, canonical_cache=False)
+
+
+def _start_worker(path: str, shard_count: Optional[int], default_entity_type: str, caused_by: str) -> None:
+    global _worker_resolver
+    # Events reach the parent through each envelope's result; the worker keeps none.
+    _worker_resolver = EntityResolver(
+        _open_store(path, shard_count),
+        matched_identifiers="skip",
+        event_sink=CallbackSink(lambda events: None),
+    )
+    _worker_options.update(default_entity_type=default_entity_type, caused_by=caused_by)
+
+
+def _resolve_partition(items: Sequence[Tuple[int, Any]]) -> Tuple[List[_Outcome], int]:
+    outcomes: List[_Outcome] = []
+    retries = 0
+    for position, envelope in items:
+        for attempt in range(LOCK_RETRY_ATTEMPTS + 1):
+            try:
+                entity_id, confidence, events = _resolve_envelope(envelope)
+            except sqlite3.OperationalError as exc:
+                if "locked" not in str(exc) or attempt == LOCK_RETRY_ATTEMPTS:
+                    raise
+                retries += 1
+                time.sleep(random.uniform(0, LOCK_RETRY_DELAY_SECONDS * (attempt + 1)))
+                continue
+            except (TypeError, ValueError) as exc:
+                outcomes.append((position, None, None, str(exc)))
+            else:
+                outcomes.append((position, entity_id, confidence, events))
+            break
+    return outcomes, retries
+
+
+def _resolve_envelope(envelope: Any) -> Tuple[str, float, List[Any]]:
+    # The adapter reserves the envelope's shards in ascending order when its transaction opens.
+    result = resolve_normalized_social_signal(_worker_resolver, envelope, **_worker_options)
+    return result.entity_id, result.confidence, result.emitted_events
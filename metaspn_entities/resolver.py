@@ -1,50 +1,226 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from .attribution import OutcomeAttribution, normalize_outcome_references, normalize_reference, rank_entity_candidates
 from .context import RecommendationContext, EntityContext, build_confidence_summary, build_recommendation_context
 from .events import EmittedEvent, EventFactory
+from .locks import DEFAULT_LOCK_STRIPES, StripedLock
 from .models import (
     DEFAULT_MATCH_CONFIDENCE,
     DEFAULT_NEW_ENTITY_CONFIDENCE,
     EntityResolution,
     EntityStatus,
     EntityType,
+    LazyIdentifiers,
+    MATCHED_IDENTIFIER_MODES,
+    RESOLVE_CONTEXT_KEYS,
+    ReplayReport,
+    frozen_clock,
+    utcnow_epoch,
 )
 from .normalize import AUTO_MERGE_IDENTIFIER_TYPES, normalize_identifier
+from .oplog import OperationLog, read_operation_log, read_operation_log_header
+from .sinks import EventSink, RingBufferSink
 from .sqlite_backend import SQLiteEntityStore
+from .store import EntityStore, IdentifierKey
 
 
 class EntityResolver:
-    def __init__(self, store: Optional[SQLiteEntityStore] = None) -> None:
-        self.store = store or SQLiteEntityStore()
-        self._event_buffer: List[EmittedEvent] = []
+    def __init__(
+        self,
+        store: Optional[EntityStore] = None,
+        *,
+        matched_identifiers: str = "eager",
+        event_sink: Optional[EventSink] = None,
+        operation_log: Optional[OperationLog] = None,
+        lock_stripes: int = DEFAULT_LOCK_STRIPES,
+    ) -> None:
+        """Resolve identifiers against ``store`` (an in-process SQLite store by default).
+
+        The resolver only uses the operations declared by ``EntityStore``, so any
+        backend implementing that protocol can be plugged in.
+
+        ``matched_identifiers`` controls ``EntityResolution.matched_identifiers``:
+        ``"eager"`` reads the entity's identifiers during the resolution,
+        ``"lazy"`` returns a ``LazyIdentifiers`` that reads them on first access
+        (reflecting the store at that time), and ``"skip"`` leaves them empty.
+        Ingest paths that only need ``entity_id`` and ``confidence`` should use
+        ``"lazy"`` or ``"skip"`` to avoid a cluster join per resolution.
+
+        Emitted events are held per unit of work and published to
+        ``event_sink`` when the outermost transaction commits (rolled-back
+        work publishes nothing). The default is a bounded ``RingBufferSink``
+        read by ``drain_events``; see ``metaspn_entities.sinks`` for file and
+        callback sinks.
+
+        With an ``operation_log``, every ``resolve``, ``resolve_many``,
+        ``add_alias``, ``merge_entities`` and ``undo_merge`` call is recorded
+        there once its unit of work has committed, in commit order, so
+        ``replay_operation_log`` can rebuild the store from the log alone. A
+        failed log write is raised to the caller after the commit; a crash
+        between the commit and the write loses that unit's records.
+
+        One resolver can be shared by a thread pool. Units of work are tracked
+        per thread, and ``resolve``, ``resolve_many`` and ``add_alias`` hold one
+        of ``lock_stripes`` locks per ``(identifier_type, normalized_value)``
+        for their whole unit of work, so concurrent calls for the same
+        identifier serialize (one creates the entity, the others find it) while
+        unrelated identifiers proceed in parallel. Blocks that group several
+        calls pass the keys they write to ``transaction(keys)``, as the
+        ingestion adapter does. Events of different threads' units of work may
+        reach the sink in either order.
+        """
+        if matched_identifiers not in MATCHED_IDENTIFIER_MODES:
+            raise ValueError(f"matched_identifiers must be one of {MATCHED_IDENTIFIER_MODES}")
+        self.store: EntityStore = store if store is not None else SQLiteEntityStore()
+        self.matched_identifiers = matched_identifiers
+        self.event_sink: EventSink = event_sink if event_sink is not None else RingBufferSink()
+        self.operation_log = operation_log
+        self._identifier_locks = StripedLock(lock_stripes)
+        self._log_order = threading.Lock()
+        self._unit = _UnitOfWork()
+
+    @contextmanager
+    def transaction(self, keys: Iterable[IdentifierKey] = ()) -> Iterator["EntityResolver"]:
+        """Commit every resolver call made inside the block as one unit of work.
+
+        On failure the store rolls back and events emitted inside the block are
+        discarded, so the buffer never describes writes that did not persist.
+        The clock is read once per outermost block, so every row and event it
+        writes carries the same timestamp.
+
+        ``keys`` are the ``(identifier_type, normalized_value)`` keys the block
+        writes. An outermost block takes their lock stripes, then reserves them
+        in the store (``reserve_identifiers``) before any write, so every
+        thread sharing the resolver acquires locks in one order. Nested blocks
+        run under the outermost block's locks and ignore ``keys``; on a
+        ``ShardedEntityStore`` a block that writes keys it did not list can
+        deadlock with other threads.
+        """
+        unit = self._unit
+        keys = list(keys) if unit.depth == 0 else []
+        mark = len(unit.events)
+        operations_mark = len(unit.operations)
+        # Stripes are only taken by outermost blocks, before the store's locks, so the lock order never inverts.
+        with self._identifier_locks.hold(keys):
+            unit.depth += 1
+            operations: Optional[List[Dict[str, Any]]] = None
+            try:
+                with frozen_clock(), self.store.transaction():
+                    if keys:
+                        self.store.reserve_identifiers(keys)
+                    yield self
+                    if unit.depth == 1 and unit.operations:
+                        operations, unit.operations = unit.operations, []
+                        # Held across the commit until the records are written, so the log lists units in commit order.
+                        self._log_order.acquire()
+            except BaseException:
+                if operations is not None:
+                    self._log_order.release()
+                del unit.events[mark:]
+                del unit.operations[operations_mark:]
+                raise
+            finally:
+                unit.depth -= 1
+            try:
+                if operations is not None:
+                    # Only committed work is logged, so replay never applies a unit whose commit failed.
+                    try:
+                        self.operation_log.append(operations)
+                    finally:
+                        self._log_order.release()
+            finally:
+                if unit.depth == 0 and unit.events:
+                    self._publish(unit)
+
+    def _publish(self, unit: "_UnitOfWork") -> None:
+        events, unit.events = unit.events, []
+        for captured in unit.captures:
+            captured.extend(events)
+        self.event_sink.publish(events)
+
+    def _log_operation(self, op: str, args: Dict[str, Any], created: Sequence[str] = ()) -> None:
+        if self.operation_log is not None:
+            self._unit.operations.append({"at": utcnow_epoch(), "op": op, "args": args, "created": list(created)})
+
+    def _replayed_ids(self, count: int) -> Optional[List[str]]:
+        # Replay recreates entities under the ids the operation log recorded.
+        if self._unit.replayed_entity_ids is None:
+            return None
+        entity_ids = [next(self._unit.replayed_entity_ids, None) for _ in range(count)]
+        if None in entity_ids:
+            raise ValueError("Operation log replay diverged: more entities created than were recorded")
+        return entity_ids
+
+    @contextmanager
+    def capture_events(self) -> Iterator[List[EmittedEvent]]:
+        """Collect the events committed inside the block, in addition to publishing them to the sink.
+
+        Inside an enclosing transaction the block's events are not committed
+        yet when it exits; the list then holds the events it buffered, which
+        the sink receives when the enclosing transaction commits.
+        """
+        unit = self._unit
+        captured: List[EmittedEvent] = []
+        mark = len(unit.events)
+        unit.captures.append(captured)
+        try:
+            yield captured
+        finally:
+            # By identity: an enclosing capture that has collected nothing yet compares equal to this one.
+            captures = unit.captures
+            del captures[next(index for index, item in enumerate(captures) if item is captured)]
+            if unit.depth > 0:
+                captured.extend(unit.events[mark:])
 
     def resolve(self, identifier_type: str, value: str, context: Optional[Dict[str, Any]] = None) -> EntityResolution:
+        normalized = normalize_identifier(identifier_type, value)
+        with self.transaction([(identifier_type, normalized)]):
+            resolution, created = self._resolve(identifier_type, value, context, normalized)
+            self._log_operation(
+                "resolve",
+                {"identifier_type": identifier_type, "value": value, "context": _logged_context(context)},
+                created,
+            )
+            return resolution
+
+    def _resolve(
+        self,
+        identifier_type: str,
+        value: str,
+        context: Optional[Dict[str, Any]],
+        normalized: Optional[str] = None,
+    ) -> Tuple[EntityResolution, List[str]]:
         context = context or {}
         confidence = float(context.get("confidence", DEFAULT_MATCH_CONFIDENCE))
         provenance = context.get("provenance")
         entity_type = context.get("entity_type", EntityType.PERSON)
         caused_by = context.get("caused_by", "resolver")
 
-        normalized = normalize_identifier(identifier_type, value)
+        if normalized is None:
+            normalized = normalize_identifier(identifier_type, value)
         self.store.upsert_identifier(identifier_type, value, normalized, confidence, provenance)
 
         existing_alias = self.store.find_alias(identifier_type, normalized)
         if existing_alias:
             entity_id = self.store.canonical_entity_id(existing_alias["entity_id"])
-            matched_identifiers = list(self.store.iter_identifiers_for_entity(entity_id))
+            matched_identifiers = self._matched_identifiers(entity_id)
             resolution = EntityResolution(
                 entity_id=entity_id,
                 confidence=max(float(existing_alias["confidence"]), confidence),
                 created_new_entity=False,
                 matched_identifiers=matched_identifiers,
             )
-            self._event_buffer.append(EventFactory.entity_resolved(entity_id, caused_by, resolution.confidence))
-            return resolution
+            self._unit.events.append(EventFactory.entity_resolved(entity_id, caused_by, resolution.confidence))
+            return resolution, []
 
-        entity_id = self.store.create_entity(entity_type)
+        replayed = self._replayed_ids(1)
+        entity_id = self.store.create_entity(entity_type, replayed[0] if replayed else None)
         created_entity_id = entity_id
         added, conflicting_entity_id = self.store.add_alias(
             identifier_type=identifier_type,
@@ -59,9 +235,9 @@ class EntityResolver:
             merge_reason = f"auto-merge on {identifier_type}:{normalized}"
             self.store.merge_entities(entity_id, conflicting_entity_id, merge_reason, "auto-merge")
             entity_id = self.store.canonical_entity_id(conflicting_entity_id)
-            self._event_buffer.append(EventFactory.entity_merged(entity_id, (created_entity_id,), merge_reason))
+            self._unit.events.append(EventFactory.entity_merged(entity_id, (created_entity_id,), merge_reason))
 
-        matched_identifiers = list(self.store.iter_identifiers_for_entity(entity_id))
+        matched_identifiers = self._matched_identifiers(entity_id)
         resolution = EntityResolution(
             entity_id=entity_id,
             confidence=confidence if added else DEFAULT_NEW_ENTITY_CONFIDENCE,
@@ -69,9 +245,124 @@ class EntityResolver:
             matched_identifiers=matched_identifiers,
         )
         if added:
-            self._event_buffer.append(EventFactory.entity_alias_added(entity_id, normalized, identifier_type))
-        self._event_buffer.append(EventFactory.entity_resolved(entity_id, caused_by, resolution.confidence))
-        return resolution
+            self._unit.events.append(EventFactory.entity_alias_added(entity_id, normalized, identifier_type))
+        self._unit.events.append(EventFactory.entity_resolved(entity_id, caused_by, resolution.confidence))
+        return resolution, [created_entity_id]
+
+    def _matched_identifiers(self, entity_id: str) -> Sequence[Dict[str, Any]]:
+        if self.matched_identifiers == "eager":
+            return list(self.store.iter_identifiers_for_entity(entity_id))
+        if self.matched_identifiers == "lazy":
+            return LazyIdentifiers(lambda: self.store.iter_identifiers_for_entity(entity_id))
+        return []
+
+    def resolve_many(
+        self,
+        items: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]],
+    ) -> List[EntityResolution]:
+        """Resolve ``(identifier_type, value, context)`` items in one set-based pass.
+
+        The final store state matches calling ``resolve`` for each item in
+        order: repeated identifiers fold into one identifier row, the first
+        occurrence of an unmapped identifier creates the entity, and later
+        occurrences resolve to it. Like ``resolve``, a miss can never conflict
+        with an existing alias, so no auto-merge is triggered. Results and
+        events follow input order; ``matched_identifiers`` reflect the state
+        at the end of the batch.
+        """
+        prepared = []
+        logged = []
+        for identifier_type, value, context in items:
+            if self.operation_log is not None:
+                logged.append([identifier_type, value, _logged_context(context)])
+            context = context or {}
+            prepared.append(
+                (
+                    identifier_type,
+                    value,
+                    normalize_identifier(identifier_type, value),
+                    float(context.get("confidence", DEFAULT_MATCH_CONFIDENCE)),
+                    context.get("provenance"),
+                    context.get("entity_type", EntityType.PERSON),
+                    context.get("caused_by", "resolver"),
+                )
+            )
+        if not prepared:
+            return []
+
+        with self.transaction([(item[0], item[2]) for item in prepared]):
+            identifier_state = self.store.upsert_identifiers(
+                [(item[0], item[1], item[2], item[3], item[4]) for item in prepared]
+            )
+            existing_aliases = self.store.find_aliases((item[0], item[2]) for item in prepared)
+
+            new_keys: Dict[Tuple[str, str], Sequence[Any]] = {}
+            for item in prepared:
+                key = (item[0], item[2])
+                if key not in existing_aliases and key not in new_keys:
+                    new_keys[key] = item
+            new_entity_ids = self.store.create_entities(
+                [item[5] for item in new_keys.values()], self._replayed_ids(len(new_keys))
+            )
+            self._log_operation("resolve_many", {"items": logged}, new_entity_ids)
+            created = dict(zip(new_keys, new_entity_ids))
+            self.store.insert_aliases(
+                [
+                    (key[0], key[1], created[key], item[3], item[6], item[4])
+                    for key, item in new_keys.items()
+                ]
+            )
+
+            canonical_ids = {
+                raw: self.store.canonical_entity_id(raw)
+                for raw in {str(row["entity_id"]) for row in existing_aliases.values()}
+            }
+            matched: Dict[str, Sequence[Dict[str, Any]]] = {}
+            for key, entity_id in created.items():
+                state = identifier_state[key]
+                matched[entity_id] = [
+                    {
+                        "identifier_type": state["identifier_type"],
+                        "value": state["value"],
+                        "normalized_value": state["normalized_value"],
+                        "confidence": state["confidence"],
+                    }
+                ]
+            for entity_id in sorted(set(canonical_ids.values()) - set(matched)):
+                matched[entity_id] = self._matched_identifiers(entity_id)
+            skip = self.matched_identifiers == "skip"
+
+            results: List[EntityResolution] = []
+            pending_new = set(created)
+            for identifier_type, _, normalized, confidence, _, _, caused_by in prepared:
+                key = (identifier_type, normalized)
+                if key in pending_new:
+                    pending_new.discard(key)
+                    entity_id = created[key]
+                    resolution = EntityResolution(
+                        entity_id=entity_id,
+                        confidence=confidence,
+                        created_new_entity=True,
+                        matched_identifiers=[] if skip else list(matched[entity_id]),
+                    )
+                    self._unit.events.append(EventFactory.entity_alias_added(entity_id, normalized, identifier_type))
+                else:
+                    if key in created:
+                        entity_id = created[key]
+                        alias_confidence = float(new_keys[key][3])
+                    else:
+                        alias = existing_aliases[key]
+                        entity_id = canonical_ids[str(alias["entity_id"])]
+                        alias_confidence = float(alias["confidence"])
+                    resolution = EntityResolution(
+                        entity_id=entity_id,
+                        confidence=max(alias_confidence, confidence),
+                        created_new_entity=False,
+                        matched_identifiers=[] if skip else _copy_matched(matched[entity_id]),
+                    )
+                self._unit.events.append(EventFactory.entity_resolved(entity_id, caused_by, resolution.confidence))
+                results.append(resolution)
+        return results
 
     def add_alias(
         self,
@@ -81,10 +372,37 @@ class EntityResolver:
         confidence: float = DEFAULT_MATCH_CONFIDENCE,
         caused_by: str = "manual",
         provenance: Optional[str] = None,
+    ) -> List[EmittedEvent]:
+        normalized = normalize_identifier(identifier_type, value)
+        with self.transaction([(identifier_type, normalized)]):
+            events = self._add_alias(entity_id, identifier_type, value, confidence, caused_by, provenance, normalized)
+            self._log_operation(
+                "add_alias",
+                {
+                    "entity_id": entity_id,
+                    "identifier_type": identifier_type,
+                    "value": value,
+                    "confidence": confidence,
+                    "caused_by": caused_by,
+                    "provenance": provenance,
+                },
+            )
+            return events
+
+    def _add_alias(
+        self,
+        entity_id: str,
+        identifier_type: str,
+        value: str,
+        confidence: float,
+        caused_by: str,
+        provenance: Optional[str],
+        normalized: Optional[str] = None,
     ) -> List[EmittedEvent]:
         self.store.ensure_entity(entity_id)
         canonical_entity_id = self.store.canonical_entity_id(entity_id)
-        normalized = normalize_identifier(identifier_type, value)
+        if normalized is None:
+            normalized = normalize_identifier(identifier_type, value)
         self.store.upsert_identifier(identifier_type, value, normalized, confidence, provenance)
 
         added, conflicting_entity_id = self.store.add_alias(
@@ -100,7 +418,7 @@ class EntityResolver:
                 reason = f"auto-merge on {identifier_type}:{normalized}"
                 self.store.merge_entities(canonical_entity_id, conflicting_entity_id, reason, "auto-merge")
                 event = EventFactory.entity_merged(conflicting_entity_id, (canonical_entity_id,), reason)
-                self._event_buffer.append(event)
+                self._unit.events.append(event)
                 return [event]
             raise ValueError(
                 f"Alias already mapped to another entity: {identifier_type}:{normalized} -> {conflicting_entity_id}"
@@ -110,29 +428,62 @@ class EntityResolver:
             return []
 
         event = EventFactory.entity_alias_added(canonical_entity_id, normalized, identifier_type)
-        self._event_buffer.append(event)
+        self._unit.events.append(event)
         return [event]
 
     def merge_entities(self, from_entity_id: str, to_entity_id: str, reason: str, caused_by: str = "manual") -> EmittedEvent:
-        self.store.ensure_entity(from_entity_id)
-        self.store.ensure_entity(to_entity_id)
-        self.store.merge_entities(from_entity_id, to_entity_id, reason, caused_by)
-        event = EventFactory.entity_merged(self.store.canonical_entity_id(to_entity_id), (from_entity_id,), reason)
-        self._event_buffer.append(event)
+        with self.transaction():
+            self.store.ensure_entity(from_entity_id)
+            self.store.ensure_entity(to_entity_id)
+            self.store.merge_entities(from_entity_id, to_entity_id, reason, caused_by)
+            event = EventFactory.entity_merged(self.store.canonical_entity_id(to_entity_id), (from_entity_id,), reason)
+            self._unit.events.append(event)
+            self._log_operation(
+                "merge_entities",
+                {
+                    "from_entity_id": from_entity_id,
+                    "to_entity_id": to_entity_id,
+                    "reason": reason,
+                    "caused_by": caused_by,
+                },
+            )
         return event
 
     def undo_merge(self, from_entity_id: str, to_entity_id: str, caused_by: str = "manual") -> EmittedEvent:
         reason = f"undo merge {from_entity_id}->{to_entity_id}"
-        if self.store.get_redirect_target(from_entity_id) == to_entity_id:
-            self.store.remove_redirect(from_entity_id)
-            self.store.set_entity_status(from_entity_id, EntityStatus.ACTIVE)
-        self.store.merge_entities(to_entity_id, from_entity_id, reason, caused_by)
-        event = EventFactory.entity_merged(self.store.canonical_entity_id(from_entity_id), (to_entity_id,), reason)
-        self._event_buffer.append(event)
+        with self.transaction():
+            if self.store.get_redirect_origin(from_entity_id) == to_entity_id:
+                self.store.remove_redirect(from_entity_id)
+                self.store.set_entity_status(from_entity_id, EntityStatus.ACTIVE)
+            self.store.merge_entities(to_entity_id, from_entity_id, reason, caused_by)
+            event = EventFactory.entity_merged(self.store.canonical_entity_id(from_entity_id), (to_entity_id,), reason)
+            self._unit.events.append(event)
+            self._log_operation(
+                "undo_merge", {"from_entity_id": from_entity_id, "to_entity_id": to_entity_id, "caused_by": caused_by}
+            )
         return event
 
-    def merge_history(self) -> List[Dict[str, Any]]:
-        return self.store.list_merge_history()
+    def canonical_entity_id(self, entity_id: str) -> str:
+        return self.store.canonical_entity_id(entity_id)
+
+    def redirect_chain(self, entity_id: str) -> List[str]:
+        """Return ``entity_id`` followed by each entity it was merged into, in merge order."""
+        chain = [entity_id]
+        current = entity_id
+        while True:
+            next_target = self.store.get_redirect_origin(current)
+            if not next_target:
+                return chain
+            chain.append(next_target)
+            current = next_target
+
+    def merge_history(self, entity_ids: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Return merge records, optionally only those touching ``entity_ids``."""
+        return self.store.list_merge_history(entity_ids)
+
+    def merge_lineage(self, entity_id: str) -> List[Dict[str, Any]]:
+        """Return the merge records of every entity merged into ``entity_id``, recursively."""
+        return self.store.list_merge_lineage(entity_id)
 
     def aliases_for_entity(self, entity_id: str) -> List[Dict[str, Any]]:
         return self.store.list_aliases_for_entity(entity_id)
@@ -198,7 +549,144 @@ class EntityResolver:
     def export_snapshot(self, output_path: str) -> None:
         self.store.export_snapshot(output_path)
 
+    def export_snapshot_stream(
+        self,
+        output_path: str,
+        *,
+        chunk_size: int = 1000,
+        compression: Optional[str] = None,
+    ) -> Dict[str, int]:
+        return self.store.export_snapshot_stream(output_path, chunk_size=chunk_size, compression=compression)
+
+    def import_snapshot_stream(self, input_path: str, *, chunk_size: int = 1000) -> Dict[str, int]:
+        return self.store.import_snapshot_stream(input_path, chunk_size=chunk_size)
+
+    def import_snapshot(self, input_path: str, *, chunk_size: int = 1000) -> Dict[str, int]:
+        return self.store.import_snapshot(input_path, chunk_size=chunk_size)
+
     def drain_events(self) -> List[EmittedEvent]:
-        events = list(self._event_buffer)
-        self._event_buffer.clear()
-        return events
+        """Return and remove the events held by the sink (empty for sinks that do not buffer)."""
+        drain = getattr(self.event_sink, "drain", None)
+        return drain() if drain is not None else []
+
+    def flush_events(self) -> None:
+        self.event_sink.flush()
+
+    def replay_operation_log(self, path: str, *, batch_size: int = 1000) -> ReplayReport:
+        """Apply the operations recorded in the operation log at ``path`` to this resolver's store.
+
+        Each operation runs under its recorded clock and entity ids,
+        ``batch_size`` operations per transaction; consecutive ``resolve``
+        calls from the same second are applied as one ``resolve_many``. The
+        last applied ``seq`` is checkpointed in the store with every batch, so
+        an interrupted replay resumes where it stopped and a repeated one only
+        applies operations appended since. Events go to this resolver's sink.
+        """
+        started = time.perf_counter()
+        checkpoint = f"oplog:{read_operation_log_header(path)['log_id']}"
+        since_seq = self.store.get_checkpoint(checkpoint) or 0
+        replayer = EntityResolver(self.store, matched_identifiers="skip", event_sink=self.event_sink)
+        records = read_operation_log(path, since_seq)
+        applied = transactions = 0
+        last_seq = since_seq
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            with replayer.transaction(_replayed_keys(batch)):
+                for group in _replay_groups(batch):
+                    replayer._replay(group)
+                self.store.set_checkpoint(checkpoint, batch[-1]["seq"])
+            applied += len(batch)
+            transactions += 1
+            last_seq = batch[-1]["seq"]
+        return ReplayReport(
+            operations=applied,
+            transactions=transactions,
+            since_seq=since_seq,
+            last_seq=last_seq,
+            elapsed_seconds=time.perf_counter() - started,
+        )
+
+    def _replay(self, records: Sequence[Dict[str, Any]]) -> None:
+        first = records[0]
+        self._unit.replayed_entity_ids = iter([entity_id for record in records for entity_id in record["created"]])
+        try:
+            with frozen_clock(first["at"]):
+                args = first["args"]
+                # Single calls skip their own savepoint: a failure aborts the whole replay batch anyway.
+                if first["op"] == "resolve" and len(records) == 1:
+                    self._resolve(args["identifier_type"], args["value"], args["context"])
+                elif first["op"] == "resolve":
+                    self.resolve_many(
+                        [
+                            (record["args"]["identifier_type"], record["args"]["value"], record["args"]["context"])
+                            for record in records
+                        ]
+                    )
+                elif first["op"] == "resolve_many":
+                    self.resolve_many([(item[0], item[1], item[2]) for item in args["items"]])
+                elif first["op"] == "add_alias":
+                    self._add_alias(**args)
+                elif first["op"] == "merge_entities":
+                    self.merge_entities(**args)
+                else:
+                    self.undo_merge(**args)
+            if next(self._unit.replayed_entity_ids, None) is not None:
+                raise ValueError(f"Operation log replay diverged at seq {first['seq']}: recorded entity not created")
+        finally:
+            self._unit.replayed_entity_ids = None
+
+    def close(self) -> None:
+        """Flush and close the event sink and operation log; the store is left open."""
+        self.event_sink.close()
+        if self.operation_log is not None:
+            self.operation_log.close()
+
+
+class _UnitOfWork(threading.local):
+    # Per-thread state of the resolver transaction in progress.
+    def __init__(self) -> None:
+        self.depth = 0
+        self.events: List[EmittedEvent] = []
+        self.operations: List[Dict[str, Any]] = []
+        self.captures: List[List[EmittedEvent]] = []
+        self.replayed_entity_ids: Optional[Iterator[str]] = None
+
+
+def _logged_context(context: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    # Only the keys resolution reads are recorded, so arbitrary context values need not be JSON.
+    if not context:
+        return None
+    return {key: context[key] for key in RESOLVE_CONTEXT_KEYS if key in context}
+
+
+def _replayed_keys(records: Sequence[Dict[str, Any]]) -> Iterator[IdentifierKey]:
+    # Identifier keys the replayed calls write; merges only touch entities and redirects.
+    for record in records:
+        args = record["args"]
+        if record["op"] in ("resolve", "add_alias"):
+            pairs = [(args["identifier_type"], args["value"])]
+        elif record["op"] == "resolve_many":
+            pairs = [(item[0], item[1]) for item in args["items"]]
+        else:
+            continue
+        for identifier_type, value in pairs:
+            yield identifier_type, normalize_identifier(identifier_type, value)
+
+
+def _replay_groups(records: Sequence[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    # Same-second resolve calls leave the store as one resolve_many over the same items would.
+    group: List[Dict[str, Any]] = []
+    for record in records:
+        if group and not (record["op"] == group[0]["op"] == "resolve" and record["at"] == group[0]["at"]):
+            yield group
+            group = []
+        group.append(record)
+    if group:
+        yield group
+
+
+def _copy_matched(items: Sequence[Dict[str, Any]]) -> Sequence[Dict[str, Any]]:
+    # A lazy sequence is read-only and can be shared; lists are copied per resolution.
+    return items if isinstance(items, LazyIdentifiers) else list(items)
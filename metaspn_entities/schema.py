@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import epoch_to_iso
+from .snapshot import SNAPSHOT_COLUMNS
+
+IDENTIFIERS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS identifiers (
+  identifier_type TEXT NOT NULL,
+  value TEXT NOT NULL,
+  normalized_value TEXT NOT NULL,
+  confidence REAL NOT NULL,
+  first_seen_at TEXT NOT NULL,
+  last_seen_at TEXT NOT NULL,
+  provenance TEXT,
+  UNIQUE(identifier_type, normalized_value)
+);
+"""
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS entities (
+  entity_id TEXT PRIMARY KEY,
+  entity_type TEXT NOT NULL,
+  created_at TEXT NOT NULL,
+  status TEXT NOT NULL
+);
+""" + IDENTIFIERS_TABLE_SQL + """
+CREATE TABLE IF NOT EXISTS aliases (
+  identifier_type TEXT NOT NULL,
+  normalized_value TEXT NOT NULL,
+  entity_id TEXT NOT NULL,
+  confidence REAL NOT NULL,
+  created_at TEXT NOT NULL,
+  caused_by TEXT NOT NULL,
+  provenance TEXT,
+  UNIQUE(identifier_type, normalized_value)
+);
+
+CREATE TABLE IF NOT EXISTS merge_records (
+  merge_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  from_entity_id TEXT NOT NULL,
+  to_entity_id TEXT NOT NULL,
+  reason TEXT NOT NULL,
+  timestamp TEXT NOT NULL,
+  caused_by TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS entity_redirects (
+  from_entity_id TEXT PRIMARY KEY,
+  to_entity_id TEXT NOT NULL,
+  timestamp TEXT NOT NULL,
+  reason TEXT NOT NULL,
+  caused_by TEXT NOT NULL
+);
+"""
+
+IDENTIFIER_INDEXES = {
+    "idx_identifiers_last_seen_at": (
+        "CREATE INDEX IF NOT EXISTS idx_identifiers_last_seen_at ON identifiers(last_seen_at)"
+    ),
+}
+
+# Non-unique lookup indexes; bulk loads drop and rebuild them around the insert.
+SECONDARY_INDEXES = {
+    "idx_aliases_entity_id": "CREATE INDEX IF NOT EXISTS idx_aliases_entity_id ON aliases(entity_id)",
+    "idx_entity_redirects_to_entity_id": (
+        "CREATE INDEX IF NOT EXISTS idx_entity_redirects_to_entity_id ON entity_redirects(to_entity_id)"
+    ),
+    "idx_merge_records_from_entity_id": (
+        "CREATE INDEX IF NOT EXISTS idx_merge_records_from_entity_id ON merge_records(from_entity_id)"
+    ),
+    "idx_merge_records_to_entity_id": (
+        "CREATE INDEX IF NOT EXISTS idx_merge_records_to_entity_id ON merge_records(to_entity_id)"
+    ),
+    **IDENTIFIER_INDEXES,
+}
+
+# Integer-key storage mode: entities get an INTEGER PRIMARY KEY and the tables
+# that reference entities store that key. Views named like the text-id tables
+# map keys back to ``ent_...`` ids, so every read query works in both modes;
+# writes go to the keyed tables through ``ENTITY_KEY_REF`` subselects.
+INTEGER_KEY_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS entities (
+  entity_key INTEGER PRIMARY KEY,
+  entity_id TEXT NOT NULL UNIQUE,
+  entity_type TEXT NOT NULL,
+  created_at TEXT NOT NULL,
+  status TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS alias_keys (
+  identifier_type TEXT NOT NULL,
+  normalized_value TEXT NOT NULL,
+  entity_key INTEGER NOT NULL,
+  confidence REAL NOT NULL,
+  created_at TEXT NOT NULL,
+  caused_by TEXT NOT NULL,
+  provenance TEXT,
+  UNIQUE(identifier_type, normalized_value)
+);
+
+CREATE TABLE IF NOT EXISTS merge_record_keys (
+  merge_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  from_entity_key INTEGER NOT NULL,
+  to_entity_key INTEGER NOT NULL,
+  reason TEXT NOT NULL,
+  timestamp TEXT NOT NULL,
+  caused_by TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS redirect_keys (
+  from_entity_key INTEGER PRIMARY KEY,
+  to_entity_key INTEGER NOT NULL,
+  timestamp TEXT NOT NULL,
+  reason TEXT NOT NULL,
+  caused_by TEXT NOT NULL
+);
+"""
+
+# Text-id table name -> (keyed base table, text id column -> integer key column).
+KEYED_TABLES: Dict[str, Tuple[str, Dict[str, str]]] = {
+    "aliases": ("alias_keys", {"entity_id": "entity_key"}),
+    "merge_records": ("merge_record_keys", {"from_entity_id": "from_entity_key", "to_entity_id": "to_entity_key"}),
+    "entity_redirects": ("redirect_keys", {"from_entity_id": "from_entity_key", "to_entity_id": "to_entity_key"}),
+}
+
+INTEGER_KEY_SECONDARY_INDEXES = {
+    "idx_alias_keys_entity_key": "CREATE INDEX IF NOT EXISTS idx_alias_keys_entity_key ON alias_keys(entity_key)",
+    "idx_redirect_keys_to_entity_key": (
+        "CREATE INDEX IF NOT EXISTS idx_redirect_keys_to_entity_key ON redirect_keys(to_entity_key)"
+    ),
+    "idx_merge_record_keys_from_entity_key": (
+        "CREATE INDEX IF NOT EXISTS idx_merge_record_keys_from_entity_key ON merge_record_keys(from_entity_key)"
+    ),
+    "idx_merge_record_keys_to_entity_key": (
+        "CREATE INDEX IF NOT EXISTS idx_merge_record_keys_to_entity_key ON merge_record_keys(to_entity_key)"
+    ),
+    **IDENTIFIER_INDEXES,
+}
+
+ENTITY_KEY_REF = "(SELECT entity_key FROM entities WHERE entity_id = ?)"
+
+
+def keyed_select_sql(table: str) -> str:
+    """SELECT over a keyed base table exposing ``table``'s snapshot columns (base rows aliased ``b``)."""
+    base, key_columns = KEYED_TABLES[table]
+    joins: List[str] = []
+    columns: List[str] = []
+    for column in SNAPSHOT_COLUMNS[table]:
+        key_column = key_columns.get(column)
+        if key_column is None:
+            columns.append(f"b.{column}")
+            continue
+        alias = f"e{len(joins)}"
+        joins.append(f"JOIN entities {alias} ON {alias}.entity_key = b.{key_column}")
+        columns.append(f"{alias}.entity_id AS {column}")
+    return f"SELECT {', '.join(columns)} FROM {base} b {' '.join(joins)}"
+
+
+INTEGER_KEY_VIEWS_SQL = "".join(
+    f"\nCREATE VIEW IF NOT EXISTS {table} AS {keyed_select_sql(table)};\n" for table in KEYED_TABLES
+)
+
+INTEGER_KEY_SCHEMA_SQL = INTEGER_KEY_TABLES_SQL + IDENTIFIERS_TABLE_SQL + INTEGER_KEY_VIEWS_SQL
+
+
+def write_statements(integer_keys: bool) -> Dict[str, str]:
+    """Statements that write entity references, for the chosen storage mode."""
+    if integer_keys:
+        ref = ENTITY_KEY_REF
+        aliases, alias_entity = "alias_keys", "entity_key"
+        redirects, redirect_from, redirect_to = "redirect_keys", "from_entity_key", "to_entity_key"
+        merges, merge_from, merge_to = "merge_record_keys", "from_entity_key", "to_entity_key"
+    else:
+        ref = "?"
+        aliases, alias_entity = "aliases", "entity_id"
+        redirects, redirect_from, redirect_to = "entity_redirects", "from_entity_id", "to_entity_id"
+        merges, merge_from, merge_to = "merge_records", "from_entity_id", "to_entity_id"
+    insert_alias = (
+        f"INSERT INTO {aliases}(identifier_type, normalized_value, {alias_entity}, confidence, created_at, caused_by, provenance) "
+        f"VALUES (?, ?, {ref}, ?, ?, ?, ?)"
+    )
+    return {
+        "alias_table": aliases,
+        "insert_alias": insert_alias,
+        "insert_alias_if_absent": insert_alias + " ON CONFLICT(identifier_type, normalized_value) DO NOTHING",
+        "refresh_alias": f"""
+            UPDATE {aliases}
+            SET confidence = max(confidence, ?), provenance = COALESCE(NULLIF(?, ''), provenance)
+            WHERE identifier_type = ? AND normalized_value = ?
+            """,
+        "reassign_aliases": f"UPDATE {aliases} SET {alias_entity} = {ref} WHERE {alias_entity} = {ref}",
+        "delete_redirect": f"DELETE FROM {redirects} WHERE {redirect_from} = {ref}",
+        "repoint_redirects": f"UPDATE {redirects} SET {redirect_to} = {ref} WHERE {redirect_to} = {ref}",
+        "flatten_redirect": (
+            f"UPDATE {redirects} SET {redirect_to} = {ref} WHERE {redirect_from} = {ref} AND {redirect_to} != {ref}"
+        ),
+        "replace_redirect": (
+            f"INSERT OR REPLACE INTO {redirects}({redirect_from}, {redirect_to}, timestamp, reason, caused_by) "
+            f"VALUES ({ref}, {ref}, ?, ?, ?)"
+        ),
+        "insert_merge_record": (
+            f"INSERT INTO {merges}({merge_from}, {merge_to}, reason, timestamp, caused_by) VALUES ({ref}, {ref}, ?, ?, ?)"
+        ),
+    }
+
+
+def detect_integer_keys(conn: sqlite3.Connection) -> Optional[bool]:
+    """Return the storage mode of an existing database, or ``None`` for an empty one."""
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "alias_keys" in tables:
+        return True
+    if "aliases" in tables:
+        return False
+    return None
+
+
+# Epoch timestamp mode: timestamp columns are declared with this type and hold
+# integer UTC seconds. Epoch-mode connections read rows through
+# ``epoch_row_factory``, which renders them as ISO strings, so rows look the
+# same in both modes and ISO-mode connections pay nothing per cell.
+EPOCH_TIMESTAMP_TYPE = "EPOCH_SECONDS"
+TIMESTAMP_COLUMNS = frozenset({"created_at", "first_seen_at", "last_seen_at", "timestamp"})
+
+
+# Timestamp column positions per cursor description. Entries keep their description alive, so its id
+# cannot be reused while cached; the map is cleared whenever it outgrows the bound.
+_TIMESTAMP_POSITIONS_LIMIT = 256
+_timestamp_positions: Dict[int, Tuple[Any, Tuple[int, ...]]] = {}
+
+
+def epoch_row_factory(cursor: sqlite3.Cursor, values: Tuple[Any, ...]) -> sqlite3.Row:
+    """``sqlite3.Row`` with integer values of timestamp-named columns rendered as ISO strings."""
+    description = cursor.description
+    cached = _timestamp_positions.get(id(description))
+    if cached is None or cached[0] is not description:
+        if len(_timestamp_positions) >= _TIMESTAMP_POSITIONS_LIMIT:
+            _timestamp_positions.clear()
+        positions = tuple(index for index, column in enumerate(description) if column[0] in TIMESTAMP_COLUMNS)
+        cached = _timestamp_positions[id(description)] = (description, positions)
+    if not cached[1]:
+        return sqlite3.Row(cursor, values)
+    converted = list(values)
+    for index in cached[1]:
+        if type(converted[index]) is int:
+            converted[index] = epoch_to_iso(converted[index])
+    return sqlite3.Row(cursor, tuple(converted))
+
+
+def epoch_timestamp_schema(schema_sql: str) -> str:
+    """Rewrite ``schema_sql`` so its timestamp columns store epoch seconds."""
+    columns = "|".join(sorted(TIMESTAMP_COLUMNS))
+    return re.sub(rf"\b({columns}) TEXT NOT NULL", rf"\1 {EPOCH_TIMESTAMP_TYPE} NOT NULL", schema_sql)
+
+
+def detect_epoch_timestamps(conn: sqlite3.Connection) -> Optional[bool]:
+    """Return the timestamp mode of an existing database, or ``None`` for an empty one."""
+    columns = {str(row[1]): str(row[2]) for row in conn.execute("PRAGMA table_info(entities)")}
+    if "created_at" not in columns:
+        return None
+    return columns["created_at"].upper() == EPOCH_TIMESTAMP_TYPE
+
+
+# Named consumer positions (e.g. operation-log replay), written in the same
+# transaction as the work they cover. Created on first use.
+CHECKPOINTS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+  name TEXT PRIMARY KEY,
+  seq INTEGER NOT NULL
+)
+"""
+
+
+# Change-data capture: triggers on the base tables append one row image per
+# write to ``change_log``. Rows carry public ids and snapshot columns in both
+# storage modes (epoch timestamps stay integers until exported); deletes carry
+# only the key columns.
+CHANGE_LOG_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS change_log (
+  seq INTEGER PRIMARY KEY AUTOINCREMENT,
+  table_name TEXT NOT NULL,
+  op TEXT NOT NULL,
+  row TEXT NOT NULL
+)
+"""
+
+CHANGE_LOG_KEYS: Dict[str, Tuple[str, ...]] = {
+    "entities": ("entity_id",),
+    "identifiers": ("identifier_type", "normalized_value"),
+    "aliases": ("identifier_type", "normalized_value"),
+    "merge_records": ("merge_id",),
+    "entity_redirects": ("from_entity_id",),
+}
+
+
+def _storage_table(table: str, integer_keys: bool) -> Tuple[str, Dict[str, str]]:
+    if integer_keys and table in KEYED_TABLES:
+        return KEYED_TABLES[table]
+    return table, {}
+
+
+def change_log_statements(integer_keys: bool) -> List[str]:
+    """The ``change_log`` table and its capture triggers, one idempotent statement each."""
+    statements = [CHANGE_LOG_TABLE_SQL]
+    for table, keys in CHANGE_LOG_KEYS.items():
+        base, key_columns = _storage_table(table, integer_keys)
+        for event, ref, columns in (
+            ("INSERT", "NEW", SNAPSHOT_COLUMNS[table]),
+            ("UPDATE", "NEW", SNAPSHOT_COLUMNS[table]),
+            ("DELETE", "OLD", keys),
+        ):
+            values = []
+            for column in columns:
+                key_column = key_columns.get(column)
+                if key_column is None:
+                    values.append(f"'{column}', {ref}.{column}")
+                else:
+                    values.append(f"'{column}', (SELECT entity_id FROM entities WHERE entity_key = {ref}.{key_column})")
+            op = "delete" if event == "DELETE" else "upsert"
+            when = ""
+            if event == "UPDATE":
+                # Refreshes that leave the row unchanged are not changes.
+                stored = [key_columns.get(column, column) for column in columns]
+                when = " WHEN " + " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in stored)
+            statements.append(
+                f"CREATE TRIGGER IF NOT EXISTS change_log_{table}_{event.lower()} AFTER {event} ON {base}{when} BEGIN "
+                f"INSERT INTO change_log(table_name, op, row) "
+                f"VALUES ('{table}', '{op}', json_object({', '.join(values)})); "
+                "END"
+            )
+    return statements
+
+
+def change_apply_statements(integer_keys: bool) -> Dict[str, Tuple[str, str]]:
+    """Per table, the upsert (snapshot column order) and delete (key order) statements that replay changes."""
+    statements = {}
+    for table, keys in CHANGE_LOG_KEYS.items():
+        base, key_columns = _storage_table(table, integer_keys)
+        columns = SNAPSHOT_COLUMNS[table]
+        targets = [key_columns.get(column, column) for column in columns]
+        values = [ENTITY_KEY_REF if column in key_columns else "?" for column in columns]
+        conflict = [key_columns.get(column, column) for column in keys]
+        updates = [f"{target} = excluded.{target}" for target in targets if target not in conflict]
+        where = " AND ".join(
+            f"{key_columns.get(column, column)} = {ENTITY_KEY_REF if column in key_columns else '?'}" for column in keys
+        )
+        statements[table] = (
+            f"INSERT INTO {base}({', '.join(targets)}) VALUES ({', '.join(values)}) "
+            f"ON CONFLICT({', '.join(conflict)}) DO UPDATE SET {', '.join(updates)}",
+            f"DELETE FROM {base} WHERE {where}",
+        )
+    return statements
+
+
+def detect_change_log(conn: sqlite3.Connection) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_log'").fetchone()
+    return row is not None
@@ -97,7 +97,7 @@ def player_confidence_summary(
     resolver: EntityResolver,
     entity_id: str,
 ) -> Dict[str, Any]:
-    canonical_id = resolver.store.canonical_entity_id(entity_id)
+    canonical_id = resolver.canonical_entity_id(entity_id)
     summary = resolver.confidence_summary(canonical_id)
     return {
         "entity_id": canonical_id,
@@ -114,24 +114,11 @@ def canonical_lineage_snapshot(
     resolver: EntityResolver,
     entity_id: str,
 ) -> Dict[str, Any]:
-    chain = [entity_id]
-    current = entity_id
-    while True:
-        next_target = resolver.store.get_redirect_target(current)
-        if not next_target:
-            break
-        chain.append(next_target)
-        current = next_target
-
-    canonical_id = resolver.store.canonical_entity_id(entity_id)
-    history = resolver.merge_history()
-    lineage_merges = [
-        item
-        for item in history
-        if item["from_entity_id"] in chain
-        or item["to_entity_id"] in chain
-        or item["to_entity_id"] == canonical_id
-    ]
+    chain = resolver.redirect_chain(entity_id)
+    canonical_id = resolver.canonical_entity_id(entity_id)
+    merges = {int(item["merge_id"]): item for item in resolver.merge_history(chain)}
+    merges.update((int(item["merge_id"]), item) for item in resolver.merge_lineage(canonical_id))
+    lineage_merges = [merges[merge_id] for merge_id in sorted(merges)]
 
     return {
         "requested_entity_id": entity_id,
@@ -0,0 +1,425 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .snapshot import (
+    SNAPSHOT_TABLES,
+    read_snapshot,
+    read_snapshot_stream,
+    write_snapshot_json,
+    write_snapshot_stream,
+)
+from .sqlite_backend import SQLiteEntityStore
+from .store import AliasInsert, IdentifierKey, IdentifierUpsert
+
+# Tables kept in the coordinating database; identifiers and aliases live in the shards.
+COORDINATOR_TABLES = ("entities", "merge_records", "entity_redirects")
+
+COORDINATOR_FILENAME = "coordinator.db"
+SHARD_FILENAME = "shard_{index}.db"
+
+
+def shard_for_key(identifier_type: str, normalized_value: str, shard_count: int) -> int:
+    """Stable shard index for an identifier key (blake2b, independent of ``PYTHONHASHSEED``)."""
+    digest = hashlib.blake2b(f"{identifier_type}\x00{normalized_value}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shard_count
+
+
+class ShardedEntityStore:
+    """Entity store spread over one coordinator and ``shard_count`` SQLite files.
+
+    Identifiers and aliases are hash-partitioned by ``(identifier_type,
+    normalized_value)``; entities, redirects and merge records stay in the
+    coordinator, so canonicalization and cross-shard merges work exactly as in
+    a single file. A ``transaction()`` lazily joins each database it writes to
+    and commits the coordinator before the shards, so a crash between commits
+    can leave an unreferenced entity but never an alias pointing at a missing
+    one. Entity creation commits on the coordinator immediately unless the
+    coordinator already joined the transaction; rolled-back resolutions may
+    therefore leave orphan entity rows, which nothing resolves to.
+
+    Every database runs in WAL mode with its own writer lock and a reader
+    pool of at least one connection. Writers on different threads scale as
+    long as each thread's transactions write to a disjoint set of shards
+    (see ``shard_index``). A single batch
+    call joins its shards in ascending order. A transaction composed of
+    several calls must reserve every key it writes first
+    (``reserve_identifiers``, which ``EntityResolver.transaction(keys)`` and
+    the resolver's own calls do) so that all threads and processes lock
+    databases in one order: shards ascending, then the coordinator.
+    Otherwise two writers reaching shards in opposite orders can deadlock.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        shard_count: int = 4,
+        *,
+        canonical_cache: bool = False,
+        reader_pool_size: int = 1,
+        row_cache_size: int = 0,
+        alias_filter: bool = False,
+    ) -> None:
+        if shard_count < 1:
+            raise ValueError("shard_count must be at least 1")
+        if reader_pool_size < 1:
+            # Without a pool, reads of a shard another thread is writing would wait on its writer lock.
+            raise ValueError("reader_pool_size must be at least 1")
+        root = Path(directory)
+        root.mkdir(parents=True, exist_ok=True)
+        existing = len(list(root.glob(SHARD_FILENAME.format(index="*"))))
+        if existing and existing != shard_count:
+            raise ValueError(f"{directory} holds {existing} shards; reopen it with shard_count={existing}")
+        self.directory = str(root)
+        self.shard_count = shard_count
+        self.coordinator = SQLiteEntityStore(
+            str(root / COORDINATOR_FILENAME),
+            canonical_cache=canonical_cache,
+            wal=True,
+            reader_pool_size=reader_pool_size,
+            row_cache_size=row_cache_size,
+        )
+        self.shards = [
+            SQLiteEntityStore(
+                str(root / SHARD_FILENAME.format(index=index)),
+                canonical_cache=False,
+                wal=True,
+                reader_pool_size=reader_pool_size,
+                row_cache_size=row_cache_size,
+                alias_filter=alias_filter,
+            )
+            for index in range(shard_count)
+        ]
+        self._local = threading.local()
+
+    @property
+    def concurrent_reads(self) -> bool:
+        return self.coordinator.concurrent_reads
+
+    def close(self) -> None:
+        self.coordinator.close()
+        for shard in self.shards:
+            shard.close()
+
+    def shard_index(self, identifier_type: str, normalized_value: str) -> int:
+        return shard_for_key(identifier_type, normalized_value, self.shard_count)
+
+    def _shard(self, identifier_type: str, normalized_value: str) -> SQLiteEntityStore:
+        return self.shards[self.shard_index(identifier_type, normalized_value)]
+
+    def _group_by_shard(self, items: Iterable[Any], key) -> Dict[int, List[Any]]:
+        groups: Dict[int, List[Any]] = {}
+        for item in items:
+            groups.setdefault(self.shard_index(*key(item)), []).append(item)
+        # Ascending shard order, so concurrent multi-shard writes join databases in the same order.
+        return dict(sorted(groups.items()))
+
+    def _levels(self) -> List[List[Tuple[SQLiteEntityStore, ContextManager[Any]]]]:
+        levels = getattr(self._local, "levels", None)
+        if levels is None:
+            levels = self._local.levels = []
+        return levels
+
+    @contextmanager
+    def transaction(self) -> Iterator["ShardedEntityStore"]:
+        """Unit of work across the coordinator and every shard written inside the block.
+
+        Databases join on their first write; nested blocks become savepoints in
+        each joined database.
+        """
+        levels = self._levels()
+        levels.append([])
+        try:
+            yield self
+        except BaseException as exc:
+            self._close_level(levels.pop(), exc)
+            raise
+        self._close_level(levels.pop(), None)
+
+    def _close_level(
+        self,
+        participants: List[Tuple[SQLiteEntityStore, ContextManager[Any]]],
+        exc: Optional[BaseException],
+    ) -> None:
+        error = exc
+        ordered = sorted(participants, key=lambda item: item[0] is not self.coordinator)
+        for _, context in ordered:
+            if error is None:
+                try:
+                    context.__exit__(None, None, None)
+                except BaseException as commit_error:  # roll back the databases not yet committed
+                    error = commit_error
+            else:
+                context.__exit__(type(error), error, error.__traceback__)
+        if error is not None and error is not exc:
+            raise error
+
+    def _join(self, store: SQLiteEntityStore, immediate: bool = False) -> SQLiteEntityStore:
+        for level in self._levels():
+            if not any(member is store for member, _ in level):
+                context = store.transaction(immediate=immediate)
+                context.__enter__()
+                level.append((store, context))
+        return store
+
+    def reserve_shards(self, keys: Iterable[IdentifierKey]) -> None:
+        """Join the shards holding ``keys`` to the open transaction now, taking their write locks in ascending order.
+
+        Writers in other processes that reserve every shard they will write
+        before touching the coordinator acquire file locks in one global order
+        (shards ascending, then the coordinator), so they cannot deadlock.
+        """
+        if not self._levels():
+            raise RuntimeError("reserve_shards must be called inside transaction()")
+        for index in sorted({self.shard_index(*key) for key in keys}):
+            self._join(self.shards[index], immediate=True)
+
+    def reserve_identifiers(self, keys: Iterable[IdentifierKey]) -> None:
+        self.reserve_shards(keys)
+
+    def create_entity(self, entity_type: str, entity_id: Optional[str] = None) -> str:
+        return self.coordinator.create_entity(entity_type, entity_id)
+
+    def create_entities(self, entity_types: Sequence[str], entity_ids: Optional[Sequence[str]] = None) -> List[str]:
+        return self.coordinator.create_entities(entity_types, entity_ids)
+
+    def get_checkpoint(self, name: str) -> Optional[int]:
+        return self.coordinator.get_checkpoint(name)
+
+    def set_checkpoint(self, name: str, seq: int) -> None:
+        self._join(self.coordinator).set_checkpoint(name, seq)
+
+    def get_entity(self, entity_id: str) -> Optional[Any]:
+        return self.coordinator.get_entity(entity_id)
+
+    def ensure_entity(self, entity_id: str) -> None:
+        self.coordinator.ensure_entity(entity_id)
+
+    def set_entity_status(self, entity_id: str, status: str) -> None:
+        self._join(self.coordinator).set_entity_status(entity_id, status)
+
+    def canonical_entity_id(self, entity_id: str) -> str:
+        return self.coordinator.canonical_entity_id(entity_id)
+
+    def canonical_cache_stats(self) -> Dict[str, Any]:
+        return self.coordinator.canonical_cache_stats()
+
+    def row_cache_stats(self) -> Dict[str, Any]:
+        return {
+            "coordinator": self.coordinator.row_cache_stats(),
+            "shards": [shard.row_cache_stats() for shard in self.shards],
+        }
+
+    def get_redirect_target(self, from_entity_id: str) -> Optional[str]:
+        return self.coordinator.get_redirect_target(from_entity_id)
+
+    def get_redirect_origin(self, from_entity_id: str) -> Optional[str]:
+        return self.coordinator.get_redirect_origin(from_entity_id)
+
+    def remove_redirect(self, from_entity_id: str) -> None:
+        self._join(self.coordinator).remove_redirect(from_entity_id)
+
+    def merge_entities(self, from_entity_id: str, to_entity_id: str, reason: str, caused_by: str) -> int:
+        # Aliases keep their original owner; cluster reads resolve ownership through redirects.
+        return self._join(self.coordinator).merge_entities(from_entity_id, to_entity_id, reason, caused_by)
+
+    def find_alias(self, identifier_type: str, normalized_value: str) -> Optional[Any]:
+        return self._shard(identifier_type, normalized_value).find_alias(identifier_type, normalized_value)
+
+    def find_aliases(self, keys: Iterable[IdentifierKey]) -> Dict[IdentifierKey, Any]:
+        found: Dict[IdentifierKey, Any] = {}
+        for index, group in self._group_by_shard(keys, lambda key: key).items():
+            found.update(self.shards[index].find_aliases(group))
+        return found
+
+    def get_identifier(self, identifier_type: str, normalized_value: str) -> Optional[Any]:
+        return self._shard(identifier_type, normalized_value).get_identifier(identifier_type, normalized_value)
+
+    def get_identifiers(self, keys: Iterable[IdentifierKey]) -> Dict[IdentifierKey, Any]:
+        found: Dict[IdentifierKey, Any] = {}
+        for index, group in self._group_by_shard(keys, lambda key: key).items():
+            found.update(self.shards[index].get_identifiers(group))
+        return found
+
+    def upsert_identifier(
+        self,
+        identifier_type: str,
+        value: str,
+        normalized_value: str,
+        confidence: float,
+        provenance: Optional[str],
+    ) -> None:
+        shard = self._join(self._shard(identifier_type, normalized_value))
+        shard.upsert_identifier(identifier_type, value, normalized_value, confidence, provenance)
+
+    def upsert_identifiers(self, rows: Sequence[IdentifierUpsert]) -> Dict[IdentifierKey, Dict[str, Any]]:
+        state: Dict[IdentifierKey, Dict[str, Any]] = {}
+        with self.transaction():
+            for index, group in self._group_by_shard(rows, lambda row: (row[0], row[2])).items():
+                state.update(self._join(self.shards[index]).upsert_identifiers(group))
+        return state
+
+    def add_alias(
+        self,
+        identifier_type: str,
+        normalized_value: str,
+        entity_id: str,
+        confidence: float,
+        caused_by: str,
+        provenance: Optional[str] = None,
+    ) -> Tuple[bool, Optional[str]]:
+        with self.transaction():
+            # Shard, then coordinator: holding the coordinator's write lock keeps merges out until the alias commits.
+            shard = self._join(self._shard(identifier_type, normalized_value), immediate=True)
+            canonical_target = self._join(self.coordinator, immediate=True).canonical_entity_id(entity_id)
+            # Shards hold no redirects, so a conflict comes back as the alias's stored owner.
+            added, existing_owner = shard.add_alias(
+                identifier_type, normalized_value, canonical_target, confidence, caused_by, provenance
+            )
+            if added or existing_owner is None:
+                return added, None
+            existing_entity = self.coordinator.canonical_entity_id(existing_owner)
+            if existing_entity != canonical_target:
+                return False, existing_entity
+            shard.add_alias(identifier_type, normalized_value, existing_owner, confidence, caused_by, provenance)
+        return False, None
+
+    def insert_aliases(self, rows: Sequence[AliasInsert]) -> None:
+        with self.transaction():
+            for index, group in self._group_by_shard(rows, lambda row: (row[0], row[1])).items():
+                self._join(self.shards[index]).insert_aliases(group)
+
+    def reassign_aliases(self, from_entity_id: str, to_entity_id: str) -> None:
+        with self.transaction():
+            for shard in self.shards:
+                self._join(shard).reassign_aliases(from_entity_id, to_entity_id)
+
+    def list_cluster_entity_ids(self, entity_id: str) -> List[str]:
+        return self.coordinator.list_cluster_entity_ids(entity_id)
+
+    def _cluster_alias_records(self, entity_id: str) -> List[Dict[str, Any]]:
+        cluster = self.coordinator.list_cluster_entity_ids(entity_id)
+        records: List[Dict[str, Any]] = []
+        for shard in self.shards:
+            records.extend(shard.list_alias_records_for_entity_ids(cluster))
+        records.sort(key=lambda row: (row["identifier_type"], row["normalized_value"]))
+        return records
+
+    def list_aliases_for_entity(self, entity_id: str) -> List[Dict[str, Any]]:
+        return [
+            {
+                "identifier_type": row["identifier_type"],
+                "normalized_value": row["normalized_value"],
+                "entity_id": row["entity_id"],
+                "confidence": row["alias_confidence"],
+            }
+            for row in self._cluster_alias_records(entity_id)
+        ]
+
+    def iter_identifiers_for_entity(self, entity_id: str) -> Iterable[Dict[str, Any]]:
+        for row in self._cluster_alias_records(entity_id):
+            if row["value"] is not None:
+                yield {
+                    "identifier_type": row["identifier_type"],
+                    "value": row["value"],
+                    "normalized_value": row["normalized_value"],
+                    "confidence": row["confidence"],
+                }
+
+    def list_identifier_records_for_entity(self, entity_id: str) -> List[Dict[str, Any]]:
+        return [
+            {
+                "identifier_type": row["identifier_type"],
+                "value": row["value"],
+                "normalized_value": row["normalized_value"],
+                "confidence": row["confidence"],
+                "first_seen_at": row["first_seen_at"],
+                "last_seen_at": row["last_seen_at"],
+                "provenance": row["provenance"],
+            }
+            for row in self._cluster_alias_records(entity_id)
+            if row["value"] is not None
+        ]
+
+    def list_merge_history(self, entity_ids: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        return self.coordinator.list_merge_history(entity_ids)
+
+    def list_merge_lineage(self, entity_id: str) -> List[Dict[str, Any]]:
+        return self.coordinator.list_merge_lineage(entity_id)
+
+    def iter_snapshot_rows(self, chunk_size: int = 1000) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield every row from read transactions opened on all databases before the first row.
+
+        Shards are pinned before the coordinator, which commits entities and
+        merges ahead of the aliases that reference them, so every exported
+        alias finds its entity and the redirects of every merge before it.
+        """
+        with ExitStack() as readers:
+            stores = [*self.shards, self.coordinator]
+            conns = {store: readers.enter_context(store._snapshot_reader()) for store in stores}
+            for table in SNAPSHOT_TABLES:
+                sources = [self.coordinator] if table in COORDINATOR_TABLES else self.shards
+                for store in sources:
+                    yield from store._iter_snapshot_table_rows(conns[store], (table,), chunk_size)
+
+    def export_snapshot(self, output_path: str) -> None:
+        write_snapshot_json(self.iter_snapshot_rows(), output_path)
+
+    def export_snapshot_stream(
+        self,
+        output_path: str,
+        *,
+        chunk_size: int = 1000,
+        compression: Optional[str] = None,
+    ) -> Dict[str, int]:
+        return write_snapshot_stream(
+            self.iter_snapshot_rows(chunk_size),
+            output_path,
+            chunk_size=chunk_size,
+            compression=compression,
+        )
+
+    def import_snapshot_stream(self, input_path: str, *, chunk_size: int = 1000) -> Dict[str, int]:
+        self._ensure_empty_for_import()
+        return self.load_snapshot_rows(read_snapshot_stream(input_path), chunk_size=chunk_size)
+
+    def import_snapshot(self, input_path: str, *, chunk_size: int = 1000) -> Dict[str, int]:
+        """Restore an empty store from ``export_snapshot`` or ``export_snapshot_stream`` output."""
+        self._ensure_empty_for_import()
+        return self.load_snapshot_rows(read_snapshot(input_path), chunk_size=chunk_size)
+
+    def _ensure_empty_for_import(self) -> None:
+        self.coordinator._ensure_empty_for_import()
+        for shard in self.shards:
+            shard._ensure_empty_for_import()
+
+    def load_snapshot_rows(
+        self,
+        rows: Iterable[Tuple[str, Dict[str, Any]]],
+        *,
+        chunk_size: int = 1000,
+    ) -> Dict[str, int]:
+        """Route ``(table, row)`` pairs to their databases and bulk load each one.
+
+        Rows stream straight into every database's bulk loader, so memory
+        stays flat, and each database rebuilds its secondary indexes once.
+        Write locks are taken shards ascending, then the coordinator.
+        """
+        counts = {table: 0 for table in SNAPSHOT_TABLES}
+        with self.transaction(), ExitStack() as loaders:
+            for store in [*self.shards, self.coordinator]:
+                self._join(store, immediate=True)
+            load_coordinator = loaders.enter_context(self.coordinator._snapshot_loader(counts, chunk_size))
+            load_shards = [loaders.enter_context(shard._snapshot_loader(counts, chunk_size)) for shard in self.shards]
+            for table, row in rows:
+                if table in COORDINATOR_TABLES:
+                    load_coordinator(table, row)
+                elif table in SNAPSHOT_TABLES:
+                    load_shards[self.shard_index(row["identifier_type"], row["normalized_value"])](table, row)
+                else:
+                    raise ValueError(f"Unknown snapshot table: {table}")
+        return counts
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Protocol, Sequence, runtime_checkable
+
+from .events import EmittedEvent
+
+DEFAULT_EVENT_BUFFER_CAPACITY = 100_000
+RING_BUFFER_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+
+@runtime_checkable
+class EventSink(Protocol):
+    """Destination for the events of committed resolver units of work, published in commit order."""
+
+    def publish(self, events: Sequence[EmittedEvent]) -> None: ...
+
+    def flush(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class EventBufferFull(RuntimeError):
+    """Raised by a blocking ``RingBufferSink`` whose consumer did not make room in time."""
+
+
+class RingBufferSink:
+    def __init__(
+        self,
+        capacity: int = DEFAULT_EVENT_BUFFER_CAPACITY,
+        *,
+        policy: str = "drop_oldest",
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Hold up to ``capacity`` events for ``drain``.
+
+        When full, ``"drop_oldest"`` evicts the oldest events and
+        ``"drop_newest"`` discards incoming ones (both counted in ``dropped``),
+        while ``"block"`` makes ``publish`` wait for a consumer to drain, up to
+        ``timeout`` seconds, then raise ``EventBufferFull``. Events are only
+        published after their unit of work committed, so a blocked or failed
+        publish never rolls back store writes.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        if policy not in RING_BUFFER_POLICIES:
+            raise ValueError(f"policy must be one of {RING_BUFFER_POLICIES}")
+        self.capacity = capacity
+        self.policy = policy
+        self.timeout = timeout
+        self.dropped = 0
+        self._events: Deque[EmittedEvent] = deque()
+        self._not_full = threading.Condition()
+
+    def publish(self, events: Sequence[EmittedEvent]) -> None:
+        with self._not_full:
+            for event in events:
+                if len(self._events) >= self.capacity:
+                    if self.policy == "drop_newest":
+                        self.dropped += 1
+                        continue
+                    if self.policy == "drop_oldest":
+                        self._events.popleft()
+                        self.dropped += 1
+                    elif not self._not_full.wait_for(lambda: len(self._events) < self.capacity, self.timeout):
+                        raise EventBufferFull(f"event buffer stayed full ({self.capacity} events)")
+                self._events.append(event)
+
+    def drain(self, max_events: Optional[int] = None) -> List[EmittedEvent]:
+        with self._not_full:
+            count = len(self._events) if max_events is None else min(max_events, len(self._events))
+            drained = [self._events.popleft() for _ in range(count)]
+            self._not_full.notify_all()
+        return drained
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._events), "capacity": self.capacity, "policy": self.policy, "dropped": self.dropped}
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlFileSink:
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        batch_size: int = 1000,
+        flush_interval: Optional[float] = 1.0,
+        fsync: bool = False,
+    ) -> None:
+        """Append events to ``path`` as one ``{"event_type", "payload"}`` JSON object per line.
+
+        Lines are written in batches of ``batch_size``; a background thread
+        also writes whatever is pending every ``flush_interval`` seconds
+        (``None`` disables it, leaving ``flush``/``close`` to write the tail).
+        ``fsync=True`` syncs the file after each write for durability.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.written = 0
+        self._handle = self.path.open("a", encoding="utf-8")
+        self._lines: List[str] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if flush_interval is not None:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically,
+                args=(flush_interval,),
+                name="metaspn-entities-event-flusher",
+                daemon=True,
+            )
+            self._flusher.start()
+
+    def publish(self, events: Sequence[EmittedEvent]) -> None:
+        lines = [_dumps(event) for event in events]
+        with self._lock:
+            if self._handle.closed:
+                raise ValueError(f"Event sink {self.path} is closed")
+            self._lines.extend(lines)
+            if len(self._lines) >= self.batch_size:
+                self._write()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._handle.closed:
+                self._write()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            if not self._handle.closed:
+                self._write()
+                self._handle.close()
+
+    def __enter__(self) -> "JsonlFileSink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _write(self) -> None:
+        if not self._lines:
+            return
+        self._handle.write("\n".join(self._lines) + "\n")
+        self._handle.flush()
+        if self.fsync:
+            os.fsync(self._handle.fileno())
+        self.written += len(self._lines)
+        self._lines.clear()
+
+    def _flush_periodically(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.flush()
+
+
+class CallbackSink:
+    def __init__(self, callback: Callable[[List[EmittedEvent]], None]) -> None:
+        """Hand each committed unit of work's events to ``callback`` on the committing thread."""
+        self.callback = callback
+
+    def publish(self, events: Sequence[EmittedEvent]) -> None:
+        self.callback(list(events))
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def read_event_log(path: str | Path) -> Iterator[EmittedEvent]:
+    """Yield the events written by ``JsonlFileSink``, skipping a partially written last line."""
+    with Path(path).open("r", encoding="utf-8") as handle:
+        for line in handle:
+            if not line.endswith("\n"):
+                return
+            record = json.loads(line)
+            yield EmittedEvent(event_type=record["event_type"], payload=record["payload"])
+
+
+def _dumps(event: EmittedEvent) -> str:
+    return json.dumps({"event_type": event.event_type, "payload": event.payload}, sort_keys=True, separators=(",", ":"))
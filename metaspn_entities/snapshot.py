@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import gzip
+import json
+import lzma
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, Optional, Tuple
+
+SNAPSHOT_TABLES = ("entities", "identifiers", "aliases", "merge_records", "entity_redirects")
+
+# Columns of each snapshot table, in the SQLite schema's order; every backend exports exactly these.
+SNAPSHOT_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "entities": ("entity_id", "entity_type", "created_at", "status"),
+    "identifiers": (
+        "identifier_type",
+        "value",
+        "normalized_value",
+        "confidence",
+        "first_seen_at",
+        "last_seen_at",
+        "provenance",
+    ),
+    "aliases": (
+        "identifier_type",
+        "normalized_value",
+        "entity_id",
+        "confidence",
+        "created_at",
+        "caused_by",
+        "provenance",
+    ),
+    "merge_records": ("merge_id", "from_entity_id", "to_entity_id", "reason", "timestamp", "caused_by"),
+    "entity_redirects": ("from_entity_id", "to_entity_id", "timestamp", "reason", "caused_by"),
+}
+
+SNAPSHOT_STREAM_FORMAT = "metaspn-entities-snapshot"
+SNAPSHOT_STREAM_VERSION = 1
+DELTA_STREAM_FORMAT = "metaspn-entities-delta"
+DELTA_STREAM_VERSION = 1
+
+_SUFFIX_COMPRESSION = {".gz": "gzip", ".gzip": "gzip", ".xz": "lzma", ".lzma": "lzma"}
+
+
+def open_snapshot(path: str | Path, mode: str, compression: Optional[str] = None) -> IO[str]:
+    """Open a snapshot file as text, transparently (de)compressing it.
+
+    ``compression`` is ``None``, ``"gzip"`` or ``"lzma"``. When writing it
+    defaults from the file suffix; when reading it is sniffed from the file's
+    magic bytes.
+    """
+    path = Path(path)
+    if compression is None:
+        compression = _detect_compression(path) if mode == "r" else _SUFFIX_COMPRESSION.get(path.suffix.lower())
+    if compression == "gzip":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if compression == "lzma":
+        return lzma.open(path, mode + "t", encoding="utf-8")
+    if compression is not None:
+        raise ValueError(f"Unsupported snapshot compression: {compression}")
+    return path.open(mode, encoding="utf-8")
+
+
+def _detect_compression(path: Path) -> Optional[str]:
+    with path.open("rb") as handle:
+        magic = handle.read(6)
+    if magic[:2] == b"\x1f\x8b":
+        return "gzip"
+    if magic == b"\xfd7zXZ\x00":
+        return "lzma"
+    return None
+
+
+def write_snapshot_stream(
+    rows: Iterable[Tuple[str, Dict[str, Any]]],
+    output_path: str | Path,
+    *,
+    chunk_size: int = 1000,
+    compression: Optional[str] = None,
+) -> Dict[str, int]:
+    """Write ``(table, row)`` pairs as newline-delimited JSON.
+
+    The stream is a header line, one ``{"table", "row"}`` line per row and a
+    footer carrying per-table row counts, written ``chunk_size`` lines at a
+    time so memory stays flat regardless of store size.
+    """
+    path = Path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    counts = {table: 0 for table in SNAPSHOT_TABLES}
+    with open_snapshot(path, "w", compression) as handle:
+        handle.write(_dumps({"format": SNAPSHOT_STREAM_FORMAT, "version": SNAPSHOT_STREAM_VERSION}) + "\n")
+        lines = []
+        for table, row in rows:
+            counts[table] = counts.get(table, 0) + 1
+            lines.append(_dumps({"table": table, "row": row}))
+            if len(lines) >= chunk_size:
+                handle.write("\n".join(lines) + "\n")
+                lines.clear()
+        if lines:
+            handle.write("\n".join(lines) + "\n")
+        handle.write(_dumps({"end": True, "counts": counts}) + "\n")
+    return counts
+
+
+def write_snapshot_json(rows: Iterable[Tuple[str, Dict[str, Any]]], output_path: str | Path) -> None:
+    """Write ``(table, row)`` pairs as the single JSON document produced by ``export_snapshot``."""
+    payload: Dict[str, Any] = {table: [] for table in SNAPSHOT_TABLES}
+    for table, row in rows:
+        payload[table].append(row)
+    path = Path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def read_snapshot(input_path: str | Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``(table, row)`` pairs from either snapshot format."""
+    if is_snapshot_stream(input_path):
+        yield from read_snapshot_stream(input_path)
+        return
+    payload = json.loads(Path(input_path).read_text(encoding="utf-8"))
+    unknown = set(payload) - set(SNAPSHOT_TABLES)
+    if unknown:
+        raise ValueError(f"Unknown snapshot tables: {sorted(unknown)}")
+    for table in SNAPSHOT_TABLES:
+        for row in payload.get(table, []):
+            yield table, row
+
+
+def is_snapshot_stream(input_path: str | Path) -> bool:
+    with open_snapshot(input_path, "r") as handle:
+        first_line = handle.readline()
+    try:
+        header = json.loads(first_line)
+    except ValueError:
+        return False
+    return isinstance(header, dict) and header.get("format") == SNAPSHOT_STREAM_FORMAT
+
+
+def read_snapshot_stream(input_path: str | Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``(table, row)`` pairs from a stream written by ``write_snapshot_stream``.
+
+    Raises ``ValueError`` for a foreign header, an unknown table, or a missing
+    or mismatched footer (a truncated file).
+    """
+    counts: Dict[str, int] = {}
+    with open_snapshot(input_path, "r") as handle:
+        header = json.loads(handle.readline() or "null")
+        if not isinstance(header, dict) or header.get("format") != SNAPSHOT_STREAM_FORMAT:
+            raise ValueError(f"Not a streaming entity snapshot: {input_path}")
+        if header.get("version") != SNAPSHOT_STREAM_VERSION:
+            raise ValueError(f"Unsupported snapshot stream version: {header.get('version')}")
+        for line in handle:
+            record = json.loads(line)
+            if record.get("end"):
+                if record.get("counts", {}) != {table: counts.get(table, 0) for table in record.get("counts", {})}:
+                    raise ValueError(f"Snapshot row counts do not match footer: {input_path}")
+                return
+            table = record["table"]
+            if table not in SNAPSHOT_TABLES:
+                raise ValueError(f"Unknown snapshot table: {table}")
+            counts[table] = counts.get(table, 0) + 1
+            yield table, record["row"]
+    raise ValueError(f"Snapshot stream is truncated: {input_path}")
+
+
+def write_delta_stream(
+    changes: Iterable[Dict[str, Any]],
+    output_path: str | Path,
+    *,
+    since_seq: int = 0,
+    chunk_size: int = 1000,
+    compression: Optional[str] = None,
+) -> Dict[str, int]:
+    """Write change-log entries (``{"seq", "table", "op", "row"}``) as newline-delimited JSON.
+
+    Like a snapshot stream the file is framed by a header and a footer; the
+    footer records the change count and ``until_seq``, the checkpoint a
+    consumer resumes from (``since_seq`` when there were no changes).
+    """
+    path = Path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    until_seq = since_seq
+    with open_snapshot(path, "w", compression) as handle:
+        header = {"format": DELTA_STREAM_FORMAT, "version": DELTA_STREAM_VERSION, "since_seq": since_seq}
+        handle.write(_dumps(header) + "\n")
+        lines = []
+        for change in changes:
+            count += 1
+            until_seq = change["seq"]
+            lines.append(_dumps(change))
+            if len(lines) >= chunk_size:
+                handle.write("\n".join(lines) + "\n")
+                lines.clear()
+        if lines:
+            handle.write("\n".join(lines) + "\n")
+        handle.write(_dumps({"end": True, "changes": count, "until_seq": until_seq}) + "\n")
+    return {"since_seq": since_seq, "until_seq": until_seq, "changes": count}
+
+
+def read_delta_header(input_path: str | Path) -> Dict[str, Any]:
+    with open_snapshot(input_path, "r") as handle:
+        header = json.loads(handle.readline() or "null")
+    if not isinstance(header, dict) or header.get("format") != DELTA_STREAM_FORMAT:
+        raise ValueError(f"Not an entity delta stream: {input_path}")
+    if header.get("version") != DELTA_STREAM_VERSION:
+        raise ValueError(f"Unsupported delta stream version: {header.get('version')}")
+    return header
+
+
+def read_delta_stream(input_path: str | Path) -> Iterator[Dict[str, Any]]:
+    """Yield change-log entries from a stream written by ``write_delta_stream``.
+
+    Raises ``ValueError`` for a foreign header, an unknown table or operation,
+    out-of-order sequence numbers, or a missing or mismatched footer.
+    """
+    last_seq = int(read_delta_header(input_path)["since_seq"])
+    count = 0
+    with open_snapshot(input_path, "r") as handle:
+        handle.readline()
+        for line in handle:
+            record = json.loads(line)
+            if record.get("end"):
+                if record.get("changes") != count or record.get("until_seq") != last_seq:
+                    raise ValueError(f"Delta changes do not match footer: {input_path}")
+                return
+            if record["table"] not in SNAPSHOT_TABLES or record["op"] not in ("upsert", "delete"):
+                raise ValueError(f"Unknown delta change: {record['table']} {record['op']}")
+            if record["seq"] <= last_seq:
+                raise ValueError(f"Delta sequence numbers out of order at {record['seq']}: {input_path}")
+            last_seq = record["seq"]
+            count += 1
+            yield record
+    raise ValueError(f"Delta stream is truncated: {input_path}")
+
+
+def _dumps(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"))
@@ -1,113 +1,505 @@
 from __future__ import annotations
 
 import json
+import queue
 import sqlite3
+import threading
+import time
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
-
-from .models import EntityStatus, utcnow_iso
-
-
-SCHEMA_SQL = """
-CREATE TABLE IF NOT EXISTS entities (
-  entity_id TEXT PRIMARY KEY,
-  entity_type TEXT NOT NULL,
-  created_at TEXT NOT NULL,
-  status TEXT NOT NULL
-);
-
-CREATE TABLE IF NOT EXISTS identifiers (
-  identifier_type TEXT NOT NULL,
-  value TEXT NOT NULL,
-  normalized_value TEXT NOT NULL,
-  confidence REAL NOT NULL,
-  first_seen_at TEXT NOT NULL,
-  last_seen_at TEXT NOT NULL,
-  provenance TEXT,
-  UNIQUE(identifier_type, normalized_value)
-);
-
-CREATE TABLE IF NOT EXISTS aliases (
-  identifier_type TEXT NOT NULL,
-  normalized_value TEXT NOT NULL,
-  entity_id TEXT NOT NULL,
-  confidence REAL NOT NULL,
-  created_at TEXT NOT NULL,
-  caused_by TEXT NOT NULL,
-  provenance TEXT,
-  UNIQUE(identifier_type, normalized_value)
-);
-
-CREATE TABLE IF NOT EXISTS merge_records (
-  merge_id INTEGER PRIMARY KEY AUTOINCREMENT,
-  from_entity_id TEXT NOT NULL,
-  to_entity_id TEXT NOT NULL,
-  reason TEXT NOT NULL,
-  timestamp TEXT NOT NULL,
-  caused_by TEXT NOT NULL
-);
-
-CREATE TABLE IF NOT EXISTS entity_redirects (
-  from_entity_id TEXT PRIMARY KEY,
-  to_entity_id TEXT NOT NULL,
-  timestamp TEXT NOT NULL,
-  reason TEXT NOT NULL,
-  caused_by TEXT NOT NULL
-);
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .bloom import BloomFilter
+from .cache import MISSING, CanonicalIdCache, LRUCache
+from .models import CompactionReport, EntityStatus, epoch_to_iso, iso_to_epoch, utcnow_epoch, utcnow_iso
+from .migrations import SCHEMA_VERSION, apply_migrations, initialize_schema, schema_version
+from .schema import (
+    CHANGE_LOG_KEYS,
+    CHECKPOINTS_TABLE_SQL,
+    ENTITY_KEY_REF,
+    INTEGER_KEY_SECONDARY_INDEXES,
+    KEYED_TABLES,
+    SECONDARY_INDEXES,
+    TIMESTAMP_COLUMNS,
+    change_apply_statements,
+    change_log_statements,
+    detect_change_log,
+    detect_epoch_timestamps,
+    detect_integer_keys,
+    epoch_row_factory,
+    keyed_select_sql,
+    write_statements,
+)
+from .snapshot import (
+    SNAPSHOT_COLUMNS,
+    SNAPSHOT_TABLES,
+    read_delta_header,
+    read_delta_stream,
+    read_snapshot,
+    read_snapshot_stream,
+    write_delta_stream,
+    write_snapshot_json,
+    write_snapshot_stream,
+)
+from .store import IdentifierKey
+
+
+# Keeps the highest confidence and the last non-empty provenance, and bumps last_seen_at.
+UPSERT_IDENTIFIER_SQL = """
+INSERT INTO identifiers(identifier_type, value, normalized_value, confidence, first_seen_at, last_seen_at, provenance)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(identifier_type, normalized_value) DO UPDATE SET
+  value = excluded.value,
+  confidence = max(identifiers.confidence, excluded.confidence),
+  last_seen_at = excluded.last_seen_at,
+  provenance = COALESCE(NULLIF(excluded.provenance, ''), identifiers.provenance)
+"""
+
+# Keys per set-based lookup; two bound parameters each stay well under SQLite's limit.
+LOOKUP_CHUNK_SIZE = 400
+
+# The alias filter is sized for twice the aliases present when it is built and
+# rebuilt once it fills, keeping the false-positive rate near the target.
+ALIAS_FILTER_MIN_CAPACITY = 100_000
+ALIAS_FILTER_ERROR_RATE = 0.01
+
+# Every entity id whose redirect chain ends at the bound canonical id (including itself).
+CLUSTER_CTE = """
+WITH RECURSIVE cluster(entity_id) AS (
+  SELECT ?
+  UNION
+  SELECT r.from_entity_id
+  FROM entity_redirects r
+  JOIN cluster c ON r.to_entity_id = c.entity_id
+)
+"""
+
+MERGE_RECORD_COLUMNS = "merge_id, from_entity_id, to_entity_id, reason, timestamp, caused_by"
+
+# Every merge record in the tree of entities merged into the bound entity,
+# directly or through entities that were themselves merged into it.
+MERGE_LINEAGE_SQL = f"""
+WITH RECURSIVE lineage(merge_id, from_entity_id) AS (
+  SELECT merge_id, from_entity_id FROM merge_records WHERE to_entity_id = ?
+  UNION
+  SELECT m.merge_id, m.from_entity_id
+  FROM merge_records m
+  JOIN lineage l ON m.to_entity_id = l.from_entity_id
+)
+SELECT {MERGE_RECORD_COLUMNS}
+FROM merge_records
+WHERE merge_id IN (SELECT merge_id FROM lineage)
+ORDER BY merge_id
 """
 
 
 class SQLiteEntityStore:
-    def __init__(self, db_path: str = ":memory:") -> None:
+    def __init__(
+        self,
+        db_path: str = ":memory:",
+        *,
+        canonical_cache: bool = False,
+        wal: bool = False,
+        reader_pool_size: int = 0,
+        row_cache_size: int = 0,
+        alias_filter: bool = False,
+        integer_keys: Optional[bool] = None,
+        epoch_timestamps: Optional[bool] = None,
+        auto_migrate: bool = True,
+        change_log: bool = False,
+    ) -> None:
+        """Open (and create if needed) an entity store.
+
+        ``canonical_cache=True`` keeps a union-find cache of canonical entity
+        ids, for a store that is the only writer to its file. Before trusting
+        it, every transaction (and, without a reader pool, every lookup)
+        compares ``PRAGMA data_version`` and drops the cache when another
+        connection has committed, so merges are never made from a stale root;
+        reader pool lookups outside a transaction may still return a root
+        another connection just merged away.
+
+        ``wal=True`` switches the database to write-ahead logging. With
+        ``reader_pool_size > 0`` (WAL file databases only) lookups and context
+        queries run on a bounded pool of read-only connections, so readers on
+        other threads proceed while a single writer connection commits. Writes
+        are always serialized through one lock-guarded connection.
+
+        ``row_cache_size > 0`` puts a read-through LRU cache of that many rows
+        (per table) in front of ``find_alias``, ``get_identifier`` and
+        ``get_entity``. Writes through this store invalidate exactly the rows
+        they touch, so it must stay off when other connections write to the
+        same file.
+
+        ``alias_filter=True`` builds a Bloom filter over every alias key at open
+        time and extends it on each alias insert; ``find_alias`` and
+        ``find_aliases`` answer definite misses from it without a query. It
+        has the same single-writer restriction as the caches.
+
+        ``integer_keys=True`` creates the compact storage mode where entities
+        are referenced by integer keys (see ``KEYED_TABLES``); the default
+        ``None`` keeps whatever mode an existing file uses and creates text-id
+        tables for a new one. Convert an existing file with
+        ``metaspn_entities.migrations.migrate_to_integer_keys``.
+
+        ``epoch_timestamps=True`` stores timestamps as integer UTC seconds
+        instead of ISO text; reads, snapshots and events still carry ISO
+        strings. Like ``integer_keys`` it is fixed when the file is created.
+
+        Opening an existing file only checks its schema version. Older files
+        are upgraded in place by ``metaspn_entities.migrations`` unless
+        ``auto_migrate=False``, in which case the store works without the
+        missing indexes until ``migrations.migrate(db_path)`` is run, possibly
+        while the store is open.
+
+        ``change_log=True`` starts recording every write in the file's
+        append-only change log (see ``enable_change_log``); once enabled the
+        log is part of the file and ``change_log`` reports it on later opens.
+        """
+        if reader_pool_size and (not wal or db_path == ":memory:"):
+            raise ValueError("reader_pool_size requires wal=True and a file-backed database")
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
-        self.conn.executescript(SCHEMA_SQL)
-        self.conn.commit()
+        if wal:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        existing_keys = detect_integer_keys(self.conn)
+        if integer_keys is None:
+            integer_keys = bool(existing_keys)
+        elif existing_keys is not None and existing_keys != integer_keys:
+            raise ValueError(
+                f"{db_path} uses integer_keys={existing_keys}; migrate it with "
+                "metaspn_entities.migrations.migrate_to_integer_keys"
+            )
+        existing_epoch = detect_epoch_timestamps(self.conn)
+        if epoch_timestamps is None:
+            epoch_timestamps = bool(existing_epoch)
+        elif existing_epoch is not None and existing_epoch != epoch_timestamps:
+            raise ValueError(f"{db_path} uses epoch_timestamps={existing_epoch}")
+        self.integer_keys = integer_keys
+        self.epoch_timestamps = epoch_timestamps
+        row_factory = epoch_row_factory if epoch_timestamps else sqlite3.Row
+        self.conn.row_factory = row_factory
+        self._now = utcnow_epoch if epoch_timestamps else utcnow_iso
+        self._sql = write_statements(integer_keys)
+        self._secondary_indexes = INTEGER_KEY_SECONDARY_INDEXES if integer_keys else SECONDARY_INDEXES
+        if existing_keys is None:
+            initialize_schema(self.conn, integer_keys=integer_keys, epoch_timestamps=epoch_timestamps)
+        self.schema_version = schema_version(self.conn)
+        if self.schema_version > SCHEMA_VERSION or (auto_migrate and self.schema_version < SCHEMA_VERSION):
+            # apply_migrations rejects newer files with a ValueError.
+            self.schema_version = apply_migrations(self.conn)
+        self._canonical_cache = CanonicalIdCache() if canonical_cache else None
+        # An in-memory database has no other connections to commit to it.
+        self._data_version = self._read_data_version() if db_path != ":memory:" else None
+        self._alias_cache = LRUCache(row_cache_size) if row_cache_size else None
+        self._identifier_cache = LRUCache(row_cache_size) if row_cache_size else None
+        self._entity_cache = LRUCache(row_cache_size) if row_cache_size else None
+        # Rows written by the open transaction; dropped again on commit so a
+        # concurrent pooled read of the pre-commit row cannot stay cached.
+        self._stale_rows: List[Tuple[LRUCache, Any]] = []
+        self._alias_filter: Optional[BloomFilter] = None
+        self._alias_filter_skips = 0
+        self._transaction_depth = 0
+        self._write_lock = threading.RLock()
+        self._writer_thread: Optional[int] = None
+        self._readers: Optional["queue.Queue[sqlite3.Connection]"] = None
+        self._reader_conns: List[sqlite3.Connection] = []
+        if reader_pool_size:
+            self._readers = queue.Queue(maxsize=reader_pool_size)
+            uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+            for _ in range(reader_pool_size):
+                reader = sqlite3.connect(uri, uri=True, check_same_thread=False)
+                reader.row_factory = row_factory
+                self._reader_conns.append(reader)
+                self._readers.put(reader)
+        if alias_filter:
+            self._rebuild_alias_filter()
+        self.change_log = detect_change_log(self.conn)
+        if change_log and not self.change_log:
+            self.enable_change_log()
+
+    @property
+    def concurrent_reads(self) -> bool:
+        return self._readers is not None
 
     def close(self) -> None:
+        for reader in self._reader_conns:
+            reader.close()
         self.conn.close()
 
-    def create_entity(self, entity_type: str) -> str:
-        entity_id = f"ent_{uuid.uuid4().hex}"
-        now = utcnow_iso()
-        self.conn.execute(
+    @contextmanager
+    def transaction(self, *, immediate: bool = False) -> Iterator["SQLiteEntityStore"]:
+        """Group every write inside the block into a single commit.
+
+        Nested blocks become savepoints, so an inner failure only rolls back
+        the inner writes while the outermost block still owns the commit. The
+        writer lock is held for the whole block, so other threads' writes wait
+        and their reads go to the reader pool (or wait, without one).
+        ``immediate=True`` takes the file's write lock when the outermost block
+        begins instead of at its first write, so other processes' writers wait
+        at that point.
+        """
+        with self._write_lock:
+            depth = self._transaction_depth
+            savepoint = f"metaspn_sp_{depth}"
+            if depth == 0:
+                if self.conn.in_transaction:
+                    self.conn.commit()
+                self.conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+                self._writer_thread = threading.get_ident()
+                if self._canonical_cache is not None and self._data_version is not None:
+                    # Reading data_version starts the transaction's snapshot: no later commit elsewhere goes unseen.
+                    self._sync_canonical_cache()
+            else:
+                self.conn.execute(f"SAVEPOINT {savepoint}")
+            self._transaction_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._transaction_depth -= 1
+                if depth == 0:
+                    self._writer_thread = None
+                    self.conn.rollback()
+                else:
+                    self.conn.execute(f"ROLLBACK TO {savepoint}")
+                    self.conn.execute(f"RELEASE {savepoint}")
+                self._invalidate_caches()
+                raise
+            self._transaction_depth -= 1
+            if depth == 0:
+                self._writer_thread = None
+                try:
+                    self.conn.commit()
+                except BaseException:
+                    # A failed COMMIT (busy, disk full) leaves the transaction open; it must not commit later.
+                    self.conn.rollback()
+                    self._invalidate_caches()
+                    raise
+                self._discard_stale_rows()
+            else:
+                self.conn.execute(f"RELEASE {savepoint}")
+
+    def reserve_identifiers(self, keys: Iterable[IdentifierKey]) -> None:
+        # The transaction's single writer lock already covers every key.
+        pass
+
+    def _in_own_transaction(self) -> bool:
+        return self._transaction_depth > 0 and self._writer_thread == threading.get_ident()
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        # Reads inside this thread's transaction must see its uncommitted writes.
+        if self._readers is None or self._in_own_transaction():
+            with self._write_lock:
+                yield self.conn
+            return
+        reader = self._readers.get()
+        try:
+            yield reader
+        finally:
+            self._readers.put(reader)
+
+    def _fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        with self._reader() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    def _fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        with self._reader() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def _execute_write(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        # A single statement is atomic on its own; only open a unit of work to commit it.
+        if self._in_own_transaction():
+            return self.conn.execute(sql, params)
+        with self.transaction():
+            return self.conn.execute(sql, params)
+
+    def _invalidate_caches(self) -> None:
+        if self._canonical_cache is not None:
+            self._canonical_cache.clear()
+        for cache in (self._alias_cache, self._identifier_cache, self._entity_cache):
+            if cache is not None:
+                cache.clear()
+        self._stale_rows.clear()
+
+    def _invalidate_row(self, cache: Optional[LRUCache], key: Any) -> None:
+        # Call after the write: outside a transaction it is already committed,
+        # inside one the key is dropped again when the transaction commits.
+        if cache is None:
+            return
+        cache.discard(key)
+        if self._in_own_transaction():
+            self._stale_rows.append((cache, key))
+
+    def _discard_stale_rows(self) -> None:
+        for cache, key in self._stale_rows:
+            cache.discard(key)
+        self._stale_rows.clear()
+
+    def _cached_row(self, cache: Optional[LRUCache], key: Any, sql: str) -> Optional[sqlite3.Row]:
+        if cache is None:
+            return self._fetchone(sql, key)
+        row = cache.get(key)
+        if row is MISSING:
+            # A write committed while this read ran may already have discarded the key; do not cache the older row.
+            version = cache.version
+            row = self._fetchone(sql, key)
+            cache.put(key, row, version)
+        return row
+
+    def _rebuild_alias_filter(self) -> None:
+        # Writers call this inside their own transaction, so no alias can be
+        # committed by another thread while the filter is being repopulated.
+        with self._reader() as conn:
+            table = self._sql["alias_table"]
+            count = conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+            bloom = BloomFilter(max(ALIAS_FILTER_MIN_CAPACITY, count * 2), ALIAS_FILTER_ERROR_RATE)
+            for identifier_type, normalized_value in conn.execute(
+                f"SELECT identifier_type, normalized_value FROM {table}"
+            ):
+                bloom.add((identifier_type, normalized_value))
+        self._alias_filter = bloom
+
+    def _note_alias_keys(self, keys: Iterable[IdentifierKey]) -> None:
+        if self._alias_filter is None:
+            return
+        self._alias_filter.update(keys)
+        if self._alias_filter.count > self._alias_filter.capacity:
+            self._rebuild_alias_filter()
+
+    def _alias_may_exist(self, key: IdentifierKey) -> bool:
+        if self._alias_filter is None or key in self._alias_filter:
+            return True
+        self._alias_filter_skips += 1
+        return False
+
+    def alias_filter_stats(self) -> Dict[str, Any]:
+        """Size and accuracy of the alias Bloom filter (empty when ``alias_filter=False``)."""
+        if self._alias_filter is None:
+            return {}
+        return {**self._alias_filter.stats(), "skipped_lookups": self._alias_filter_skips}
+
+    def row_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit/miss/eviction counters of the row caches (empty when ``row_cache_size=0``)."""
+        caches = {"aliases": self._alias_cache, "identifiers": self._identifier_cache, "entities": self._entity_cache}
+        return {name: cache.stats() for name, cache in caches.items() if cache is not None}
+
+    def create_entity(self, entity_type: str, entity_id: Optional[str] = None) -> str:
+        entity_id = entity_id or f"ent_{uuid.uuid4().hex}"
+        now = self._now()
+        self._execute_write(
             "INSERT INTO entities(entity_id, entity_type, created_at, status) VALUES (?, ?, ?, ?)",
             (entity_id, entity_type, now, EntityStatus.ACTIVE),
         )
-        self.conn.commit()
+        if self._canonical_cache is not None:
+            self._canonical_cache.record((), entity_id)
         return entity_id
 
+    def create_entities(self, entity_types: Sequence[str], entity_ids: Optional[Sequence[str]] = None) -> List[str]:
+        entity_ids = list(entity_ids) if entity_ids is not None else [f"ent_{uuid.uuid4().hex}" for _ in entity_types]
+        now = self._now()
+        with self.transaction():
+            self.conn.executemany(
+                "INSERT INTO entities(entity_id, entity_type, created_at, status) VALUES (?, ?, ?, ?)",
+                [
+                    (entity_id, entity_type, now, EntityStatus.ACTIVE)
+                    for entity_id, entity_type in zip(entity_ids, entity_types)
+                ],
+            )
+        if self._canonical_cache is not None:
+            for entity_id in entity_ids:
+                self._canonical_cache.record((), entity_id)
+        return entity_ids
+
     def get_entity(self, entity_id: str) -> Optional[sqlite3.Row]:
-        row = self.conn.execute("SELECT * FROM entities WHERE entity_id = ?", (entity_id,)).fetchone()
-        return row
+        return self._cached_row(self._entity_cache, (entity_id,), "SELECT * FROM entities WHERE entity_id = ?")
+
+    def _read_data_version(self) -> int:
+        return int(self.conn.execute("PRAGMA data_version").fetchone()[0])
+
+    def _sync_canonical_cache(self) -> None:
+        # data_version only moves when another connection commits, which may have merged a cached root away.
+        with self._write_lock:
+            data_version = self._read_data_version()
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self._canonical_cache.clear()
 
     def canonical_entity_id(self, entity_id: str) -> str:
+        version = None
+        if self._canonical_cache is not None:
+            # Transactions check when they begin; lookups on the reader pool skip the check.
+            if self._data_version is not None and self._readers is None and not self._in_own_transaction():
+                self._sync_canonical_cache()
+            version = self._canonical_cache.version
+            cached = self._canonical_cache.find(entity_id)
+            if cached is not None:
+                return cached
+
         current = entity_id
+        path: List[str] = []
         visited = set()
         while True:
             if current in visited:
                 raise ValueError(f"Cycle detected in merge redirects for {entity_id}")
             visited.add(current)
-            row = self.conn.execute(
+            row = self._fetchone(
                 "SELECT to_entity_id FROM entity_redirects WHERE from_entity_id = ?", (current,)
-            ).fetchone()
+            )
             if not row:
-                return current
+                break
+            path.append(current)
             current = row["to_entity_id"]
 
+        if self._canonical_cache is not None:
+            self._canonical_cache.record(path, current, version)
+        return current
+
+    def canonical_cache_stats(self) -> Dict[str, Any]:
+        if self._canonical_cache is None:
+            return {"hits": 0, "misses": 0, "hit_rate": 0.0, "size": 0, "invalidations": 0}
+        return self._canonical_cache.stats()
+
     def find_alias(self, identifier_type: str, normalized_value: str) -> Optional[sqlite3.Row]:
-        return self.conn.execute(
-            "SELECT * FROM aliases WHERE identifier_type = ? AND normalized_value = ?",
+        if not self._alias_may_exist((identifier_type, normalized_value)):
+            return None
+        return self._cached_row(
+            self._alias_cache,
             (identifier_type, normalized_value),
-        ).fetchone()
+            "SELECT * FROM aliases WHERE identifier_type = ? AND normalized_value = ?",
+        )
+
+    def find_aliases(self, keys: Iterable[IdentifierKey]) -> Dict[IdentifierKey, sqlite3.Row]:
+        return self._rows_by_key("aliases", [key for key in keys if self._alias_may_exist(key)])
+
+    def get_identifiers(self, keys: Iterable[IdentifierKey]) -> Dict[IdentifierKey, sqlite3.Row]:
+        return self._rows_by_key("identifiers", keys)
+
+    def _rows_by_key(self, table: str, keys: Iterable[IdentifierKey]) -> Dict[IdentifierKey, sqlite3.Row]:
+        unique = list(dict.fromkeys(keys))
+        found: Dict[IdentifierKey, sqlite3.Row] = {}
+        for start in range(0, len(unique), LOOKUP_CHUNK_SIZE):
+            chunk = unique[start : start + LOOKUP_CHUNK_SIZE]
+            placeholders = ", ".join("(?, ?)" for _ in chunk)
+            params = [part for key in chunk for part in key]
+            rows = self._fetchall(
+                # A row-value IN over VALUES scans the table; joining the VALUES list probes the unique index.
+                f"SELECT t.* FROM (VALUES {placeholders}) AS k JOIN {table} AS t "
+                "ON t.identifier_type = k.column1 AND t.normalized_value = k.column2",
+                params,
+            )
+            for row in rows:
+                found[(row["identifier_type"], row["normalized_value"])] = row
+        return found
 
     def get_identifier(self, identifier_type: str, normalized_value: str) -> Optional[sqlite3.Row]:
-        return self.conn.execute(
-            "SELECT * FROM identifiers WHERE identifier_type = ? AND normalized_value = ?",
+        return self._cached_row(
+            self._identifier_cache,
             (identifier_type, normalized_value),
-        ).fetchone()
+            "SELECT * FROM identifiers WHERE identifier_type = ? AND normalized_value = ?",
+        )
 
     def upsert_identifier(
         self,
@@ -117,29 +509,33 @@ class SQLiteEntityStore:
         confidence: float,
         provenance: Optional[str],
     ) -> None:
-        now = utcnow_iso()
-        existing = self.conn.execute(
-            "SELECT * FROM identifiers WHERE identifier_type = ? AND normalized_value = ?",
-            (identifier_type, normalized_value),
-        ).fetchone()
-        if existing:
-            self.conn.execute(
-                "UPDATE identifiers SET value = ?, confidence = ?, last_seen_at = ?, provenance = ? WHERE identifier_type = ? AND normalized_value = ?",
-                (
-                    value,
-                    max(confidence, existing["confidence"]),
-                    now,
-                    provenance or existing["provenance"],
-                    identifier_type,
-                    normalized_value,
-                ),
-            )
-        else:
-            self.conn.execute(
-                "INSERT INTO identifiers(identifier_type, value, normalized_value, confidence, first_seen_at, last_seen_at, provenance) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (identifier_type, value, normalized_value, confidence, now, now, provenance),
+        now = self._now()
+        self._execute_write(UPSERT_IDENTIFIER_SQL, (identifier_type, value, normalized_value, confidence, now, now, provenance))
+        self._invalidate_row(self._identifier_cache, (identifier_type, normalized_value))
+
+    def upsert_identifiers(
+        self,
+        rows: Sequence[Tuple[str, str, str, float, Optional[str]]],
+    ) -> Dict[IdentifierKey, Dict[str, Any]]:
+        """Apply ``upsert_identifier`` for each ``(type, value, normalized, confidence, provenance)`` row.
+
+        Rows go through one ``executemany`` of the conflict-handling upsert, so
+        repeated keys fold in input order exactly as sequential calls would.
+        Returns the resulting identifier state per key.
+        """
+        now = self._now()
+        with self.transaction():
+            for row in rows:
+                self._invalidate_row(self._identifier_cache, (row[0], row[2]))
+            self.conn.executemany(
+                UPSERT_IDENTIFIER_SQL,
+                [
+                    (identifier_type, value, normalized_value, confidence, now, now, provenance)
+                    for identifier_type, value, normalized_value, confidence, provenance in rows
+                ],
             )
-        self.conn.commit()
+            state = self.get_identifiers((row[0], row[2]) for row in rows)
+        return {key: dict(row) for key, row in state.items()}
 
     def add_alias(
         self,
@@ -150,88 +546,248 @@ class SQLiteEntityStore:
         caused_by: str,
         provenance: Optional[str] = None,
     ) -> Tuple[bool, Optional[str]]:
-        now = utcnow_iso()
-        existing = self.find_alias(identifier_type, normalized_value)
+        now = self._now()
         canonical_target = self.canonical_entity_id(entity_id)
+        inserted = self._execute_write(
+            self._sql["insert_alias_if_absent"],
+            (identifier_type, normalized_value, canonical_target, confidence, now, caused_by, provenance),
+        )
+        if inserted.rowcount == 1:
+            self._note_alias_keys([(identifier_type, normalized_value)])
+            self._invalidate_row(self._alias_cache, (identifier_type, normalized_value))
+            return True, None
 
-        if existing:
-            existing_entity = self.canonical_entity_id(existing["entity_id"])
-            if existing_entity == canonical_target:
-                self.conn.execute(
-                    "UPDATE aliases SET confidence = ?, provenance = ? WHERE identifier_type = ? AND normalized_value = ?",
-                    (
-                        max(confidence, existing["confidence"]),
-                        provenance or existing["provenance"],
-                        identifier_type,
-                        normalized_value,
-                    ),
-                )
-                self.conn.commit()
-                return False, None
+        existing = self._fetchone(
+            "SELECT entity_id FROM aliases WHERE identifier_type = ? AND normalized_value = ?",
+            (identifier_type, normalized_value),
+        )
+        existing_entity = self.canonical_entity_id(existing["entity_id"])
+        if existing_entity != canonical_target:
             return False, existing_entity
-
-        self.conn.execute(
-            "INSERT INTO aliases(identifier_type, normalized_value, entity_id, confidence, created_at, caused_by, provenance) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (identifier_type, normalized_value, canonical_target, confidence, now, caused_by, provenance),
+        self._execute_write(
+            self._sql["refresh_alias"],
+            (confidence, provenance, identifier_type, normalized_value),
         )
-        self.conn.commit()
-        return True, None
+        self._invalidate_row(self._alias_cache, (identifier_type, normalized_value))
+        return False, None
+
+    def insert_aliases(self, rows: Sequence[Tuple[str, str, str, float, str, Optional[str]]]) -> None:
+        """Insert new ``(type, normalized, entity_id, confidence, caused_by, provenance)`` aliases.
+
+        Callers must have checked the keys are unmapped; existing aliases are
+        never rewritten here.
+        """
+        now = self._now()
+        with self.transaction():
+            self._note_alias_keys((row[0], row[1]) for row in rows)
+            for row in rows:
+                self._invalidate_row(self._alias_cache, (row[0], row[1]))
+            self.conn.executemany(
+                self._sql["insert_alias"],
+                [
+                    (identifier_type, normalized_value, entity_id, confidence, now, caused_by, provenance)
+                    for identifier_type, normalized_value, entity_id, confidence, caused_by, provenance in rows
+                ],
+            )
 
     def reassign_aliases(self, from_entity_id: str, to_entity_id: str) -> None:
-        self.conn.execute(
-            "UPDATE aliases SET entity_id = ? WHERE entity_id = ?",
-            (to_entity_id, from_entity_id),
-        )
+        with self.transaction():
+            self._reassign_aliases(from_entity_id, to_entity_id)
+
+    def _reassign_aliases(self, from_entity_id: str, to_entity_id: str) -> int:
+        if self._alias_cache is not None:
+            for row in self.conn.execute(
+                "SELECT identifier_type, normalized_value FROM aliases WHERE entity_id = ?", (from_entity_id,)
+            ):
+                self._invalidate_row(self._alias_cache, (row["identifier_type"], row["normalized_value"]))
+        return self.conn.execute(self._sql["reassign_aliases"], (to_entity_id, from_entity_id)).rowcount
 
     def get_redirect_target(self, from_entity_id: str) -> Optional[str]:
-        row = self.conn.execute(
+        row = self._fetchone(
             "SELECT to_entity_id FROM entity_redirects WHERE from_entity_id = ?",
             (from_entity_id,),
-        ).fetchone()
+        )
         if not row:
             return None
         return str(row["to_entity_id"])
 
+    def get_redirect_origin(self, from_entity_id: str) -> Optional[str]:
+        """Return the entity the active redirect was originally merged into.
+
+        Redirects are flattened to point at the canonical root, so the stored
+        target can differ from the merge target recorded in ``merge_records``.
+        """
+        row = self._fetchone(
+            """
+            SELECT m.to_entity_id
+            FROM entity_redirects r
+            JOIN merge_records m ON m.from_entity_id = r.from_entity_id
+            WHERE r.from_entity_id = ?
+            ORDER BY m.merge_id DESC
+            LIMIT 1
+            """,
+            (from_entity_id,),
+        )
+        if not row:
+            return self.get_redirect_target(from_entity_id)
+        return str(row["to_entity_id"])
+
     def remove_redirect(self, from_entity_id: str) -> None:
-        self.conn.execute("DELETE FROM entity_redirects WHERE from_entity_id = ?", (from_entity_id,))
-        self.conn.commit()
+        self._execute_write(self._sql["delete_redirect"], (from_entity_id,))
+        self._invalidate_row(self._entity_cache, (from_entity_id,))
+        if self._canonical_cache is not None:
+            self._canonical_cache.clear()
 
     def set_entity_status(self, entity_id: str, status: str) -> None:
-        self.conn.execute("UPDATE entities SET status = ? WHERE entity_id = ?", (status, entity_id))
-        self.conn.commit()
+        self._execute_write("UPDATE entities SET status = ? WHERE entity_id = ?", (status, entity_id))
+        self._invalidate_row(self._entity_cache, (entity_id,))
 
     def merge_entities(self, from_entity_id: str, to_entity_id: str, reason: str, caused_by: str) -> int:
-        from_canonical = self.canonical_entity_id(from_entity_id)
-        to_canonical = self.canonical_entity_id(to_entity_id)
+        timestamp = self._now()
+        with self.transaction():
+            from_canonical = self.canonical_entity_id(from_entity_id)
+            to_canonical = self.canonical_entity_id(to_entity_id)
+            if from_canonical == to_canonical:
+                raise ValueError("Entities are already merged")
+
+            # Union step with eager path compression: everything already redirected
+            # into the retired root now points straight at the surviving root.
+            self.conn.execute(self._sql["repoint_redirects"], (to_canonical, from_canonical))
+            self.conn.execute(
+                self._sql["replace_redirect"],
+                (from_canonical, to_canonical, timestamp, reason, caused_by),
+            )
+            self._invalidate_row(self._entity_cache, (from_canonical,))
+            self._invalidate_row(self._entity_cache, (to_canonical,))
+            self.conn.execute(
+                "UPDATE entities SET status = ? WHERE entity_id = ?",
+                (EntityStatus.MERGED, from_canonical),
+            )
+            self.conn.execute(
+                "UPDATE entities SET status = ? WHERE entity_id = ?",
+                (EntityStatus.ACTIVE, to_canonical),
+            )
+            cursor = self.conn.execute(
+                self._sql["insert_merge_record"],
+                (from_canonical, to_canonical, reason, timestamp, caused_by),
+            )
+            if self._canonical_cache is not None:
+                self._canonical_cache.union(from_canonical, to_canonical)
+        return int(cursor.lastrowid)
+
+    def compact(
+        self,
+        *,
+        since_merge_id: Optional[int] = None,
+        batch_size: int = 500,
+        pause_seconds: float = 0.0,
+    ) -> CompactionReport:
+        """Point aliases of merged entities and multi-hop redirects straight at their canonical entity.
 
-        if from_canonical == to_canonical:
-            raise ValueError("Entities are already merged")
+        A full run (the default) visits every redirected entity. With
+        ``since_merge_id`` only the clusters touched by later merges are
+        visited; pass the previous report's ``last_merge_id`` to keep up
+        incrementally. Each ``batch_size`` entities commit in their own
+        transaction with ``pause_seconds`` between them, so compaction can run
+        alongside live writes and resume after an interruption.
 
-        timestamp = utcnow_iso()
-        self.conn.execute(
-            "INSERT OR REPLACE INTO entity_redirects(from_entity_id, to_entity_id, timestamp, reason, caused_by) VALUES (?, ?, ?, ?, ?)",
-            (from_canonical, to_canonical, timestamp, reason, caused_by),
-        )
-        self.conn.execute(
-            "UPDATE entities SET status = ? WHERE entity_id = ?",
-            (EntityStatus.MERGED, from_canonical),
-        )
-        self.conn.execute(
-            "UPDATE entities SET status = ? WHERE entity_id = ?",
-            (EntityStatus.ACTIVE, to_canonical),
+        Redirects and merge records are kept, so canonicalization of retired
+        ids, ``get_redirect_origin`` and ``undo_merge`` behave as before; only
+        the owner recorded on alias rows moves to the canonical entity.
+        """
+        started = time.perf_counter()
+        row = self._fetchone("SELECT max(merge_id) FROM merge_records")
+        last_merge_id = int(row[0] or 0)
+        if since_merge_id is None:
+            sources: Iterable[str] = self._iter_redirect_sources(batch_size)
+        else:
+            sources = self._merged_cluster_members(since_merge_id)
+        scanned = reassigned = flattened = transactions = 0
+        batch: List[str] = []
+
+        def flush() -> None:
+            nonlocal reassigned, flattened, transactions
+            with self.transaction():
+                for entity_id in batch:
+                    target = self.canonical_entity_id(entity_id)
+                    if target == entity_id:
+                        continue
+                    flattened += self.conn.execute(
+                        self._sql["flatten_redirect"], (target, entity_id, target)
+                    ).rowcount
+                    reassigned += self._reassign_aliases(entity_id, target)
+            transactions += 1
+            batch.clear()
+            if pause_seconds:
+                time.sleep(pause_seconds)
+
+        for entity_id in sources:
+            scanned += 1
+            batch.append(entity_id)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+        return CompactionReport(
+            entities_scanned=scanned,
+            aliases_reassigned=reassigned,
+            redirects_flattened=flattened,
+            transactions=transactions,
+            last_merge_id=last_merge_id,
+            elapsed_seconds=time.perf_counter() - started,
         )
-        cursor = self.conn.execute(
-            "INSERT INTO merge_records(from_entity_id, to_entity_id, reason, timestamp, caused_by) VALUES (?, ?, ?, ?, ?)",
-            (from_canonical, to_canonical, reason, timestamp, caused_by),
+
+    def _iter_redirect_sources(self, page_size: int) -> Iterator[str]:
+        # Keyset pages over the base table's rowid, so no read stays open across batches.
+        if self.integer_keys:
+            sql = (
+                "SELECT r.rowid, e.entity_id FROM redirect_keys r JOIN entities e ON e.entity_key = r.from_entity_key "
+                "WHERE r.rowid > ? ORDER BY r.rowid LIMIT ?"
+            )
+        else:
+            sql = "SELECT rowid, from_entity_id FROM entity_redirects WHERE rowid > ? ORDER BY rowid LIMIT ?"
+        last = 0
+        while True:
+            rows = self._fetchall(sql, (last, page_size))
+            if not rows:
+                return
+            for row in rows:
+                yield str(row[1])
+            last = int(rows[-1][0])
+
+    def _merged_cluster_members(self, since_merge_id: int) -> List[str]:
+        rows = self._fetchall("SELECT to_entity_id FROM merge_records WHERE merge_id > ?", (since_merge_id,))
+        roots = dict.fromkeys(self.canonical_entity_id(str(row[0])) for row in rows)
+        members: List[str] = []
+        for root in roots:
+            members.extend(
+                str(row[0])
+                for row in self._fetchall(
+                    CLUSTER_CTE + "SELECT entity_id FROM cluster WHERE entity_id != ?", (root, root)
+                )
+            )
+        return members
+
+    def list_cluster_entity_ids(self, entity_id: str) -> List[str]:
+        target = self.canonical_entity_id(entity_id)
+        rows = self._fetchall(
+            CLUSTER_CTE + "SELECT entity_id FROM cluster ORDER BY entity_id",
+            (target,),
         )
-        self.conn.commit()
-        return int(cursor.lastrowid)
+        return [str(row["entity_id"]) for row in rows]
 
     def list_aliases_for_entity(self, entity_id: str) -> List[Dict[str, Any]]:
         target = self.canonical_entity_id(entity_id)
-        rows = self.conn.execute(
-            "SELECT identifier_type, normalized_value, entity_id, confidence FROM aliases ORDER BY identifier_type, normalized_value"
-        ).fetchall()
+        rows = self._fetchall(
+            CLUSTER_CTE
+            + """
+            SELECT a.identifier_type, a.normalized_value, a.entity_id, a.confidence
+            FROM cluster c
+            JOIN aliases a ON a.entity_id = c.entity_id
+            ORDER BY a.identifier_type, a.normalized_value
+            """,
+            (target,),
+        )
         return [
             {
                 "identifier_type": row["identifier_type"],
@@ -240,24 +796,351 @@ class SQLiteEntityStore:
                 "confidence": row["confidence"],
             }
             for row in rows
-            if self.canonical_entity_id(row["entity_id"]) == target
         ]
 
-    def list_merge_history(self) -> List[Dict[str, Any]]:
-        rows = self.conn.execute(
-            "SELECT merge_id, from_entity_id, to_entity_id, reason, timestamp, caused_by FROM merge_records ORDER BY merge_id"
-        ).fetchall()
-        return [dict(row) for row in rows]
+    def list_alias_records_for_entity_ids(self, entity_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        """Return aliases owned by any of ``entity_ids`` joined with their identifier rows.
+
+        Alias columns keep their names except ``alias_confidence``; identifier
+        columns are ``None`` when the alias has no identifier row in this store.
+        """
+        records: List[Dict[str, Any]] = []
+        unique = list(dict.fromkeys(entity_ids))
+        for start in range(0, len(unique), LOOKUP_CHUNK_SIZE * 2):
+            chunk = unique[start : start + LOOKUP_CHUNK_SIZE * 2]
+            rows = self._fetchall(
+                f"""
+                SELECT
+                  a.identifier_type,
+                  a.normalized_value,
+                  a.entity_id,
+                  a.confidence AS alias_confidence,
+                  i.value,
+                  i.confidence,
+                  i.first_seen_at,
+                  i.last_seen_at,
+                  i.provenance
+                FROM aliases a
+                LEFT JOIN identifiers i
+                  ON a.identifier_type = i.identifier_type
+                 AND a.normalized_value = i.normalized_value
+                WHERE a.entity_id IN ({', '.join('?' for _ in chunk)})
+                """,
+                chunk,
+            )
+            records.extend(dict(row) for row in rows)
+        return records
+
+    def list_merge_history(self, entity_ids: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Return merge records in ``merge_id`` order.
+
+        With ``entity_ids`` only records whose source or target is one of those
+        ids are returned, looked up through the per-column indexes.
+        """
+        if entity_ids is None:
+            rows = self._fetchall(f"SELECT {MERGE_RECORD_COLUMNS} FROM merge_records ORDER BY merge_id")
+            return [dict(row) for row in rows]
+        ids = list(dict.fromkeys(entity_ids))
+        records: Dict[int, Dict[str, Any]] = {}
+        for start in range(0, len(ids), LOOKUP_CHUNK_SIZE):
+            chunk = ids[start : start + LOOKUP_CHUNK_SIZE]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self._fetchall(
+                f"""
+                SELECT {MERGE_RECORD_COLUMNS} FROM merge_records WHERE from_entity_id IN ({placeholders})
+                UNION
+                SELECT {MERGE_RECORD_COLUMNS} FROM merge_records WHERE to_entity_id IN ({placeholders})
+                """,
+                chunk + chunk,
+            )
+            records.update((int(row["merge_id"]), dict(row)) for row in rows)
+        return [records[merge_id] for merge_id in sorted(records)]
+
+    def list_merge_lineage(self, entity_id: str) -> List[Dict[str, Any]]:
+        """Return every merge record in the tree of entities merged into ``entity_id``, recursively."""
+        return [dict(row) for row in self._fetchall(MERGE_LINEAGE_SQL, (entity_id,))]
 
     def export_snapshot(self, output_path: str) -> None:
-        payload: Dict[str, Any] = {}
-        for table in ["entities", "identifiers", "aliases", "merge_records", "entity_redirects"]:
-            rows = self.conn.execute(f"SELECT * FROM {table}").fetchall()
-            payload[table] = [dict(row) for row in rows]
+        write_snapshot_json(self.iter_snapshot_rows(), output_path)
+
+    @contextmanager
+    def _snapshot_reader(self) -> Iterator[sqlite3.Connection]:
+        # One read transaction keeps the tables mutually consistent; on a pooled
+        # WAL store it runs on a reader so the writer is not blocked meanwhile.
+        if self._readers is None or self._in_own_transaction():
+            with self.transaction():
+                yield self.conn
+            return
+        with self._reader() as conn:
+            conn.execute("BEGIN")
+            try:
+                # A deferred BEGIN only takes its snapshot at the first read; take it now.
+                conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+                yield conn
+            finally:
+                conn.rollback()
 
-        path = Path(output_path)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+    def iter_snapshot_rows(
+        self,
+        chunk_size: int = 1000,
+        tables: Sequence[str] = SNAPSHOT_TABLES,
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        with self._snapshot_reader() as conn:
+            yield from self._iter_snapshot_table_rows(conn, tables, chunk_size)
+
+    def _iter_snapshot_table_rows(
+        self, conn: sqlite3.Connection, tables: Sequence[str], chunk_size: int
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for table in tables:
+            if self.integer_keys and table in KEYED_TABLES:
+                sql = keyed_select_sql(table) + " ORDER BY b.rowid"
+            else:
+                sql = f"SELECT {', '.join(SNAPSHOT_COLUMNS[table])} FROM {table} ORDER BY rowid"
+            cursor = conn.execute(sql)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield table, dict(row)
+
+    def export_snapshot_stream(
+        self,
+        output_path: str,
+        *,
+        chunk_size: int = 1000,
+        compression: Optional[str] = None,
+    ) -> Dict[str, int]:
+        return write_snapshot_stream(
+            self.iter_snapshot_rows(chunk_size),
+            output_path,
+            chunk_size=chunk_size,
+            compression=compression,
+        )
+
+    def import_snapshot_stream(self, input_path: str, *, chunk_size: int = 1000) -> Dict[str, int]:
+        self._ensure_empty_for_import()
+        return self.load_snapshot_rows(read_snapshot_stream(input_path), chunk_size=chunk_size)
+
+    def import_snapshot(self, input_path: str, *, chunk_size: int = 1000) -> Dict[str, int]:
+        """Restore an empty store from ``export_snapshot`` or ``export_snapshot_stream`` output."""
+        self._ensure_empty_for_import()
+        return self.load_snapshot_rows(read_snapshot(input_path), chunk_size=chunk_size)
+
+    def _ensure_empty_for_import(self) -> None:
+        for table in SNAPSHOT_TABLES:
+            if self._fetchone(f"SELECT 1 FROM {table} LIMIT 1"):
+                raise ValueError(f"Snapshot import requires an empty store; {table} has rows")
+
+    def load_snapshot_rows(
+        self,
+        rows: Iterable[Tuple[str, Dict[str, Any]]],
+        *,
+        chunk_size: int = 1000,
+    ) -> Dict[str, int]:
+        """Bulk insert ``(table, row)`` pairs in one transaction.
+
+        Secondary indexes are dropped for the load and rebuilt once at the end,
+        which is far cheaper than maintaining them row by row. In integer-key
+        mode every referenced entity must already be loaded, which holds for
+        snapshots since entities are written first.
+        """
+        counts = {table: 0 for table in SNAPSHOT_TABLES}
+        with self._snapshot_loader(counts, chunk_size) as load:
+            for table, row in rows:
+                load(table, row)
+        return counts
+
+    @contextmanager
+    def _snapshot_loader(
+        self, counts: Dict[str, int], chunk_size: int
+    ) -> Iterator[Callable[[str, Dict[str, Any]], None]]:
+        # Yields a per-row loader, so callers routing one stream into several stores keep memory flat.
+        columns = {table: set(SNAPSHOT_COLUMNS[table]) for table in SNAPSHOT_TABLES}
+        pending: Dict[Tuple[str, Tuple[str, ...]], List[Tuple[Any, ...]]] = {}
+        current_table: Optional[str] = None
+
+        def flush(key: Tuple[str, Tuple[str, ...]]) -> None:
+            table, names = key
+            if self.integer_keys and table in KEYED_TABLES:
+                base, key_columns = KEYED_TABLES[table]
+                targets = [key_columns.get(name, name) for name in names]
+                values = [ENTITY_KEY_REF if name in key_columns else "?" for name in names]
+                sql = f"INSERT INTO {base}({', '.join(targets)}) VALUES ({', '.join(values)})"
+            else:
+                sql = f"INSERT INTO {table}({', '.join(names)}) VALUES ({', '.join('?' for _ in names)})"
+            self.conn.executemany(sql, pending.pop(key))
+
+        def load(table: str, row: Dict[str, Any]) -> None:
+            nonlocal current_table
+            if table != current_table:
+                # Keep table order so keyed rows only reference loaded entities.
+                for key in list(pending):
+                    flush(key)
+                current_table = table
+            names = tuple(sorted(row))
+            unknown = set(names) - columns[table]
+            if unknown:
+                raise ValueError(f"Unknown columns for {table}: {sorted(unknown)}")
+            key = (table, names)
+            batch = pending.setdefault(key, [])
+            if self.epoch_timestamps:
+                batch.append(
+                    tuple(
+                        iso_to_epoch(row[name])
+                        if name in TIMESTAMP_COLUMNS and isinstance(row[name], str)
+                        else row[name]
+                        for name in names
+                    )
+                )
+            else:
+                batch.append(tuple(row[name] for name in names))
+            counts[table] += 1
+            if len(batch) >= chunk_size:
+                flush(key)
+
+        with self.transaction():
+            for name in self._secondary_indexes:
+                self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+            yield load
+            for key in list(pending):
+                flush(key)
+            for index_sql in self._secondary_indexes.values():
+                self.conn.execute(index_sql)
+            if self._alias_filter is not None:
+                self._rebuild_alias_filter()
+        self._invalidate_caches()
+
+    def enable_change_log(self) -> None:
+        """Create the ``change_log`` table and the triggers that fill it.
+
+        Every committed insert, update and delete of an entity, identifier,
+        alias, merge record or redirect then appends a row image under a
+        monotonic ``seq``, whichever connection made the write. Writes made
+        before the log was enabled are not recorded, so seed consumers from a
+        snapshot taken after reading ``latest_change_seq()``.
+        """
+        with self.transaction():
+            for statement in change_log_statements(self.integer_keys):
+                self.conn.execute(statement)
+        self.change_log = True
+
+    def _require_change_log(self) -> None:
+        if not self.change_log:
+            raise ValueError(f"{self.db_path} has no change log; open it with change_log=True")
+
+    def latest_change_seq(self) -> int:
+        self._require_change_log()
+        row = self._fetchone("SELECT max(seq) FROM change_log")
+        return int(row[0] or 0)
+
+    def iter_changes(self, since_seq: int = 0, *, chunk_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Yield ``{"seq", "table", "op", "row"}`` for each change after ``since_seq``, oldest first.
+
+        SQLite serializes writers, so sequence numbers become visible in order
+        and the last ``seq`` seen is a safe checkpoint. Timestamps are ISO
+        strings in both timestamp modes.
+        """
+        self._require_change_log()
+        with self._snapshot_reader() as conn:
+            cursor = conn.execute(
+                "SELECT seq, table_name, op, row FROM change_log WHERE seq > ? ORDER BY seq", (since_seq,)
+            )
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for seq, table, op, raw in rows:
+                    row = json.loads(raw)
+                    if self.epoch_timestamps:
+                        for name in TIMESTAMP_COLUMNS.intersection(row):
+                            if isinstance(row[name], int):
+                                row[name] = epoch_to_iso(row[name])
+                    yield {"seq": seq, "table": table, "op": op, "row": row}
+
+    def export_delta(
+        self,
+        output_path: str,
+        since_seq: int = 0,
+        *,
+        chunk_size: int = 1000,
+        compression: Optional[str] = None,
+    ) -> Dict[str, int]:
+        """Write the changes after ``since_seq`` as a delta stream.
+
+        Returns ``since_seq``, ``until_seq`` (the next checkpoint) and the number of ``changes``.
+        """
+        return write_delta_stream(
+            self.iter_changes(since_seq, chunk_size=chunk_size),
+            output_path,
+            since_seq=since_seq,
+            chunk_size=chunk_size,
+            compression=compression,
+        )
+
+    def apply_changes(self, changes: Iterable[Dict[str, Any]]) -> int:
+        """Replay change-log entries in one transaction and return the last ``seq`` applied (0 if none).
+
+        Upserts write the full row image and deletes remove by key, so a
+        change that is already reflected (e.g. in the snapshot a replica was
+        seeded from) applies harmlessly. The replica's own change log, if
+        enabled, records the replayed writes under its own sequence numbers.
+        """
+        statements = change_apply_statements(self.integer_keys)
+        last_seq = 0
+        alias_keys: List[IdentifierKey] = []
+        with self.transaction():
+            for change in changes:
+                table, row = change["table"], change["row"]
+                if table not in statements:
+                    raise ValueError(f"Unknown change table: {table}")
+                upsert_sql, delete_sql = statements[table]
+                if change["op"] == "upsert":
+                    names = SNAPSHOT_COLUMNS[table]
+                elif change["op"] == "delete":
+                    names = CHANGE_LOG_KEYS[table]
+                else:
+                    raise ValueError(f"Unknown change operation: {change['op']}")
+                values = [row.get(name) for name in names]
+                if self.epoch_timestamps:
+                    values = [
+                        iso_to_epoch(value) if name in TIMESTAMP_COLUMNS and isinstance(value, str) else value
+                        for name, value in zip(names, values)
+                    ]
+                self.conn.execute(upsert_sql if change["op"] == "upsert" else delete_sql, values)
+                if table == "aliases" and change["op"] == "upsert":
+                    alias_keys.append((row["identifier_type"], row["normalized_value"]))
+                last_seq = change.get("seq", last_seq)
+            self._note_alias_keys(alias_keys)
+        self._invalidate_caches()
+        return last_seq
+
+    def apply_delta(self, input_path: str) -> int:
+        """Apply an ``export_delta`` file and return its ``until_seq``, the consumer's next checkpoint."""
+        last_seq = self.apply_changes(read_delta_stream(input_path))
+        # The stream has already checked its footer, so an empty delta resumes from its own checkpoint.
+        return last_seq or int(read_delta_header(input_path)["since_seq"])
+
+    def prune_change_log(self, through_seq: int) -> int:
+        """Delete change-log entries up to ``through_seq`` (once every consumer has passed it); returns the count."""
+        self._require_change_log()
+        return self._execute_write("DELETE FROM change_log WHERE seq <= ?", (through_seq,)).rowcount
+
+    def get_checkpoint(self, name: str) -> Optional[int]:
+        """Return the position last recorded under ``name`` with ``set_checkpoint``, if any."""
+        if not self._fetchone("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'checkpoints'"):
+            return None
+        row = self._fetchone("SELECT seq FROM checkpoints WHERE name = ?", (name,))
+        return int(row[0]) if row else None
+
+    def set_checkpoint(self, name: str, seq: int) -> None:
+        """Record a consumer position; inside a transaction it commits together with the writes it covers."""
+        with self.transaction():
+            self.conn.execute(CHECKPOINTS_TABLE_SQL)
+            self.conn.execute(
+                "INSERT INTO checkpoints(name, seq) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET seq = excluded.seq",
+                (name, seq),
+            )
 
     def ensure_entity(self, entity_id: str) -> None:
         row = self.get_entity(entity_id)
@@ -266,29 +1149,31 @@ class SQLiteEntityStore:
 
     def iter_identifiers_for_entity(self, entity_id: str) -> Iterable[Dict[str, Any]]:
         target = self.canonical_entity_id(entity_id)
-        rows = self.conn.execute(
-            """
-            SELECT a.entity_id, i.identifier_type, i.value, i.normalized_value, i.confidence
-            FROM aliases a
+        rows = self._fetchall(
+            CLUSTER_CTE
+            + """
+            SELECT i.identifier_type, i.value, i.normalized_value, i.confidence
+            FROM cluster c
+            JOIN aliases a ON a.entity_id = c.entity_id
             JOIN identifiers i ON a.identifier_type = i.identifier_type AND a.normalized_value = i.normalized_value
             ORDER BY i.identifier_type, i.normalized_value
-            """
-        ).fetchall()
+            """,
+            (target,),
+        )
         for row in rows:
-            if self.canonical_entity_id(row["entity_id"]) == target:
-                yield {
-                    "identifier_type": row["identifier_type"],
-                    "value": row["value"],
-                    "normalized_value": row["normalized_value"],
-                    "confidence": row["confidence"],
-                }
+            yield {
+                "identifier_type": row["identifier_type"],
+                "value": row["value"],
+                "normalized_value": row["normalized_value"],
+                "confidence": row["confidence"],
+            }
 
     def list_identifier_records_for_entity(self, entity_id: str) -> List[Dict[str, Any]]:
         target = self.canonical_entity_id(entity_id)
-        rows = self.conn.execute(
-            """
+        rows = self._fetchall(
+            CLUSTER_CTE
+            + """
             SELECT
-              a.entity_id,
               i.identifier_type,
               i.value,
               i.normalized_value,
@@ -296,13 +1181,15 @@ class SQLiteEntityStore:
               i.first_seen_at,
               i.last_seen_at,
               i.provenance
-            FROM aliases a
+            FROM cluster c
+            JOIN aliases a ON a.entity_id = c.entity_id
             JOIN identifiers i
               ON a.identifier_type = i.identifier_type
              AND a.normalized_value = i.normalized_value
             ORDER BY i.identifier_type, i.normalized_value
-            """
-        ).fetchall()
+            """,
+            (target,),
+        )
         return [
             {
                 "identifier_type": row["identifier_type"],
@@ -314,5 +1201,4 @@ class SQLiteEntityStore:
                 "provenance": row["provenance"],
             }
             for row in rows
-            if self.canonical_entity_id(row["entity_id"]) == target
         ]
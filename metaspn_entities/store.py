@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    runtime_checkable,
+)
+
+IdentifierKey = Tuple[str, str]
+
+# Backends may return ``sqlite3.Row`` or plain dicts; callers only index rows by column name.
+Row = Mapping[str, Any]
+
+IdentifierUpsert = Tuple[str, str, str, float, Optional[str]]
+AliasInsert = Tuple[str, str, str, float, str, Optional[str]]
+
+
+@runtime_checkable
+class EntityStore(Protocol):
+    """Storage operations ``EntityResolver`` and the helper modules rely on.
+
+    Rows are keyed like the SQLite tables: identifiers and aliases by
+    ``(identifier_type, normalized_value)``, redirects by ``from_entity_id``.
+    Every write must join the caller's ``transaction()`` when one is open, and
+    ``merge_entities`` must leave redirects pointing at canonical roots so
+    ``get_redirect_origin`` can recover the original merge target.
+    """
+
+    @property
+    def concurrent_reads(self) -> bool: ...
+
+    def close(self) -> None: ...
+
+    def transaction(self) -> ContextManager[Any]: ...
+
+    # Take the write locks for ``keys`` inside the open transaction before any other write.
+    def reserve_identifiers(self, keys: Iterable[IdentifierKey]) -> None: ...
+
+    # Entities and redirects.
+    def create_entity(self, entity_type: str, entity_id: Optional[str] = None) -> str: ...
+
+    def create_entities(self, entity_types: Sequence[str], entity_ids: Optional[Sequence[str]] = None) -> List[str]: ...
+
+    def get_entity(self, entity_id: str) -> Optional[Row]: ...
+
+    def ensure_entity(self, entity_id: str) -> None: ...
+
+    def set_entity_status(self, entity_id: str, status: str) -> None: ...
+
+    def canonical_entity_id(self, entity_id: str) -> str: ...
+
+    def get_redirect_target(self, from_entity_id: str) -> Optional[str]: ...
+
+    def get_redirect_origin(self, from_entity_id: str) -> Optional[str]: ...
+
+    def remove_redirect(self, from_entity_id: str) -> None: ...
+
+    def merge_entities(self, from_entity_id: str, to_entity_id: str, reason: str, caused_by: str) -> int: ...
+
+    # Identifiers and aliases, single and batch.
+    def find_alias(self, identifier_type: str, normalized_value: str) -> Optional[Row]: ...
+
+    def find_aliases(self, keys: Iterable[IdentifierKey]) -> Dict[IdentifierKey, Row]: ...
+
+    def get_identifier(self, identifier_type: str, normalized_value: str) -> Optional[Row]: ...
+
+    def get_identifiers(self, keys: Iterable[IdentifierKey]) -> Dict[IdentifierKey, Row]: ...
+
+    def upsert_identifier(
+        self,
+        identifier_type: str,
+        value: str,
+        normalized_value: str,
+        confidence: float,
+        provenance: Optional[str],
+    ) -> None: ...
+
+    def upsert_identifiers(self, rows: Sequence[IdentifierUpsert]) -> Dict[IdentifierKey, Dict[str, Any]]: ...
+
+    def add_alias(
+        self,
+        identifier_type: str,
+        normalized_value: str,
+        entity_id: str,
+        confidence: float,
+        caused_by: str,
+        provenance: Optional[str] = None,
+    ) -> Tuple[bool, Optional[str]]: ...
+
+    def insert_aliases(self, rows: Sequence[AliasInsert]) -> None: ...
+
+    def reassign_aliases(self, from_entity_id: str, to_entity_id: str) -> None: ...
+
+    # Merge-cluster read models.
+    def list_cluster_entity_ids(self, entity_id: str) -> List[str]: ...
+
+    def list_aliases_for_entity(self, entity_id: str) -> List[Dict[str, Any]]: ...
+
+    def iter_identifiers_for_entity(self, entity_id: str) -> Iterable[Dict[str, Any]]: ...
+
+    def list_identifier_records_for_entity(self, entity_id: str) -> List[Dict[str, Any]]: ...
+
+    def list_merge_history(self, entity_ids: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]: ...
+
+    def list_merge_lineage(self, entity_id: str) -> List[Dict[str, Any]]: ...
+
+    # Named consumer positions, written atomically with the enclosing transaction.
+    def get_checkpoint(self, name: str) -> Optional[int]: ...
+
+    def set_checkpoint(self, name: str, seq: int) -> None: ...
+
+    # Snapshots.
+    def iter_snapshot_rows(self, chunk_size: int = 1000) -> Iterator[Tuple[str, Dict[str, Any]]]: ...
+
+    def load_snapshot_rows(
+        self,
+        rows: Iterable[Tuple[str, Dict[str, Any]]],
+        *,
+        chunk_size: int = 1000,
+    ) -> Dict[str, int]: ...
+
+    def export_snapshot(self, output_path: str) -> None: ...
+
+    def export_snapshot_stream(
+        self,
+        output_path: str,
+        *,
+        chunk_size: int = 1000,
+        compression: Optional[str] = None,
+    ) -> Dict[str, int]: ...
+
+    def import_snapshot_stream(self, input_path: str, *, chunk_size: int = 1000) -> Dict[str, int]: ...
+
+    def import_snapshot(self, input_path: str, *, chunk_size: int = 1000) -> Dict[str, int]: ...
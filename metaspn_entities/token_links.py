@@ -62,7 +62,7 @@ def link_token_to_project(
         caused_by=caused_by,
         provenance="token-project-link",
     )
-    return resolver.store.canonical_entity_id(project.entity_id)
+    return resolver.canonical_entity_id(project.entity_id)
 
 
 def link_creator_wallet(
@@ -116,9 +116,9 @@ def link_token_project_creator(
             chain=chain,
             caused_by=caused_by,
         )
-        creator_entity_id = resolver.store.canonical_entity_id(creator.entity_id)
+        creator_entity_id = resolver.canonical_entity_id(creator.entity_id)
     return TokenProjectCreatorLinks(
-        token_entity_id=resolver.store.canonical_entity_id(token.entity_id),
+        token_entity_id=resolver.canonical_entity_id(token.entity_id),
         project_entity_id=project_id,
         creator_entity_id=creator_entity_id,
     )
@@ -0,0 +1,123 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from metaspn_entities import sqlite_backend
+from metaspn_entities.bloom import BloomFilter
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+
+class BloomFilterTests(unittest.TestCase):
+    def test_no_false_negatives_and_bounded_false_positives(self) -> None:
+        bloom = BloomFilter(5_000, error_rate=0.01)
+        bloom.update(("email", f"known{i}@example.com") for i in range(5_000))
+        self.assertTrue(all(("email", f"known{i}@example.com") in bloom for i in range(5_000)))
+        false_positives = sum(("email", f"unknown{i}@example.com") in bloom for i in range(20_000))
+        self.assertLess(false_positives / 20_000, 0.03)
+        self.assertAlmostEqual(bloom.estimated_false_positive_rate(), 0.01, delta=0.005)
+        self.assertEqual(bloom.stats()["bytes"], bloom.size_bytes)
+
+    def test_re_adding_known_keys_does_not_fill_the_filter(self) -> None:
+        bloom = BloomFilter(100)
+        keys = [("email", f"known{i}@example.com") for i in range(50)]
+        bloom.update(keys)
+        count, rate = bloom.count, bloom.estimated_false_positive_rate()
+        self.assertGreaterEqual(count, 49)
+        for _ in range(10):
+            bloom.update(keys)
+        self.assertEqual((bloom.count, bloom.estimated_false_positive_rate()), (count, rate))
+
+    def test_rejects_invalid_sizing(self) -> None:
+        with self.assertRaises(ValueError):
+            BloomFilter(0)
+        with self.assertRaises(ValueError):
+            BloomFilter(10, error_rate=1.5)
+
+
+class AliasFilterStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tempdir.name) / "entities.db")
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _statements(self, store: SQLiteEntityStore, fn) -> list:
+        statements = []
+        store.conn.set_trace_callback(statements.append)
+        try:
+            fn()
+        finally:
+            store.conn.set_trace_callback(None)
+        return statements
+
+    def test_unknown_references_skip_the_database(self) -> None:
+        store = SQLiteEntityStore(self.db_path, alias_filter=True)
+        try:
+            resolver = EntityResolver(store)
+            known = resolver.resolve("wallet_address", "0xknown").entity_id
+
+            def attribute_unknowns() -> None:
+                for i in range(50):
+                    result = resolver.attribute_outcome({"wallet_address": f"0xunknown{i}"})
+                    self.assertIsNone(result.entity_id)
+
+            self.assertEqual(self._statements(store, attribute_unknowns), [])
+            self.assertGreaterEqual(store.alias_filter_stats()["skipped_lookups"], 45)
+            self.assertEqual(resolver.attribute_outcome({"wallet_address": "0xknown"}).entity_id, known)
+            self.assertEqual(
+                set(store.find_aliases([("wallet_address", "0xknown"), ("wallet_address", "0xnobody")])),
+                {("wallet_address", "0xknown")},
+            )
+        finally:
+            store.close()
+
+    def test_filter_is_built_at_open_and_extended_on_insert(self) -> None:
+        store = SQLiteEntityStore(self.db_path)
+        entity_id = EntityResolver(store).resolve("email", "before@example.com").entity_id
+        store.close()
+
+        store = SQLiteEntityStore(self.db_path, alias_filter=True)
+        try:
+            self.assertEqual(store.alias_filter_stats()["count"], 1)
+            self.assertEqual(store.find_alias("email", "before@example.com")["entity_id"], entity_id)
+            resolver = EntityResolver(store)
+            resolver.add_alias(entity_id, "email", "after@example.com")
+            resolver.resolve_many([("email", "batch@example.com", None)])
+            self.assertIsNotNone(store.find_alias("email", "after@example.com"))
+            self.assertIsNotNone(store.find_alias("email", "batch@example.com"))
+        finally:
+            store.close()
+
+    def test_filter_grows_when_full(self) -> None:
+        with mock.patch.object(sqlite_backend, "ALIAS_FILTER_MIN_CAPACITY", 8):
+            store = SQLiteEntityStore(self.db_path, alias_filter=True)
+            try:
+                resolver = EntityResolver(store)
+                for i in range(40):
+                    resolver.resolve("twitter_handle", f"grow_{i}")
+                stats = store.alias_filter_stats()
+                self.assertGreaterEqual(stats["capacity"], stats["count"])
+                self.assertTrue(all(store.find_alias("twitter_handle", f"grow_{i}") for i in range(40)))
+            finally:
+                store.close()
+
+    def test_snapshot_import_rebuilds_filter(self) -> None:
+        source = SQLiteEntityStore(self.db_path)
+        EntityResolver(source).resolve("email", "restored@example.com")
+        snapshot = str(Path(self.tempdir.name) / "snapshot.ndjson")
+        source.export_snapshot_stream(snapshot)
+        source.close()
+
+        restored = SQLiteEntityStore(str(Path(self.tempdir.name) / "restored.db"), alias_filter=True)
+        try:
+            restored.import_snapshot(snapshot)
+            self.assertIsNotNone(restored.find_alias("email", "restored@example.com"))
+        finally:
+            restored.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
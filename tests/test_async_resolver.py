@@ -0,0 +1,70 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from metaspn_entities import AsyncEntityResolver, EntityResolver, SQLiteEntityStore
+
+
+class AsyncResolverTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.store = SQLiteEntityStore(str(Path(self.tempdir.name) / "entities.db"), wal=True, reader_pool_size=2)
+        self.resolver = AsyncEntityResolver(EntityResolver(self.store))
+
+    async def asyncTearDown(self) -> None:
+        await self.resolver.aclose()
+        self.store.close()
+        self.tempdir.cleanup()
+
+    async def test_concurrent_requests_for_one_identifier_are_coalesced(self) -> None:
+        results = await asyncio.gather(*(self.resolver.resolve("twitter_handle", "@Same") for _ in range(50)))
+
+        self.assertEqual(len({item.entity_id for item in results}), 1)
+        self.assertGreater(self.resolver.coalesced, 0)
+        count = self.store.conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+        self.assertEqual(count, 1)
+
+    async def test_coalesced_callers_get_their_own_results(self) -> None:
+        first, second = await asyncio.gather(*(self.resolver.resolve("email", "Shared@example.com") for _ in range(2)))
+        self.assertEqual(self.resolver.coalesced, 1)
+        self.assertIsNot(first, second)
+        self.assertEqual(first, second)
+        first.matched_identifiers.append({"identifier_type": "email", "normalized_value": "mutated@example.com"})
+        first.matched_identifiers[0]["confidence"] = 0.0
+        self.assertEqual(len(second.matched_identifiers), 1)
+        self.assertNotEqual(second.matched_identifiers[0]["confidence"], 0.0)
+        # One store operation: its events reach the sink once, not once per caller.
+        drained = await self.resolver.drain_events()
+        self.assertEqual([event.event_type for event in drained], ["EntityAliasAdded", "EntityResolved"])
+
+    async def test_write_and_read_api_round_trip(self) -> None:
+        a = await self.resolver.resolve("twitter_handle", "async_a")
+        b = await self.resolver.resolve("twitter_handle", "async_b")
+        events = await self.resolver.add_alias(a.entity_id, "email", "async@example.com")
+        self.assertEqual(events[0].event_type, "EntityAliasAdded")
+        await self.resolver.merge_entities(a.entity_id, b.entity_id, reason="dedupe")
+
+        attribution = await self.resolver.attribute_outcome({"email": "async@example.com"})
+        self.assertEqual(attribution.entity_id, b.entity_id)
+        context = await self.resolver.entity_context(a.entity_id)
+        self.assertEqual(context.entity_id, b.entity_id)
+        recommendation = await self.resolver.recommendation_context(a.entity_id)
+        self.assertEqual(recommendation.continuity["alias_count"], 3)
+
+        await self.resolver.undo_merge(a.entity_id, b.entity_id)
+        undone = await self.resolver.resolve("twitter_handle", "async_b")
+        self.assertEqual(undone.entity_id, a.entity_id)
+        drained = await self.resolver.drain_events()
+        self.assertIn("EntityMerged", [event.event_type for event in drained])
+
+    async def test_distinct_identifiers_resolve_independently(self) -> None:
+        results = await asyncio.gather(*(self.resolver.resolve("twitter_handle", f"user_{i}") for i in range(100)))
+        self.assertEqual(len({item.entity_id for item in results}), 100)
+        signal = {"source": "social.ingest", "payload": {"platform": "twitter", "author_handle": "user_1"}}
+        result = await self.resolver.resolve_signal(signal)
+        self.assertEqual(result.entity_id, results[1].entity_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
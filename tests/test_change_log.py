@@ -0,0 +1,132 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from metaspn_entities.migrations import migrate_to_integer_keys
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+
+def _snapshot(store: SQLiteEntityStore) -> list:
+    return sorted(map(repr, store.iter_snapshot_rows()))
+
+
+class ChangeLogTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _populate(self, resolver: EntityResolver, prefix: str) -> None:
+        first = resolver.resolve("email", f"{prefix}a@example.com").entity_id
+        second = resolver.resolve("email", f"{prefix}b@example.com").entity_id
+        resolver.add_alias(first, "github", f"{prefix}gh", caused_by="test")
+        resolver.merge_entities(first, second, reason="duplicate", caused_by="test")
+        resolver.undo_merge(first, second, caused_by="test")
+
+    def test_writes_are_logged_in_sequence(self) -> None:
+        store = SQLiteEntityStore(change_log=True)
+        resolver = EntityResolver(store)
+        entity_id = resolver.resolve("email", "a@example.com").entity_id
+        resolver.resolve("email", "a@example.com")
+        changes = list(store.iter_changes())
+        self.assertEqual([change["seq"] for change in changes], list(range(1, len(changes) + 1)))
+        self.assertEqual(
+            [(change["table"], change["op"]) for change in changes[:3]],
+            [("identifiers", "upsert"), ("entities", "upsert"), ("aliases", "upsert")],
+        )
+        self.assertEqual(changes[1]["row"]["entity_id"], entity_id)
+        checkpoint = store.latest_change_seq()
+
+        store.remove_redirect(entity_id)
+        self.assertEqual(store.latest_change_seq(), checkpoint)
+        resolver.merge_entities(entity_id, resolver.resolve("email", "b@example.com").entity_id, reason="r")
+        tables = {(change["table"], change["op"]) for change in store.iter_changes(checkpoint)}
+        self.assertLessEqual({("entity_redirects", "upsert"), ("merge_records", "upsert")}, tables)
+        self.assertTrue(all(change["seq"] > checkpoint for change in store.iter_changes(checkpoint)))
+
+    def test_incremental_deltas_replicate_across_storage_modes(self) -> None:
+        source = SQLiteEntityStore(str(self.root / "source.db"), epoch_timestamps=True, change_log=True)
+        resolver = EntityResolver(source)
+        replicas = [SQLiteEntityStore(), SQLiteEntityStore(integer_keys=True, epoch_timestamps=True)]
+        checkpoints = [0, 0]
+        try:
+            for batch in range(3):
+                self._populate(resolver, f"b{batch}")
+                for index, replica in enumerate(replicas):
+                    path = self.root / f"delta_{batch}_{index}.ndjson.gz"
+                    report = source.export_delta(str(path), checkpoints[index])
+                    self.assertEqual(report["since_seq"], checkpoints[index])
+                    checkpoints[index] = replica.apply_delta(str(path))
+                    self.assertEqual(checkpoints[index], source.latest_change_seq())
+                    self.assertEqual(_snapshot(replica), _snapshot(source))
+
+            empty = self.root / "empty.ndjson"
+            self.assertEqual(source.export_delta(str(empty), checkpoints[0])["changes"], 0)
+            self.assertEqual(replicas[0].apply_delta(str(empty)), checkpoints[0])
+        finally:
+            source.close()
+
+    def test_replica_seeded_from_snapshot_after_enabling(self) -> None:
+        source = SQLiteEntityStore()
+        resolver = EntityResolver(source)
+        self._populate(resolver, "before")
+        source.enable_change_log()
+        checkpoint = source.latest_change_seq()
+        snapshot_path = self.root / "seed.ndjson"
+        source.export_snapshot_stream(str(snapshot_path))
+        self._populate(resolver, "after")
+
+        replica = SQLiteEntityStore(integer_keys=True, row_cache_size=16, alias_filter=True)
+        replica.import_snapshot_stream(str(snapshot_path))
+        self.assertIsNone(replica.find_alias("email", "aftera@example.com"))
+        delta_path = self.root / "delta.ndjson"
+        source.export_delta(str(delta_path), checkpoint)
+        replica.apply_delta(str(delta_path))
+        self.assertEqual(_snapshot(replica), _snapshot(source))
+        self.assertIsNotNone(replica.find_alias("email", "aftera@example.com"))
+
+    def test_truncated_delta_is_rejected_without_changes(self) -> None:
+        source = SQLiteEntityStore(change_log=True)
+        self._populate(EntityResolver(source), "x")
+        path = self.root / "delta.ndjson"
+        source.export_delta(str(path))
+        lines = path.read_text(encoding="utf-8").splitlines()
+        path.write_text("\n".join(lines[:-1]) + "\n", encoding="utf-8")
+        replica = SQLiteEntityStore()
+        with self.assertRaises(ValueError):
+            replica.apply_delta(str(path))
+        self.assertEqual(_snapshot(replica), [])
+
+    def test_log_survives_reopen_integer_key_conversion_and_pruning(self) -> None:
+        db_path = str(self.root / "entities.db")
+        store = SQLiteEntityStore(db_path, change_log=True)
+        self._populate(EntityResolver(store), "x")
+        before = store.latest_change_seq()
+        store.close()
+
+        migrate_to_integer_keys(db_path)
+        store = SQLiteEntityStore(db_path)
+        try:
+            self.assertTrue(store.change_log and store.integer_keys)
+            self.assertEqual(store.latest_change_seq(), before)
+            entity_id = EntityResolver(store).resolve("email", "new@example.com").entity_id
+            rows = [change["row"] for change in store.iter_changes(before) if change["table"] == "aliases"]
+            self.assertEqual(rows[0]["entity_id"], entity_id)
+
+            self.assertEqual(store.prune_change_log(before), before)
+            self.assertEqual(next(store.iter_changes())["seq"], before + 1)
+        finally:
+            store.close()
+
+    def test_stores_without_a_log_refuse_delta_export(self) -> None:
+        store = SQLiteEntityStore()
+        self.assertFalse(store.change_log)
+        with self.assertRaises(ValueError):
+            store.export_delta(str(self.root / "delta.ndjson"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+
+class CompactionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _store(self, name: str, **options) -> SQLiteEntityStore:
+        store = SQLiteEntityStore(str(self.root / f"{name}.db"), **options)
+        self.addCleanup(store.close)
+        return store
+
+    def _alias_owners(self, store: SQLiteEntityStore) -> dict:
+        return {
+            row["normalized_value"]: row["entity_id"]
+            for table, row in store.iter_snapshot_rows(tables=("aliases",))
+        }
+
+    def test_full_compaction_moves_aliases_to_canonical_entities(self) -> None:
+        for integer_keys in (False, True):
+            with self.subTest(integer_keys=integer_keys):
+                store = self._store(f"full_{integer_keys}", integer_keys=integer_keys, row_cache_size=32)
+                resolver = EntityResolver(store)
+                ids = {name: resolver.resolve("email", f"{name}@example.com").entity_id for name in "abcde"}
+                resolver.merge_entities(ids["a"], ids["b"], reason="dup")
+                resolver.merge_entities(ids["c"], ids["b"], reason="dup")
+                resolver.merge_entities(ids["b"], ids["d"], reason="dup")
+                self.assertEqual(store.find_alias("email", "a@example.com")["entity_id"], ids["a"])
+
+                report = store.compact(batch_size=2)
+                self.assertEqual((report.entities_scanned, report.aliases_reassigned), (3, 3))
+                self.assertEqual((report.redirects_flattened, report.transactions, report.last_merge_id), (0, 2, 3))
+                owners = self._alias_owners(store)
+                for name in "abcd":
+                    self.assertEqual(owners[f"{name}@example.com"], ids["d"])
+                    self.assertEqual(store.find_alias("email", f"{name}@example.com")["entity_id"], ids["d"])
+                    self.assertEqual(resolver.resolve("email", f"{name}@example.com").entity_id, ids["d"])
+                self.assertEqual(owners["e@example.com"], ids["e"])
+                self.assertEqual(store.canonical_entity_id(ids["a"]), ids["d"])
+                self.assertEqual(store.get_redirect_origin(ids["a"]), ids["b"])
+
+                self.assertEqual(store.compact().aliases_reassigned, 0)
+
+    def test_multi_hop_redirects_are_flattened(self) -> None:
+        store = self._store("legacy", canonical_cache=False)
+        resolver = EntityResolver(store)
+        ids = [resolver.resolve("email", f"hop{i}@example.com").entity_id for i in range(4)]
+        # Chains written before merges flattened redirects.
+        for source, target in zip(ids, ids[1:]):
+            store.conn.execute(
+                "INSERT INTO entity_redirects VALUES (?, ?, '2025-01-01T00:00:00+00:00', 'legacy', 'import')",
+                (source, target),
+            )
+        store.conn.commit()
+
+        report = store.compact()
+        self.assertEqual((report.redirects_flattened, report.aliases_reassigned), (2, 3))
+        targets = {
+            row["from_entity_id"]: row["to_entity_id"]
+            for _, row in store.iter_snapshot_rows(tables=("entity_redirects",))
+        }
+        self.assertEqual(targets, {entity_id: ids[3] for entity_id in ids[:3]})
+
+    def test_undo_merge_after_compaction_matches_uncompacted_store(self) -> None:
+        results = []
+        for compact in (False, True):
+            store = self._store(f"undo_{compact}")
+            resolver = EntityResolver(store)
+            ids = {name: resolver.resolve("twitter_handle", f"undo_{name}").entity_id for name in "abc"}
+            resolver.add_alias(ids["a"], "email", "undo_a@example.com")
+            resolver.merge_entities(ids["a"], ids["b"], reason="dedupe")
+            resolver.merge_entities(ids["b"], ids["c"], reason="dedupe")
+            if compact:
+                store.compact()
+            resolver.undo_merge(ids["a"], ids["b"])
+            if compact:
+                store.compact()
+            names = {entity_id: name for name, entity_id in ids.items()}
+            results.append(
+                [
+                    names[resolver.resolve(identifier_type, value).entity_id]
+                    for identifier_type, value in (
+                        ("twitter_handle", "undo_a"),
+                        ("twitter_handle", "undo_b"),
+                        ("twitter_handle", "undo_c"),
+                        ("email", "undo_a@example.com"),
+                    )
+                ]
+                + [names[resolver.attribute_outcome({"entity_id": ids["c"]}).entity_id]]
+                + [len(resolver.aliases_for_entity(ids["b"]))]
+            )
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[1][:5], ["a"] * 5)
+
+    def test_incremental_compaction_only_visits_new_merges(self) -> None:
+        store = self._store("incremental", integer_keys=True)
+        resolver = EntityResolver(store)
+        ids = [resolver.resolve("email", f"inc{i}@example.com").entity_id for i in range(6)]
+        resolver.merge_entities(ids[0], ids[1], reason="dup")
+        report = store.compact()
+        self.assertEqual(report.aliases_reassigned, 1)
+
+        resolver.merge_entities(ids[2], ids[3], reason="dup")
+        resolver.merge_entities(ids[1], ids[4], reason="dup")
+        report = store.compact(since_merge_id=report.last_merge_id, batch_size=1)
+        # Both retired members of the 0->1->4 cluster and the new 2->3 merge.
+        self.assertEqual((report.entities_scanned, report.transactions), (3, 3))
+        self.assertEqual(report.aliases_reassigned, 3)
+        self.assertEqual(report.last_merge_id, 3)
+        owners = self._alias_owners(store)
+        self.assertEqual(
+            [owners[f"inc{i}@example.com"] for i in range(6)],
+            [ids[4], ids[4], ids[3], ids[3], ids[4], ids[5]],
+        )
+        self.assertEqual(store.compact(since_merge_id=report.last_merge_id).entities_scanned, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import tempfile
+import threading
+import time
+import unittest
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from metaspn_entities.adapter import resolve_normalized_social_signal
+from metaspn_entities.locks import StripedLock
+from metaspn_entities.memory_backend import InMemoryEntityStore
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.sharded_backend import ShardedEntityStore
+from metaspn_entities.sinks import CallbackSink
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+THREADS = 8
+PEOPLE = 40
+
+
+class StripedLockTests(unittest.TestCase):
+    def test_equal_keys_share_a_reentrant_stripe(self) -> None:
+        locks = StripedLock(4)
+        self.assertEqual(len(locks), 4)
+        self.assertEqual(locks.stripe(("email", "a@example.com")), locks.stripe(("email", "a@example.com")))
+        keys = [("email", f"{i}@example.com") for i in range(20)]
+        with locks.hold(keys), locks.hold(keys[:3]):
+            pass
+        with self.assertRaises(ValueError):
+            StripedLock(0)
+
+
+class ConcurrentResolverTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _stores(self) -> dict:
+        return {
+            "sqlite": SQLiteEntityStore(str(self.root / "entities.db"), wal=True, reader_pool_size=2),
+            "memory": InMemoryEntityStore(),
+            "sharded": ShardedEntityStore(str(self.root / "shards"), shard_count=3),
+        }
+
+    def test_contended_identifiers_create_one_entity_each(self) -> None:
+        for label, store in self._stores().items():
+            with self.subTest(store=label):
+                published = []
+                resolver = EntityResolver(store, matched_identifiers="lazy", event_sink=CallbackSink(published.extend))
+                barrier = threading.Barrier(THREADS)
+
+                def work(worker: int) -> list:
+                    barrier.wait()
+                    seen = []
+                    for step in range(PEOPLE * 2):
+                        person = (step * (worker + 1)) % PEOPLE
+                        email = f"user{person}@example.com"
+                        if step % 3 == 0:
+                            envelope = {"source": "stress", "payload": {"email": email}}
+                            seen.append((email, resolve_normalized_social_signal(resolver, envelope).entity_id))
+                        elif step % 3 == 1:
+                            seen.append((email, resolver.resolve("email", email).entity_id))
+                        else:
+                            neighbour = f"user{(person + 1) % PEOPLE}@example.com"
+                            batch = [("email", email, None), ("email", neighbour, None)]
+                            seen.append((email, resolver.resolve_many(batch)[0].entity_id))
+                        resolver.attribute_outcome({"email": email})
+                    return seen
+
+                with ThreadPoolExecutor(THREADS) as pool:
+                    futures = [pool.submit(work, i) for i in range(THREADS)]
+                    results = [item for future in futures for item in future.result()]
+
+                owners = defaultdict(set)
+                for email, entity_id in results:
+                    owners[email].add(entity_id)
+                self.assertEqual(len(owners), PEOPLE)
+                self.assertTrue(all(len(entity_ids) == 1 for entity_ids in owners.values()))
+                entities = [row for table, row in store.iter_snapshot_rows() if table == "entities"]
+                self.assertEqual(len(entities), PEOPLE)
+                self.assertEqual(sum(event.event_type == "EntityAliasAdded" for event in published), PEOPLE)
+                store.close()
+
+    def test_multi_identifier_envelopes_do_not_deadlock_across_shards(self) -> None:
+        store = ShardedEntityStore(str(self.root / "multi"), shard_count=4)
+        resolver = EntityResolver(store)
+        barrier = threading.Barrier(THREADS)
+        owners = defaultdict(set)
+        errors = []
+
+        def work(worker: int) -> None:
+            try:
+                barrier.wait()
+                for step in range(PEOPLE * 2):
+                    person = (step * (worker + 1) + worker) % PEOPLE
+                    # Three identifiers per envelope, usually on three shards reached in varying orders.
+                    payload = {
+                        "email": f"user{person}@example.com",
+                        "handle": f"@user{person}",
+                        "platform": "twitter",
+                        "domain": f"user{person}.example.com",
+                    }
+                    result = resolve_normalized_social_signal(resolver, {"source": "stress", "payload": payload})
+                    owners[person].add(result.entity_id)
+            except Exception as exc:  # pragma: no cover - surfaced below
+                errors.append(exc)
+
+        # Daemon threads with a join timeout: a deadlock fails the test instead of hanging the run.
+        threads = [threading.Thread(target=work, args=(i,), daemon=True) for i in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 30
+        for thread in threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        self.assertFalse(any(thread.is_alive() for thread in threads), "resolver threads deadlocked")
+        self.assertEqual(errors, [])
+        self.assertEqual(len(owners), PEOPLE)
+        self.assertTrue(all(len(entity_ids) == 1 for entity_ids in owners.values()))
+        for person, (entity_id,) in owners.items():
+            self.assertEqual(store.find_alias("domain", f"user{person}.example.com")["entity_id"], entity_id)
+        store.close()
+
+    def test_units_of_work_and_captured_events_are_per_thread(self) -> None:
+        resolver = EntityResolver(SQLiteEntityStore(str(self.root / "units.db"), wal=True, reader_pool_size=2))
+        barrier = threading.Barrier(THREADS)
+
+        def work(worker: int) -> None:
+            barrier.wait()
+            for step in range(20):
+                email = f"w{worker}s{step}@example.com"
+                if step % 4 == 3:
+                    with self.assertRaises(RuntimeError):
+                        with resolver.transaction():
+                            resolver.resolve("email", email)
+                            raise RuntimeError("abort")
+                    continue
+                result = resolve_normalized_social_signal(resolver, {"source": "t", "payload": {"email": email}})
+                self.assertEqual({event.payload["entity_id"] for event in result.emitted_events}, {result.entity_id})
+                self.assertEqual(len(result.emitted_events), 2)
+
+        with ThreadPoolExecutor(THREADS) as pool:
+            for future in [pool.submit(work, i) for i in range(THREADS)]:
+                future.result()
+
+        events = resolver.drain_events()
+        self.assertEqual(len(events), THREADS * 15 * 2)
+        aborted = ("s3@example.com", "s7@example.com")
+        self.assertFalse(any(event.payload.get("alias", "").endswith(aborted) for event in events))
+        resolver.store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
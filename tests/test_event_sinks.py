@@ -0,0 +1,150 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from metaspn_entities.adapter import resolve_normalized_social_signal
+from metaspn_entities.events import EmittedEvent
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.sinks import CallbackSink, EventBufferFull, JsonlFileSink, RingBufferSink, read_event_log
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+
+def _events(count: int) -> list:
+    return [EmittedEvent("EntityResolved", {"n": i}) for i in range(count)]
+
+
+class RingBufferSinkTests(unittest.TestCase):
+    def test_drop_policies_keep_the_buffer_bounded(self) -> None:
+        oldest = RingBufferSink(3)
+        oldest.publish(_events(5))
+        self.assertEqual([event.payload["n"] for event in oldest.drain()], [2, 3, 4])
+        newest = RingBufferSink(3, policy="drop_newest")
+        newest.publish(_events(5))
+        self.assertEqual([event.payload["n"] for event in newest.drain()], [0, 1, 2])
+        self.assertEqual((oldest.dropped, newest.dropped, len(newest)), (2, 2, 0))
+
+    def test_block_policy_waits_for_a_consumer(self) -> None:
+        sink = RingBufferSink(2, policy="block", timeout=0.05)
+        with self.assertRaises(EventBufferFull):
+            sink.publish(_events(3))
+
+        sink = RingBufferSink(2, policy="block", timeout=5)
+        drained = []
+
+        def consume() -> None:
+            while len(drained) < 5:
+                drained.extend(sink.drain(1))
+                time.sleep(0.001)
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        sink.publish(_events(5))
+        consumer.join()
+        self.assertEqual([event.payload["n"] for event in drained], [0, 1, 2, 3, 4])
+        self.assertEqual(sink.dropped, 0)
+
+
+class ResolverSinkTests(unittest.TestCase):
+    def test_events_are_published_on_commit_only(self) -> None:
+        batches = []
+        resolver = EntityResolver(SQLiteEntityStore(), event_sink=CallbackSink(batches.append))
+        with resolver.transaction():
+            resolver.resolve("email", "kept@example.com")
+            with self.assertRaises(RuntimeError):
+                with resolver.transaction():
+                    resolver.resolve("email", "inner@example.com")
+                    raise RuntimeError("abort inner")
+            self.assertEqual(batches, [])
+        with self.assertRaises(RuntimeError):
+            with resolver.transaction():
+                resolver.resolve("email", "discarded@example.com")
+                raise RuntimeError("abort batch")
+        resolver.resolve_many([("email", f"batch{i}@example.com", None) for i in range(3)])
+
+        self.assertEqual([len(batch) for batch in batches], [2, 6])
+        self.assertEqual(
+            [event.event_type for event in batches[0]],
+            ["EntityAliasAdded", "EntityResolved"],
+        )
+        self.assertEqual(resolver.drain_events(), [])
+
+    def test_nested_captures_collect_the_outer_commit(self) -> None:
+        batches = []
+        resolver = EntityResolver(SQLiteEntityStore(), event_sink=CallbackSink(batches.append))
+        with resolver.capture_events() as outer, resolver.transaction():
+            resolver.resolve("email", "first@example.com")
+            envelope = {"source": "t", "payload": {"email": "nested@example.com"}}
+            # The adapter returns its own pending events before the outer transaction publishes them.
+            result = resolve_normalized_social_signal(resolver, envelope)
+            event_types = [event.event_type for event in result.emitted_events]
+            self.assertEqual(event_types, ["EntityAliasAdded", "EntityResolved"])
+            self.assertEqual({event.payload["entity_id"] for event in result.emitted_events}, {result.entity_id})
+            self.assertEqual((outer, batches), ([], []))
+        self.assertEqual(len(outer), 4)
+        self.assertEqual(outer[2:], result.emitted_events)
+        self.assertEqual(batches, [outer])
+
+    def test_default_buffer_is_bounded(self) -> None:
+        resolver = EntityResolver(SQLiteEntityStore(), event_sink=RingBufferSink(4))
+        for i in range(5):
+            resolver.resolve("email", f"bounded{i}@example.com")
+        self.assertEqual(len(resolver.drain_events()), 4)
+        self.assertEqual(resolver.event_sink.stats()["dropped"], 6)
+        self.assertIsInstance(EntityResolver(SQLiteEntityStore()).event_sink, RingBufferSink)
+
+
+class JsonlFileSinkTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tempdir.name) / "events" / "entities.jsonl"
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def test_batches_are_appended_and_flushed(self) -> None:
+        sink = JsonlFileSink(self.path, batch_size=4, flush_interval=None)
+        sink.publish(_events(3))
+        self.assertEqual(self.path.read_text(encoding="utf-8"), "")
+        sink.publish(_events(2))
+        self.assertEqual(len(list(read_event_log(self.path))), 5)
+        sink.publish(_events(1))
+        sink.close()
+        self.assertEqual([event.payload["n"] for event in read_event_log(self.path)], [0, 1, 2, 0, 1, 0])
+        with self.assertRaises(ValueError):
+            sink.publish(_events(1))
+
+        with JsonlFileSink(self.path, flush_interval=None) as reopened:
+            reopened.publish(_events(1))
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write('{"event_type": "Entity')
+        self.assertEqual(len(list(read_event_log(self.path))), 7)
+
+    def test_pending_events_are_flushed_periodically(self) -> None:
+        sink = JsonlFileSink(self.path, batch_size=1000, flush_interval=0.01)
+        try:
+            sink.publish(_events(2))
+            deadline = time.monotonic() + 5
+            while sink.written < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(len(list(read_event_log(self.path))), 2)
+        finally:
+            sink.close()
+
+    def test_adapter_returns_per_call_events_while_streaming_to_disk(self) -> None:
+        sink = JsonlFileSink(self.path, flush_interval=None)
+        resolver = EntityResolver(SQLiteEntityStore(), event_sink=sink)
+        envelope = {"source": "test", "payload": {"email": "disk@example.com", "handle": "@disk"}}
+        first = resolve_normalized_social_signal(resolver, envelope)
+        second = resolve_normalized_social_signal(resolver, envelope)
+        resolver.close()
+
+        logged = list(read_event_log(self.path))
+        self.assertEqual(logged, first.emitted_events + second.emitted_events)
+        self.assertEqual([event.event_type for event in second.emitted_events], ["EntityResolved"])
+        self.assertEqual(resolver.drain_events(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from metaspn_entities.migrations import migrate_to_integer_keys
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+
+class IntegerKeyStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tempdir.name) / "entities.db")
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _populate(self, store: SQLiteEntityStore) -> dict:
+        resolver = EntityResolver(store)
+        a = resolver.resolve("twitter_handle", "alice").entity_id
+        b = resolver.resolve("email", "alice@example.com").entity_id
+        c = resolver.resolve("wallet_address", "0xalice").entity_id
+        resolver.add_alias(a, "github_handle", "alice-gh")
+        resolver.merge_entities(b, a, reason="same person")
+        resolver.merge_entities(a, c, reason="wallet owner")
+        return {"a": a, "b": b, "c": c}
+
+    def test_entity_references_are_stored_as_integers(self) -> None:
+        store = SQLiteEntityStore(self.db_path, integer_keys=True)
+        try:
+            ids = self._populate(store)
+            key_types = {
+                table: {row["name"]: row["type"] for row in store.conn.execute(f"PRAGMA table_info({table})")}
+                for table in ("alias_keys", "merge_record_keys", "redirect_keys")
+            }
+            self.assertEqual(key_types["alias_keys"]["entity_key"], "INTEGER")
+            self.assertEqual(key_types["redirect_keys"]["to_entity_key"], "INTEGER")
+            self.assertEqual(store.find_alias("email", "alice@example.com")["entity_id"], ids["b"])
+            self.assertEqual(store.canonical_entity_id(ids["b"]), ids["c"])
+        finally:
+            store.close()
+
+        reopened = SQLiteEntityStore(self.db_path)
+        try:
+            self.assertTrue(reopened.integer_keys)
+        finally:
+            reopened.close()
+
+    def test_mode_mismatch_is_rejected(self) -> None:
+        SQLiteEntityStore(self.db_path).close()
+        with self.assertRaises(ValueError):
+            SQLiteEntityStore(self.db_path, integer_keys=True)
+
+    def test_migration_preserves_resolution_lineage_and_snapshot(self) -> None:
+        store = SQLiteEntityStore(self.db_path)
+        ids = self._populate(store)
+        before_rows = sorted(map(repr, store.iter_snapshot_rows()))
+        before_lineage = EntityResolver(store).redirect_chain(ids["b"])
+        store.close()
+
+        counts = migrate_to_integer_keys(self.db_path)
+        self.assertEqual(counts["entities"], 3)
+        self.assertEqual(counts["merge_records"], 2)
+        self.assertEqual(migrate_to_integer_keys(self.db_path), counts)
+
+        store = SQLiteEntityStore(self.db_path)
+        try:
+            self.assertTrue(store.integer_keys)
+            resolver = EntityResolver(store)
+            self.assertEqual(sorted(map(repr, store.iter_snapshot_rows())), before_rows)
+            self.assertEqual(resolver.redirect_chain(ids["b"]), before_lineage)
+            self.assertEqual(resolver.resolve("github_handle", "alice-gh").entity_id, ids["c"])
+            resolver.undo_merge(ids["a"], ids["c"])
+            self.assertEqual(store.canonical_entity_id(ids["b"]), ids["a"])
+        finally:
+            store.close()
+
+    def test_snapshot_moves_between_storage_modes(self) -> None:
+        source = SQLiteEntityStore(self.db_path)
+        ids = self._populate(source)
+        snapshot = str(Path(self.tempdir.name) / "snapshot.ndjson")
+        source.export_snapshot_stream(snapshot, chunk_size=2)
+        source.close()
+
+        restored = SQLiteEntityStore(str(Path(self.tempdir.name) / "restored.db"), integer_keys=True)
+        try:
+            counts = restored.import_snapshot(snapshot, chunk_size=2)
+            self.assertEqual(counts["aliases"], 4)
+            self.assertEqual(restored.canonical_entity_id(ids["b"]), ids["c"])
+            self.assertEqual(len(restored.list_aliases_for_entity(ids["c"])), 4)
+        finally:
+            restored.close()
+
+    def test_migration_rolls_back_on_dangling_references(self) -> None:
+        store = SQLiteEntityStore(self.db_path)
+        self._populate(store)
+        store.conn.execute(
+            "INSERT INTO aliases(identifier_type, normalized_value, entity_id, confidence, created_at, caused_by) "
+            "VALUES ('email', 'ghost@example.com', 'ent_missing', 1.0, '2024-01-01T00:00:00+00:00', 'test')"
+        )
+        store.conn.commit()
+        store.close()
+
+        with self.assertRaises(ValueError):
+            migrate_to_integer_keys(self.db_path)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            self.assertIn("aliases", tables)
+            self.assertNotIn("alias_keys", tables)
+            self.assertEqual(conn.execute("SELECT count(*) FROM aliases").fetchone()[0], 5)
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
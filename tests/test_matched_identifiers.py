@@ -0,0 +1,80 @@
+import copy
+import dataclasses
+import pickle
+import unittest
+from unittest import mock
+
+from metaspn_entities.adapter import resolve_normalized_social_signal
+from metaspn_entities.models import LazyIdentifiers
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+
+class MatchedIdentifierModeTests(unittest.TestCase):
+    def _resolvers(self):
+        return {
+            mode: EntityResolver(SQLiteEntityStore(), matched_identifiers=mode) for mode in ("eager", "lazy", "skip")
+        }
+
+    def _scenario(self, resolver: EntityResolver) -> list:
+        first = resolver.resolve("email", "lazy@example.com")
+        resolver.add_alias(first.entity_id, "twitter_handle", "lazy_handle")
+        again = resolver.resolve("twitter_handle", "lazy_handle")
+        batch = resolver.resolve_many([("email", "lazy@example.com", None), ("email", "other@example.com", None)])
+        return [first, again] + batch
+
+    def test_lazy_mode_matches_eager_results(self) -> None:
+        resolvers = self._resolvers()
+        eager = self._scenario(resolvers["eager"])
+        lazy = self._scenario(resolvers["lazy"])
+        skipped = self._scenario(resolvers["skip"])
+        self.assertIsInstance(lazy[1].matched_identifiers, LazyIdentifiers)
+        # Lazy results read the store when first accessed, after the alias was added.
+        self.assertEqual([len(item.matched_identifiers) for item in lazy], [2, 2, 2, 1])
+        self.assertEqual([len(item.matched_identifiers) for item in eager], [1, 2, 2, 1])
+        self.assertEqual(lazy[1].matched_identifiers, eager[1].matched_identifiers)
+        self.assertEqual(
+            [(item.confidence, item.created_new_entity) for item in lazy],
+            [(item.confidence, item.created_new_entity) for item in eager],
+        )
+        self.assertTrue(all(list(item.matched_identifiers) == [] for item in skipped))
+
+    def test_lazy_identifiers_are_not_read_until_accessed(self) -> None:
+        resolver = EntityResolver(SQLiteEntityStore(), matched_identifiers="lazy")
+        resolver.resolve("email", "count@example.com")
+        with mock.patch.object(
+            resolver.store, "iter_identifiers_for_entity", wraps=resolver.store.iter_identifiers_for_entity
+        ) as loader:
+            resolution = resolver.resolve("email", "count@example.com")
+            self.assertFalse(resolution.matched_identifiers.loaded)
+            loader.assert_not_called()
+            self.assertEqual(resolution.matched_identifiers[0]["normalized_value"], "count@example.com")
+            self.assertEqual(len(resolution.matched_identifiers), 1)
+            loader.assert_called_once()
+
+    def test_lazy_identifiers_copy_as_lists(self) -> None:
+        resolver = EntityResolver(SQLiteEntityStore(), matched_identifiers="lazy")
+        resolver.resolve("email", "copy@example.com")
+        resolution = resolver.resolve("email", "copy@example.com")
+        payload = dataclasses.asdict(resolution)
+        self.assertIsInstance(payload["matched_identifiers"], list)
+        self.assertEqual(payload["matched_identifiers"][0]["value"], "copy@example.com")
+        self.assertEqual(pickle.loads(pickle.dumps(resolution)), resolution)
+        self.assertEqual(copy.copy(resolution.matched_identifiers), list(resolution.matched_identifiers))
+
+    def test_adapter_skips_identifier_reads_in_lazy_mode(self) -> None:
+        resolver = EntityResolver(SQLiteEntityStore(), matched_identifiers="lazy")
+        envelope = {"source": "test", "payload": {"email": "adapter@example.com", "handle": "@adapter"}}
+        resolve_normalized_social_signal(resolver, envelope)
+        with mock.patch.object(resolver.store, "iter_identifiers_for_entity") as loader:
+            result = resolve_normalized_social_signal(resolver, envelope)
+        loader.assert_not_called()
+        self.assertTrue(result.emitted_events)
+
+    def test_unknown_mode_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            EntityResolver(SQLiteEntityStore(), matched_identifiers="sometimes")
+
+
+if __name__ == "__main__":
+    unittest.main()
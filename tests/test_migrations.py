@@ -0,0 +1,128 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from metaspn_entities import sqlite_backend
+from metaspn_entities.migrations import (
+    SCHEMA_VERSION,
+    migrate,
+    migrate_to_integer_keys,
+    pending_migrations,
+)
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.schema import INTEGER_KEY_SECONDARY_INDEXES, SCHEMA_SQL, SECONDARY_INDEXES
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+
+class MigrationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tempdir.name) / "entities.db")
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _legacy_file(self) -> None:
+        # The unversioned 0.1.x layout: tables only, user_version 0.
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(SCHEMA_SQL)
+        conn.execute(
+            "INSERT INTO entities VALUES ('ent_legacy', 'person', '2025-01-01T00:00:00+00:00', 'active')"
+        )
+        conn.execute(
+            "INSERT INTO aliases VALUES ('email', 'legacy@example.com', 'ent_legacy', 0.9, "
+            "'2025-01-01T00:00:00+00:00', 'import', NULL)"
+        )
+        conn.commit()
+        conn.close()
+
+    def _indexes(self) -> set:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        finally:
+            conn.close()
+
+    def test_new_files_start_at_current_version(self) -> None:
+        store = SQLiteEntityStore(self.db_path)
+        try:
+            self.assertEqual(store.schema_version, SCHEMA_VERSION)
+            self.assertEqual(store.conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+        finally:
+            store.close()
+        self.assertLessEqual(set(SECONDARY_INDEXES), self._indexes())
+
+    def test_opening_a_current_file_only_checks_the_version(self) -> None:
+        SQLiteEntityStore(self.db_path).close()
+        with mock.patch.object(sqlite_backend, "apply_migrations") as apply, mock.patch.object(
+            sqlite_backend, "initialize_schema"
+        ) as initialize:
+            SQLiteEntityStore(self.db_path).close()
+        apply.assert_not_called()
+        initialize.assert_not_called()
+
+    def test_open_upgrades_legacy_files(self) -> None:
+        self._legacy_file()
+        store = SQLiteEntityStore(self.db_path)
+        try:
+            self.assertEqual(store.schema_version, SCHEMA_VERSION)
+            self.assertEqual(store.find_alias("email", "legacy@example.com")["entity_id"], "ent_legacy")
+        finally:
+            store.close()
+        self.assertLessEqual(set(SECONDARY_INDEXES), self._indexes())
+
+    def test_online_migration_reports_progress(self) -> None:
+        self._legacy_file()
+        store = SQLiteEntityStore(self.db_path, wal=True, auto_migrate=False)
+        try:
+            self.assertEqual(store.schema_version, 1)
+            self.assertEqual([m.version for m in pending_migrations(store.conn)], [2, 3])
+            resolver = EntityResolver(store)
+            resolver.resolve("email", "before@example.com")
+
+            events = []
+            self.assertEqual(migrate(self.db_path, progress=events.append, pause_seconds=0), SCHEMA_VERSION)
+            self.assertEqual(
+                [(event.version, event.step, event.steps) for event in events],
+                [(2, 1, 4), (2, 2, 4), (2, 3, 4), (2, 4, 4), (3, 1, 1)],
+            )
+
+            # The open store keeps writing and sees the new indexes.
+            resolver.resolve("email", "after@example.com")
+            plan = " ".join(
+                row[3]
+                for row in store.conn.execute(
+                    "EXPLAIN QUERY PLAN SELECT * FROM aliases WHERE entity_id = ?", ("ent_legacy",)
+                )
+            )
+            self.assertIn("idx_aliases_entity_id", plan)
+            self.assertEqual(migrate(self.db_path), SCHEMA_VERSION)
+        finally:
+            store.close()
+
+    def test_newer_files_are_rejected(self) -> None:
+        SQLiteEntityStore(self.db_path).close()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+        conn.close()
+        with self.assertRaises(ValueError):
+            SQLiteEntityStore(self.db_path)
+        with self.assertRaises(ValueError):
+            migrate(self.db_path)
+
+    def test_integer_key_conversion_upgrades_legacy_files(self) -> None:
+        self._legacy_file()
+        migrate_to_integer_keys(self.db_path)
+        self.assertLessEqual(set(INTEGER_KEY_SECONDARY_INDEXES), self._indexes())
+        store = SQLiteEntityStore(self.db_path)
+        try:
+            self.assertEqual((store.integer_keys, store.schema_version), (True, SCHEMA_VERSION))
+            self.assertEqual(store.find_alias("email", "legacy@example.com")["entity_id"], "ent_legacy")
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
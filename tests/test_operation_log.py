@@ -0,0 +1,156 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from metaspn_entities.adapter import resolve_normalized_social_signal
+from metaspn_entities.memory_backend import InMemoryEntityStore
+from metaspn_entities.models import frozen_clock
+from metaspn_entities.oplog import OperationLog, read_operation_log, read_operation_log_header
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+
+def _rows(store) -> list:
+    return sorted(repr(item) for item in store.iter_snapshot_rows())
+
+
+class OperationLogTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        self.path = self.root / "ops.jsonl"
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _record(self, store) -> EntityResolver:
+        resolver = EntityResolver(store, operation_log=OperationLog(self.path))
+        with frozen_clock(1_700_000_000):
+            first = resolver.resolve("email", "a@example.com", {"confidence": 0.7, "request": object()}).entity_id
+            second = resolver.resolve("twitter_handle", "@bee").entity_id
+            resolver.resolve("email", "a@example.com")
+        with frozen_clock(1_700_000_005):
+            resolver.resolve_many(
+                [("email", f"m{i}@example.com", None) for i in range(3)] + [("email", "a@example.com", None)]
+            )
+            resolver.add_alias(first, "twitter_handle", "a_handle")
+            resolver.merge_entities(first, second, reason="dup")
+        with frozen_clock(1_700_000_009):
+            resolver.undo_merge(first, second)
+            envelope = {"source": "t", "payload": {"email": "x@example.com", "handle": "@x"}}
+            resolve_normalized_social_signal(resolver, envelope)
+        return resolver
+
+    def test_replay_rebuilds_identical_store(self) -> None:
+        live = self._record(SQLiteEntityStore())
+        live.close()
+        self.assertEqual(
+            [record["op"] for record in read_operation_log(self.path)],
+            ["resolve"] * 3 + ["resolve_many", "add_alias", "merge_entities", "undo_merge", "resolve", "add_alias"],
+        )
+        targets = {
+            "sqlite": SQLiteEntityStore(),
+            "integer_keys": SQLiteEntityStore(str(self.root / "keyed.db"), integer_keys=True, epoch_timestamps=True),
+            "memory": InMemoryEntityStore(),
+        }
+        for label, store in targets.items():
+            with self.subTest(store=label):
+                report = EntityResolver(store).replay_operation_log(str(self.path), batch_size=4)
+                self.assertEqual((report.operations, report.transactions, report.last_seq), (9, 3, 9))
+                self.assertEqual(_rows(store), _rows(live.store))
+                store.close()
+
+    def test_interrupted_replay_resumes_from_checkpoint(self) -> None:
+        live = self._record(SQLiteEntityStore())
+        store = SQLiteEntityStore(str(self.root / "replica.db"))
+        replica = EntityResolver(store)
+        real_set_checkpoint = store.set_checkpoint
+        calls = []
+
+        def crash_on_second_batch(name: str, seq: int) -> None:
+            calls.append(seq)
+            if len(calls) == 2:
+                raise RuntimeError("crash")
+            real_set_checkpoint(name, seq)
+
+        with mock.patch.object(store, "set_checkpoint", side_effect=crash_on_second_batch):
+            with self.assertRaises(RuntimeError):
+                replica.replay_operation_log(str(self.path), batch_size=4)
+        # The failed batch rolled back together with its checkpoint.
+        checkpoint = f"oplog:{read_operation_log_header(self.path)['log_id']}"
+        self.assertEqual(store.get_checkpoint(checkpoint), 4)
+
+        report = replica.replay_operation_log(str(self.path), batch_size=4)
+        self.assertEqual((report.since_seq, report.operations, report.last_seq), (4, 5, 9))
+        live.resolve("email", "later@example.com")
+        live.close()
+        report = replica.replay_operation_log(str(self.path))
+        self.assertEqual((report.since_seq, report.operations), (9, 1))
+        self.assertEqual(_rows(store), _rows(live.store))
+        store.close()
+
+    def test_only_committed_work_is_logged_and_log_failures_are_raised(self) -> None:
+        resolver = EntityResolver(SQLiteEntityStore(), operation_log=OperationLog(self.path))
+        with resolver.transaction():
+            resolver.resolve("email", "kept@example.com")
+            with self.assertRaises(RuntimeError):
+                with resolver.transaction():
+                    resolver.resolve("email", "inner@example.com")
+                    raise RuntimeError("abort inner")
+        with mock.patch.object(resolver.operation_log, "append", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                resolver.resolve("email", "unlogged@example.com")
+        # The log is written after the commit: the write stays, its events still publish, the next unit logs.
+        self.assertIsNotNone(resolver.store.find_alias("email", "unlogged@example.com"))
+        self.assertEqual(len(resolver.drain_events()), 4)
+        resolver.resolve("email", "next@example.com")
+        resolver.close()
+
+        values = [record["args"]["value"] for record in read_operation_log(self.path)]
+        self.assertEqual(values, ["kept@example.com", "next@example.com"])
+
+    def test_failed_commits_are_not_logged_or_replayed(self) -> None:
+        db_path = str(self.root / "busy.db")
+        store = SQLiteEntityStore(db_path)
+        store.conn.execute("PRAGMA busy_timeout = 0")
+        resolver = EntityResolver(store, operation_log=OperationLog(self.path))
+        resolver.resolve("email", "kept@example.com")
+        # A reader's shared lock makes the rollback-journal COMMIT fail with "database is locked".
+        reader = sqlite3.connect(db_path)
+        reader.execute("BEGIN")
+        reader.execute("SELECT COUNT(*) FROM entities").fetchone()
+        with self.assertRaises(sqlite3.OperationalError):
+            resolver.resolve("email", "lost@example.com")
+        reader.rollback()
+        reader.close()
+        resolver.resolve("email", "after@example.com")
+        self.assertIsNone(store.find_alias("email", "lost@example.com"))
+        resolver.close()
+        store.close()
+
+        rebuilt = EntityResolver(SQLiteEntityStore())
+        report = rebuilt.replay_operation_log(str(self.path))
+        self.assertEqual(report.operations, 2)
+        self.assertIsNone(rebuilt.store.find_alias("email", "lost@example.com"))
+        self.assertIsNotNone(rebuilt.store.find_alias("email", "after@example.com"))
+
+    def test_reopened_log_drops_torn_tail_and_continues_numbering(self) -> None:
+        with OperationLog(self.path) as log:
+            log.append([{"at": 1, "op": "merge_entities", "args": {}, "created": []}] * 2)
+            log_id = log.log_id
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write('{"seq": 3, "op": "res')
+        with OperationLog(self.path) as log:
+            self.assertEqual((log.log_id, log.last_seq), (log_id, 2))
+            self.assertEqual(log.append([{"at": 2, "op": "undo_merge", "args": {}, "created": []}]), 3)
+        self.assertEqual([record["seq"] for record in read_operation_log(self.path, since_seq=1)], [2, 3])
+        other = self.root / "events.jsonl"
+        other.write_text('{"event_type": "EntityResolved"}\n', encoding="utf-8")
+        with self.assertRaises(ValueError):
+            OperationLog(other)
+
+
+if __name__ == "__main__":
+    unittest.main()
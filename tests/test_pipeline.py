@@ -0,0 +1,102 @@
+import tempfile
+import unittest
+from collections import defaultdict
+from pathlib import Path
+
+from metaspn_entities.adapter import resolve_normalized_social_signal, signal_identifier_keys
+from metaspn_entities.pipeline import SignalIngestPipeline
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+PROCESSES = 3
+
+
+def _envelopes() -> list:
+    envelopes = []
+    for i in range(60):
+        person = i % 20
+        payload = {"email": f"User{person}@Example.com", "handle": f"@user{person}", "platform": "twitter"}
+        if person % 5 == 0:
+            # Keyed on the profile URL, which the email's envelopes also carry: an auto-merge across partitions.
+            payload = {"profile_url": f"https://example.com/u/{person}", "name": f"User {person}"}
+        elif person % 5 == 1:
+            payload["profile_url"] = f"https://example.com/u/{person - 1}"
+        envelopes.append({"source": "test", "payload": payload})
+    envelopes.insert(17, {"source": "test", "payload": {"title": "no identifiers"}})
+    return envelopes
+
+
+def _clusters(entity_ids: list) -> set:
+    members = defaultdict(set)
+    for position, entity_id in enumerate(entity_ids):
+        members[entity_id].add(position)
+    return {frozenset(positions) for positions in members.values()}
+
+
+class SignalIngestPipelineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def test_parallel_ingest_matches_sequential_clusters(self) -> None:
+        envelopes = _envelopes()
+        sequential = EntityResolver(SQLiteEntityStore())
+        expected = []
+        for envelope in envelopes:
+            try:
+                entity_id = resolve_normalized_social_signal(sequential, envelope).entity_id
+            except ValueError:
+                continue
+            expected.append(entity_id)
+        expected = [sequential.store.canonical_entity_id(entity_id) for entity_id in expected]
+
+        targets = {"wal": (str(self.root / "entities.db"), None), "sharded": (str(self.root / "shards"), PROCESSES)}
+        for label, (path, shard_count) in targets.items():
+            with self.subTest(store=label):
+                batches = []
+                pipeline = SignalIngestPipeline(path, processes=PROCESSES, shard_count=shard_count, batch_size=16)
+                with pipeline:
+                    report = pipeline.run(iter(envelopes), on_batch=batches.append)
+                    results = [result for batch in batches for result in batch]
+                    self.assertEqual([len(batch) for batch in batches], [16, 16, 16, 13])
+                    self.assertIsNone(results[17])
+                    entity_ids = [result.entity_id for result in results if result is not None]
+                    # Reconciled ids are canonical, and the clusters match a sequential run.
+                    self.assertTrue(all(pipeline.store.canonical_entity_id(e) == e for e in entity_ids))
+                    self.assertEqual(_clusters(entity_ids), _clusters(expected))
+                    if shard_count:
+                        keys = signal_identifier_keys(envelopes[0])
+                        self.assertEqual(pipeline.partition(envelopes[0]), pipeline.store.shard_index(*keys[0]))
+
+                self.assertEqual((report.signals, report.resolved, report.batches), (61, 60, 4))
+                self.assertEqual([position for position, _ in report.failed], [17])
+                # Whether an email envelope merges depends on its URL envelope committing first.
+                self.assertLessEqual(report.merges, 4)
+                self.assertGreater(report.signals_per_second, 0)
+
+    def test_envelopes_sharing_a_primary_identifier_resolve_in_stream_order(self) -> None:
+        envelopes = [
+            {"source": "test", "payload": {"email": f"{'ORDER' if i % 2 else 'order'}{i % 7}@example.com"}}
+            for i in range(70)
+        ]
+        with SignalIngestPipeline(str(self.root / "order.db"), processes=PROCESSES, batch_size=35) as pipeline:
+            self.assertEqual(pipeline.partition(envelopes[0]), pipeline.partition(envelopes[7]))
+            results = []
+            report = pipeline.run(envelopes, on_batch=results.extend)
+
+        self.assertEqual(report.failed, ())
+        # Only the first envelope of each email, in stream order, created its entity and alias.
+        creators = [
+            position
+            for position, result in enumerate(results)
+            if any(event.event_type == "EntityAliasAdded" for event in result.emitted_events)
+        ]
+        self.assertEqual(creators, list(range(7)))
+        self.assertEqual(len({result.entity_id for result in results}), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+
+class ReaderPoolTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tempdir.name) / "entities.db")
+        self.store = SQLiteEntityStore(self.db_path, wal=True, reader_pool_size=4)
+        self.resolver = EntityResolver(self.store)
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.tempdir.cleanup()
+
+    def test_pool_requires_wal_file_database(self) -> None:
+        with self.assertRaises(ValueError):
+            SQLiteEntityStore(reader_pool_size=2, wal=True)
+        with self.assertRaises(ValueError):
+            SQLiteEntityStore(str(Path(self.tempdir.name) / "other.db"), reader_pool_size=2)
+
+    def test_reads_do_not_wait_for_open_write_transaction(self) -> None:
+        seed = self.resolver.resolve("twitter_handle", "pool_seed")
+        seen = {}
+
+        with self.resolver.transaction():
+            self.resolver.resolve("twitter_handle", "pool_pending")
+
+            def read() -> None:
+                seen["seed"] = self.store.find_alias("twitter_handle", "pool_seed")
+                seen["pending"] = self.store.find_alias("twitter_handle", "pool_pending")
+                seen["context"] = self.resolver.entity_context(seed.entity_id)
+
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join(timeout=5)
+            self.assertFalse(reader.is_alive())
+            # The writer sees its own uncommitted alias.
+            self.assertIsNotNone(self.store.find_alias("twitter_handle", "pool_pending"))
+
+        self.assertEqual(seen["seed"]["entity_id"], seed.entity_id)
+        self.assertIsNone(seen["pending"])
+        self.assertEqual(len(seen["context"].identifiers), 1)
+        self.assertIsNotNone(self.store.find_alias("twitter_handle", "pool_pending"))
+
+    def test_concurrent_readers_during_ingest(self) -> None:
+        known = [self.resolver.resolve("twitter_handle", f"known_{i}").entity_id for i in range(20)]
+        errors = []
+
+        def ingest() -> None:
+            try:
+                for i in range(200):
+                    self.resolver.resolve("twitter_handle", f"ingest_{i}")
+            except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+                errors.append(exc)
+
+        def attribute() -> None:
+            try:
+                for i in range(200):
+                    result = self.resolver.attribute_outcome({"twitter_handle": f"known_{i % 20}"})
+                    if result.entity_id != known[i % 20]:
+                        errors.append(AssertionError(result))
+            except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+                errors.append(exc)
+
+        threads = [threading.Thread(target=ingest)] + [threading.Thread(target=attribute) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self.store.conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0], 220)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+
+ITEMS = [
+    ("twitter_handle", "@Alpha", {"confidence": 0.7, "provenance": "feed-a"}),
+    ("email", "alpha@example.com", None),
+    ("twitter_handle", "alpha", {"confidence": 0.9}),
+    ("twitter_handle", "existing_user", {"provenance": "feed-b"}),
+    ("name", "Project  Beta", {"entity_type": "project", "caused_by": "batch"}),
+    ("email", "ALPHA@example.com", {"confidence": 0.5, "provenance": "feed-c"}),
+    ("twitter_handle", "merged_source", None),
+]
+
+
+class ResolveManyTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.sequential = EntityResolver(SQLiteEntityStore(str(Path(self.tempdir.name) / "sequential.db")))
+        self.batched = EntityResolver(SQLiteEntityStore(str(Path(self.tempdir.name) / "batched.db")))
+
+    def tearDown(self) -> None:
+        self.sequential.store.close()
+        self.batched.store.close()
+        self.tempdir.cleanup()
+
+    def _seed(self, resolver: EntityResolver) -> None:
+        resolver.resolve("twitter_handle", "existing_user", context={"confidence": 0.8})
+        source = resolver.resolve("twitter_handle", "merged_source")
+        target = resolver.resolve("twitter_handle", "merged_target")
+        resolver.merge_entities(source.entity_id, target.entity_id, reason="seed")
+        resolver.drain_events()
+
+    def _state(self, resolver: EntityResolver):
+        conn = resolver.store.conn
+        identifiers = [
+            tuple(row)
+            for row in conn.execute(
+                "SELECT identifier_type, value, normalized_value, confidence, provenance FROM identifiers ORDER BY identifier_type, normalized_value"
+            )
+        ]
+        labels = {}
+        aliases = []
+        for row in conn.execute(
+            "SELECT identifier_type, normalized_value, entity_id, confidence, caused_by, provenance FROM aliases ORDER BY identifier_type, normalized_value"
+        ):
+            canonical = resolver.store.canonical_entity_id(row["entity_id"])
+            label = labels.setdefault(canonical, len(labels))
+            aliases.append((row[0], row[1], label, row[3], row[4], row[5]))
+        entity_types = sorted(row[0] for row in conn.execute("SELECT entity_type || ':' || status FROM entities"))
+        return identifiers, aliases, entity_types
+
+    def test_matches_sequential_resolution(self) -> None:
+        self._seed(self.sequential)
+        self._seed(self.batched)
+
+        expected = [self.sequential.resolve(*item) for item in ITEMS]
+        expected_events = [event.event_type for event in self.sequential.drain_events()]
+        actual = self.batched.resolve_many(ITEMS)
+        actual_events = [event.event_type for event in self.batched.drain_events()]
+
+        self.assertEqual(self._state(self.sequential), self._state(self.batched))
+        self.assertEqual(actual_events, expected_events)
+        self.assertEqual(
+            [(item.confidence, item.created_new_entity) for item in actual],
+            [(item.confidence, item.created_new_entity) for item in expected],
+        )
+        self.assertEqual(actual[0].entity_id, actual[2].entity_id)
+        self.assertEqual(actual[1].entity_id, actual[5].entity_id)
+        self.assertNotEqual(actual[0].entity_id, actual[1].entity_id)
+        merged_target = self.batched.resolve("twitter_handle", "merged_target")
+        self.assertEqual(actual[6].entity_id, merged_target.entity_id)
+
+    def test_empty_batch(self) -> None:
+        self.assertEqual(self.batched.resolve_many([]), [])
+        self.assertEqual(self.batched.drain_events(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from metaspn_entities.cache import MISSING, LRUCache
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+
+class LRUCacheTests(unittest.TestCase):
+    def test_evicts_least_recently_used(self) -> None:
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", None)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIs(cache.get("b"), MISSING)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["size"], 2)
+        cache.discard("a")
+        self.assertEqual(cache.stats()["invalidations"], 1)
+
+    def test_caches_negative_results(self) -> None:
+        cache = LRUCache(4)
+        cache.put("absent", None)
+        self.assertIsNone(cache.get("absent"))
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+
+class RowCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tempdir.name) / "entities.db")
+        self.store = SQLiteEntityStore(self.db_path, row_cache_size=64)
+        self.resolver = EntityResolver(self.store)
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.tempdir.cleanup()
+
+    def _statements(self, fn) -> list:
+        statements = []
+        self.store.conn.set_trace_callback(statements.append)
+        try:
+            fn()
+        finally:
+            self.store.conn.set_trace_callback(None)
+        return statements
+
+    def test_repeated_lookups_skip_sqlite(self) -> None:
+        entity_id = self.resolver.resolve("twitter_handle", "hot").entity_id
+        self.store.find_alias("twitter_handle", "hot")
+        self.store.get_identifier("twitter_handle", "hot")
+        self.store.get_entity(entity_id)
+        self.store.find_alias("twitter_handle", "cold")
+
+        def lookups() -> None:
+            for _ in range(10):
+                self.assertEqual(self.store.find_alias("twitter_handle", "hot")["entity_id"], entity_id)
+                self.assertEqual(self.store.get_identifier("twitter_handle", "hot")["value"], "hot")
+                self.assertEqual(self.store.get_entity(entity_id)["status"], "active")
+                self.assertIsNone(self.store.find_alias("twitter_handle", "cold"))
+
+        self.assertEqual(self._statements(lookups), [])
+        self.assertGreaterEqual(self.store.row_cache_stats()["aliases"]["hits"], 20)
+
+    def test_writes_invalidate_exactly_their_rows(self) -> None:
+        a = self.resolver.resolve("twitter_handle", "inv_a").entity_id
+        b = self.resolver.resolve("twitter_handle", "inv_b").entity_id
+        self.assertIsNone(self.store.find_alias("email", "inv@example.com"))
+        self.store.get_identifier("twitter_handle", "inv_a")
+        self.store.get_entity(a)
+        self.store.find_alias("twitter_handle", "inv_b")
+
+        self.resolver.add_alias(a, "email", "inv@example.com")
+        self.assertEqual(self.store.find_alias("email", "inv@example.com")["entity_id"], a)
+
+        self.store.upsert_identifier("twitter_handle", "INV_A", "inv_a", 0.99, "crm")
+        self.assertEqual(self.store.get_identifier("twitter_handle", "inv_a")["provenance"], "crm")
+
+        self.resolver.merge_entities(a, b, reason="dedupe")
+        self.assertEqual(self.store.get_entity(a)["status"], "merged")
+        self.resolver.undo_merge(a, b)
+        self.assertEqual(self.store.get_entity(a)["status"], "active")
+
+        c = self.store.create_entity("person")
+        self.store.reassign_aliases(b, c)
+        self.assertEqual(self.store.find_alias("twitter_handle", "inv_b")["entity_id"], c)
+
+    def test_rollback_clears_cached_uncommitted_rows(self) -> None:
+        with self.assertRaises(RuntimeError):
+            with self.resolver.transaction():
+                self.resolver.resolve("twitter_handle", "ghost")
+                self.assertIsNotNone(self.store.find_alias("twitter_handle", "ghost"))
+                raise RuntimeError("boom")
+        self.assertIsNone(self.store.find_alias("twitter_handle", "ghost"))
+        self.assertIsNone(self.store.get_identifier("twitter_handle", "ghost"))
+
+    def test_bounded_size_counts_evictions(self) -> None:
+        store = SQLiteEntityStore(str(Path(self.tempdir.name) / "small.db"), row_cache_size=4)
+        try:
+            for i in range(10):
+                store.find_alias("twitter_handle", f"user_{i}")
+            stats = store.row_cache_stats()["aliases"]
+            self.assertEqual((stats["size"], stats["evictions"], stats["misses"]), (4, 6, 10))
+        finally:
+            store.close()
+
+    def test_cache_is_off_by_default(self) -> None:
+        store = SQLiteEntityStore(str(Path(self.tempdir.name) / "plain.db"))
+        try:
+            self.assertEqual(store.row_cache_stats(), {})
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
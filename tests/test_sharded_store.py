@@ -0,0 +1,182 @@
+import sqlite3
+import tempfile
+import threading
+import unittest
+from collections import Counter
+from pathlib import Path
+
+from metaspn_entities import EntityResolver, ShardedEntityStore, SQLiteEntityStore
+from metaspn_entities.normalize import normalize_identifier
+from metaspn_entities.sharded_backend import shard_for_key
+
+
+class ShardedStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.directory = str(Path(self.tempdir.name) / "sharded")
+        self.store = ShardedEntityStore(self.directory, shard_count=4)
+        self.resolver = EntityResolver(self.store)
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.tempdir.cleanup()
+
+    def _handle_in_shard(self, shard: int, prefix: str) -> str:
+        for i in range(1000):
+            handle = f"{prefix}_{i}"
+            if self.store.shard_index("twitter_handle", handle) == shard:
+                return handle
+        raise AssertionError("no handle found for shard")
+
+    def test_identifiers_are_partitioned_by_key_hash(self) -> None:
+        for i in range(40):
+            self.resolver.resolve("twitter_handle", f"spread_{i}")
+        counts = [
+            len(list(shard.iter_snapshot_rows(tables=("aliases",)))) for shard in self.store.shards
+        ]
+        self.assertEqual(sum(counts), 40)
+        self.assertTrue(all(count > 0 for count in counts))
+        self.assertEqual(list(self.store.coordinator.iter_snapshot_rows(tables=("aliases", "identifiers"))), [])
+        self.assertEqual(shard_for_key("email", "a@example.com", 4), shard_for_key("email", "a@example.com", 4))
+        for i in range(40):
+            index = self.store.shard_index("twitter_handle", f"spread_{i}")
+            self.assertIsNotNone(self.store.shards[index].find_alias("twitter_handle", f"spread_{i}"))
+
+    def test_cross_shard_auto_merge(self) -> None:
+        left = self.resolver.resolve("twitter_handle", self._handle_in_shard(0, "left")).entity_id
+        right = self.resolver.resolve("twitter_handle", self._handle_in_shard(1, "right")).entity_id
+        email = next(
+            f"shared{i}@example.com"
+            for i in range(1000)
+            if self.store.shard_index("email", f"shared{i}@example.com") == 2
+        )
+        self.resolver.add_alias(left, "email", email)
+        events = self.resolver.add_alias(right, "email", email)
+        self.assertEqual([event.event_type for event in events], ["EntityMerged"])
+
+        canonical = self.store.canonical_entity_id(right)
+        self.assertEqual(canonical, self.store.canonical_entity_id(left))
+        self.assertEqual(self.resolver.resolve("email", email).entity_id, canonical)
+        self.assertEqual(len(self.store.list_aliases_for_entity(left)), 3)
+        # Re-adding the alias through a merged member refreshes it instead of conflicting.
+        self.assertEqual(self.resolver.add_alias(right, "email", email, confidence=0.99), [])
+        self.assertEqual(self.store.find_alias("email", email)["confidence"], 0.99)
+
+    def test_reopen_requires_the_same_shard_count(self) -> None:
+        entity_id = self.resolver.resolve("twitter_handle", "persisted").entity_id
+        self.store.close()
+        with self.assertRaises(ValueError):
+            ShardedEntityStore(self.directory, shard_count=2)
+        with self.assertRaises(ValueError):
+            ShardedEntityStore(self.directory, shard_count=4, reader_pool_size=0)
+        self.store = ShardedEntityStore(self.directory, shard_count=4)
+        self.assertEqual(EntityResolver(self.store).resolve("twitter_handle", "persisted").entity_id, entity_id)
+
+    def test_reserved_shards_are_write_locked_until_commit(self) -> None:
+        keys = [("twitter_handle", self._handle_in_shard(shard, "reserved")) for shard in (3, 1)]
+        with self.assertRaises(RuntimeError):
+            self.store.reserve_shards(keys)
+        other = sqlite3.connect(str(Path(self.directory) / "shard_1.db"), timeout=0)
+        with self.store.transaction():
+            self.store.reserve_shards(keys)
+            with self.assertRaises(sqlite3.OperationalError):
+                other.execute("DELETE FROM aliases")
+        other.execute("DELETE FROM aliases")
+        other.commit()
+        other.close()
+
+    def test_per_shard_writer_threads_create_no_duplicates(self) -> None:
+        handles = [f"user_{i}" for i in range(400)]
+        partitions = {index: [] for index in range(self.store.shard_count)}
+        for handle in handles + handles[::3]:
+            normalized = normalize_identifier("twitter_handle", handle)
+            partitions[self.store.shard_index("twitter_handle", normalized)].append(handle)
+        errors = []
+
+        def writer(items) -> None:
+            try:
+                resolver = EntityResolver(self.store)
+                for start in range(0, len(items), 25):
+                    resolver.resolve_many([("twitter_handle", handle, None) for handle in items[start : start + 25]])
+            except Exception as exc:  # pragma: no cover - surfaced below
+                errors.append(exc)
+
+        threads = [threading.Thread(target=writer, args=(items,)) for items in partitions.values()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+        owners = {self.store.find_alias("twitter_handle", handle)["entity_id"] for handle in handles}
+        self.assertEqual(len(owners), len(handles))
+        entity_rows = list(self.store.coordinator.iter_snapshot_rows(tables=("entities",)))
+        self.assertEqual(len(entity_rows), len(handles))
+
+    def test_snapshot_moves_between_sharded_and_single_file_stores(self) -> None:
+        a = self.resolver.resolve("twitter_handle", "snap_a").entity_id
+        b = self.resolver.resolve("twitter_handle", "snap_b").entity_id
+        self.resolver.add_alias(a, "email", "snap@example.com")
+        self.resolver.merge_entities(a, b, reason="dedupe")
+        path = str(Path(self.tempdir.name) / "snapshot.ndjson")
+        self.store.export_snapshot_stream(path)
+
+        single = SQLiteEntityStore(str(Path(self.tempdir.name) / "single.db"))
+        try:
+            counts = single.import_snapshot(path)
+            self.assertEqual((counts["aliases"], counts["merge_records"]), (3, 1))
+            self.assertEqual(EntityResolver(single).resolve("email", "snap@example.com").entity_id, b)
+        finally:
+            single.close()
+
+    def test_snapshot_load_streams_rows_with_shards_locked_first(self) -> None:
+        self.resolver.resolve_many([("twitter_handle", f"stream_{i}", None) for i in range(200)])
+        rows = list(self.store.iter_snapshot_rows())
+        target = ShardedEntityStore(str(Path(self.tempdir.name) / "target"), shard_count=4)
+        loaded_before_end = []
+
+        def stream():
+            for position, row in enumerate(rows):
+                if position == 0:
+                    # Every shard and the coordinator are write-locked before the first row is read.
+                    for name in ("shard_0.db", "shard_3.db", "coordinator.db"):
+                        other = sqlite3.connect(str(Path(target.directory) / name), timeout=0)
+                        with self.assertRaises(sqlite3.OperationalError):
+                            other.execute("DELETE FROM entities")
+                        other.close()
+                yield row
+            # Earlier chunks were already written to the shards, not buffered until the end.
+            loaded_before_end.extend(
+                shard.conn.execute("SELECT COUNT(*) FROM aliases").fetchone()[0] for shard in target.shards
+            )
+
+        try:
+            counts = target.load_snapshot_rows(stream(), chunk_size=10)
+            self.assertEqual((counts["entities"], counts["aliases"]), (200, 200))
+            self.assertGreater(sum(loaded_before_end), 150)
+            owner = self.store.find_alias("twitter_handle", "stream_7")["entity_id"]
+            self.assertEqual(target.find_alias("twitter_handle", "stream_7")["entity_id"], owner)
+        finally:
+            target.close()
+
+    def test_snapshot_export_is_one_point_in_time_across_databases(self) -> None:
+        store = ShardedEntityStore(str(Path(self.tempdir.name) / "export"), shard_count=4, reader_pool_size=2)
+        try:
+            resolver = EntityResolver(store)
+            a = resolver.resolve("twitter_handle", "point_a").entity_id
+            b = resolver.resolve("twitter_handle", "point_b").entity_id
+            rows = store.iter_snapshot_rows()
+            exported = [next(rows)]
+            # Committed after the export started: neither the merge nor the alias belongs in it.
+            resolver.merge_entities(a, b, reason="dedupe")
+            resolver.add_alias(b, "email", "late@example.com")
+            exported.extend(rows)
+            tables = Counter(table for table, _ in exported)
+            self.assertEqual((tables["entities"], tables["aliases"], tables["identifiers"]), (2, 2, 2))
+            self.assertEqual((tables["merge_records"], tables["entity_redirects"]), (0, 0))
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.snapshot import SNAPSHOT_TABLES
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+
+class SnapshotTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        self.store = SQLiteEntityStore(str(self.root / "source.db"))
+        self.resolver = EntityResolver(self.store)
+
+        a = self.resolver.resolve("twitter_handle", "snap_a", context={"provenance": "feed"})
+        b = self.resolver.resolve("twitter_handle", "snap_b")
+        self.resolver.add_alias(a.entity_id, "email", "snap@example.com")
+        self.resolver.merge_entities(a.entity_id, b.entity_id, reason="dedupe")
+        self.a, self.b = a.entity_id, b.entity_id
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.tempdir.cleanup()
+
+    def _rows(self, store: SQLiteEntityStore):
+        return {table: sorted(map(tuple, store.conn.execute(f"SELECT * FROM {table}"))) for table in SNAPSHOT_TABLES}
+
+    def test_stream_round_trip_with_each_compression(self) -> None:
+        for name in ("snapshot.ndjson", "snapshot.ndjson.gz", "snapshot.ndjson.xz"):
+            with self.subTest(name=name):
+                path = self.root / name
+                counts = self.resolver.export_snapshot_stream(str(path), chunk_size=2)
+                self.assertEqual(counts["entities"], 2)
+
+                target = SQLiteEntityStore(str(self.root / f"{name}.db"))
+                try:
+                    loaded = target.import_snapshot_stream(str(path), chunk_size=2)
+                    self.assertEqual(loaded, counts)
+                    self.assertEqual(self._rows(target), self._rows(self.store))
+                    restored = EntityResolver(target).resolve("email", "snap@example.com")
+                    self.assertEqual(restored.entity_id, self.b)
+                finally:
+                    target.close()
+
+    def test_truncated_stream_is_rejected(self) -> None:
+        path = self.root / "snapshot.ndjson"
+        self.store.export_snapshot_stream(str(path))
+        lines = path.read_text(encoding="utf-8").splitlines()
+        path.write_text("\n".join(lines[:-2]) + "\n", encoding="utf-8")
+
+        target = SQLiteEntityStore()
+        try:
+            with self.assertRaises(ValueError):
+                target.import_snapshot_stream(str(path))
+            self.assertEqual(target.conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0], 0)
+        finally:
+            target.close()
+
+    def test_json_snapshot_restores_store_with_indexes(self) -> None:
+        path = self.root / "snapshot.json"
+        self.resolver.export_snapshot(str(path))
+
+        target = SQLiteEntityStore(str(self.root / "restored.db"))
+        try:
+            restored = EntityResolver(target)
+            counts = restored.import_snapshot(str(path))
+            self.assertEqual(counts["aliases"], 3)
+            self.assertEqual(self._rows(target), self._rows(self.store))
+            indexes = {row[0] for row in target.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            self.assertIn("idx_aliases_entity_id", indexes)
+            self.assertEqual(restored.resolve("twitter_handle", "snap_a").entity_id, self.b)
+        finally:
+            target.close()
+
+    def test_import_detects_stream_format_and_requires_empty_store(self) -> None:
+        path = self.root / "snapshot.ndjson.gz"
+        self.store.export_snapshot_stream(str(path))
+
+        target = SQLiteEntityStore()
+        try:
+            target.import_snapshot(str(path))
+            self.assertEqual(self._rows(target), self._rows(self.store))
+            with self.assertRaises(ValueError):
+                target.import_snapshot(str(path))
+        finally:
+            target.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
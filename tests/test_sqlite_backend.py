@@ -0,0 +1,181 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+
+class SQLiteBackendTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tempdir.name) / "entities.db")
+        self.store = SQLiteEntityStore(self.db_path)
+        self.resolver = EntityResolver(self.store)
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.tempdir.cleanup()
+
+    def _reopen_with_canonical_cache(self) -> None:
+        self.store.close()
+        self.store = SQLiteEntityStore(self.db_path, canonical_cache=True)
+        self.resolver = EntityResolver(self.store)
+
+    def _count_statements(self, fn) -> int:
+        statements = []
+        self.store.conn.set_trace_callback(statements.append)
+        try:
+            fn()
+        finally:
+            self.store.conn.set_trace_callback(None)
+        return len(statements)
+
+    def test_cluster_lookup_follows_multi_hop_redirects(self) -> None:
+        a = self.resolver.resolve("twitter_handle", "cluster_a")
+        b = self.resolver.resolve("twitter_handle", "cluster_b")
+        c = self.resolver.resolve("twitter_handle", "cluster_c")
+        other = self.resolver.resolve("twitter_handle", "cluster_other")
+        self.resolver.merge_entities(a.entity_id, b.entity_id, reason="dedupe")
+        self.resolver.merge_entities(b.entity_id, c.entity_id, reason="dedupe")
+
+        self.assertEqual(
+            self.store.list_cluster_entity_ids(a.entity_id),
+            sorted([a.entity_id, b.entity_id, c.entity_id]),
+        )
+        for member in (a.entity_id, b.entity_id, c.entity_id):
+            aliases = self.store.list_aliases_for_entity(member)
+            self.assertEqual(
+                [item["normalized_value"] for item in aliases],
+                ["cluster_a", "cluster_b", "cluster_c"],
+            )
+            records = self.store.list_identifier_records_for_entity(member)
+            self.assertEqual(len(records), 3)
+        self.assertEqual(
+            [item["normalized_value"] for item in self.store.iter_identifiers_for_entity(other.entity_id)],
+            ["cluster_other"],
+        )
+
+    def test_alias_lookup_cost_is_independent_of_store_size(self) -> None:
+        target = self.resolver.resolve("twitter_handle", "scaling_target")
+        self.resolver.add_alias(target.entity_id, "email", "scaling@example.com")
+
+        def lookup() -> None:
+            list(self.store.iter_identifiers_for_entity(target.entity_id))
+            self.store.list_aliases_for_entity(target.entity_id)
+            self.store.list_identifier_records_for_entity(target.entity_id)
+
+        small = self._count_statements(lookup)
+        for i in range(50):
+            self.resolver.resolve("twitter_handle", f"filler_{i}")
+        large = self._count_statements(lookup)
+        self.assertEqual(small, large)
+
+    def test_merge_chains_are_flattened_to_single_hops(self) -> None:
+        ids = [self.resolver.resolve("twitter_handle", f"chain_{i}").entity_id for i in range(5)]
+        for current, following in zip(ids, ids[1:]):
+            self.resolver.merge_entities(current, following, reason="chain")
+
+        root = ids[-1]
+        for entity_id in ids[:-1]:
+            self.assertEqual(self.store.get_redirect_target(entity_id), root)
+        self.assertEqual(self.store.get_redirect_origin(ids[0]), ids[1])
+        self.assertEqual(self.store.canonical_entity_id(ids[0]), root)
+
+    def test_canonical_cache_reports_hits_and_invalidates_on_redirect_removal(self) -> None:
+        self._reopen_with_canonical_cache()
+        a = self.resolver.resolve("twitter_handle", "cache_a")
+        b = self.resolver.resolve("twitter_handle", "cache_b")
+        self.resolver.merge_entities(a.entity_id, b.entity_id, reason="dedupe")
+
+        before = self.store.canonical_cache_stats()
+        self.assertEqual(self.store.canonical_entity_id(a.entity_id), b.entity_id)
+        after = self.store.canonical_cache_stats()
+        self.assertEqual(after["hits"], before["hits"] + 1)
+        self.assertGreater(after["hit_rate"], 0.0)
+
+        self.store.remove_redirect(a.entity_id)
+        self.assertEqual(self.store.canonical_entity_id(a.entity_id), a.entity_id)
+        self.assertEqual(self.store.canonical_cache_stats()["invalidations"], 1)
+
+    def test_undo_merge_after_transitive_merge(self) -> None:
+        a = self.resolver.resolve("twitter_handle", "undo_chain_a")
+        b = self.resolver.resolve("twitter_handle", "undo_chain_b")
+        c = self.resolver.resolve("twitter_handle", "undo_chain_c")
+        self.resolver.merge_entities(a.entity_id, b.entity_id, reason="dedupe")
+        self.resolver.merge_entities(b.entity_id, c.entity_id, reason="dedupe")
+
+        self.resolver.undo_merge(a.entity_id, b.entity_id)
+        for handle in ("undo_chain_a", "undo_chain_b", "undo_chain_c"):
+            self.assertEqual(self.resolver.resolve("twitter_handle", handle).entity_id, a.entity_id)
+
+    def test_canonical_cache_sees_merges_from_other_connections(self) -> None:
+        cached = SQLiteEntityStore(self.db_path, canonical_cache=True)
+        try:
+            e1, e2, e3 = [self.resolver.resolve("email", f"shared{i}@example.com").entity_id for i in range(3)]
+            self.assertEqual(cached.canonical_entity_id(e1), e1)
+            invalidations = cached.canonical_cache_stats()["invalidations"]
+            self.store.merge_entities(e1, e2, reason="dedupe", caused_by="other-connection")
+            # A stale cached root would overwrite the other connection's e1 -> e2 redirect and split the cluster.
+            cached.merge_entities(e1, e3, reason="dedupe", caused_by="cached-connection")
+            for store in (cached, self.store):
+                self.assertEqual({store.canonical_entity_id(entity_id) for entity_id in (e1, e2, e3)}, {e3})
+            self.assertEqual(cached.canonical_cache_stats()["invalidations"], invalidations + 1)
+        finally:
+            cached.close()
+
+    def test_uncached_store_matches_cached_results(self) -> None:
+        self._reopen_with_canonical_cache()
+        uncached = SQLiteEntityStore(self.db_path)
+        try:
+            a = self.resolver.resolve("twitter_handle", "nocache_a")
+            b = self.resolver.resolve("twitter_handle", "nocache_b")
+            self.resolver.merge_entities(a.entity_id, b.entity_id, reason="dedupe")
+            self.assertEqual(uncached.canonical_entity_id(a.entity_id), b.entity_id)
+            self.assertEqual(uncached.canonical_cache_stats()["size"], 0)
+        finally:
+            uncached.close()
+
+    def test_identifier_upsert_keeps_max_confidence_and_provenance(self) -> None:
+        self.store.upsert_identifier("email", "A@example.com", "a@example.com", 0.9, "feed-a")
+        self.store.conn.execute(
+            "UPDATE identifiers SET first_seen_at = '2000-01-01T00:00:00+00:00', last_seen_at = '2000-01-01T00:00:00+00:00' WHERE normalized_value = 'a@example.com'"
+        )
+        self.store.upsert_identifier("email", "a@example.com", "a@example.com", 0.4, None)
+        self.store.upsert_identifier("email", "a@Example.com", "a@example.com", 0.5, "")
+
+        row = self.store.get_identifier("email", "a@example.com")
+        self.assertEqual(row["value"], "a@Example.com")
+        self.assertEqual(row["confidence"], 0.9)
+        self.assertEqual(row["provenance"], "feed-a")
+        self.assertNotEqual(row["last_seen_at"], "2000-01-01T00:00:00+00:00")
+        self.assertEqual(row["first_seen_at"], "2000-01-01T00:00:00+00:00")
+
+    def test_upserts_issue_one_statement_inside_a_transaction(self) -> None:
+        # The canonical cache answers the alias target's lookup without a query.
+        self._reopen_with_canonical_cache()
+        entity_id = self.store.create_entity("person")
+        with self.store.transaction():
+            identifier_writes = self._count_statements(
+                lambda: self.store.upsert_identifier("email", "b@example.com", "b@example.com", 0.9, None)
+            )
+            alias_writes = self._count_statements(
+                lambda: self.store.add_alias("email", "b@example.com", entity_id, 0.9, "test")
+            )
+        self.assertEqual(identifier_writes, 1)
+        self.assertEqual(alias_writes, 1)
+
+    def test_add_alias_existing_mapping_updates_or_reports_conflict(self) -> None:
+        first = self.store.create_entity("person")
+        second = self.store.create_entity("person")
+        self.assertEqual(self.store.add_alias("email", "c@example.com", first, 0.6, "test", "feed"), (True, None))
+        self.assertEqual(self.store.add_alias("email", "c@example.com", first, 0.8, "test"), (False, None))
+        self.assertEqual(self.store.add_alias("email", "c@example.com", second, 0.99, "test"), (False, first))
+
+        alias = self.store.find_alias("email", "c@example.com")
+        self.assertEqual(alias["confidence"], 0.8)
+        self.assertEqual(alias["provenance"], "feed")
+
+
+if __name__ == "__main__":
+    unittest.main()
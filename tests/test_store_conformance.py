@@ -0,0 +1,304 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from metaspn_entities import (
+    EntityResolver,
+    EntityStore,
+    InMemoryEntityStore,
+    ShardedEntityStore,
+    SQLiteEntityStore,
+    attribute_season_reward,
+    canonical_lineage_snapshot,
+    resolve_player_wallet,
+    resolve_token_entity,
+)
+
+
+class StoreConformanceMixin:
+    """Behaviour every store backend must share; subclasses provide ``make_store``."""
+
+    def make_store(self):
+        raise NotImplementedError
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.store = self.make_store()
+        self.resolver = EntityResolver(self.store)
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.tempdir.cleanup()
+
+    def test_store_implements_protocol(self) -> None:
+        self.assertIsInstance(self.store, EntityStore)
+
+    def test_resolve_reuses_entity_and_keeps_max_confidence(self) -> None:
+        first = self.resolver.resolve("email", "Same@Example.com", context={"confidence": 0.7})
+        second = self.resolver.resolve("email", "same@example.com", context={"confidence": 0.4})
+        self.assertTrue(first.created_new_entity)
+        self.assertEqual(first.entity_id, second.entity_id)
+        self.assertFalse(second.created_new_entity)
+        identifier = self.store.get_identifier("email", "same@example.com")
+        self.assertEqual(identifier["confidence"], 0.7)
+        self.assertEqual(identifier["value"], "same@example.com")
+
+    def test_upsert_keeps_last_non_empty_provenance(self) -> None:
+        self.store.upsert_identifier("email", "p@example.com", "p@example.com", 0.5, "crm")
+        self.store.upsert_identifier("email", "p@example.com", "p@example.com", 0.9, None)
+        self.store.upsert_identifier("email", "p@example.com", "p@example.com", 0.1, "")
+        row = self.store.get_identifier("email", "p@example.com")
+        self.assertEqual((row["confidence"], row["provenance"]), (0.9, "crm"))
+        state = self.store.upsert_identifiers([("email", "P@example.com", "p@example.com", 0.2, "import")])
+        self.assertEqual(state[("email", "p@example.com")]["provenance"], "import")
+        self.assertEqual(state[("email", "p@example.com")]["value"], "P@example.com")
+
+    def test_add_alias_reports_conflicts(self) -> None:
+        a = self.store.create_entity("person")
+        b = self.store.create_entity("person")
+        self.assertEqual(self.store.add_alias("email", "x@example.com", a, 0.5, "test"), (True, None))
+        self.assertEqual(self.store.add_alias("email", "x@example.com", a, 0.8, "test"), (False, None))
+        self.assertEqual(self.store.find_alias("email", "x@example.com")["confidence"], 0.8)
+        self.assertEqual(self.store.add_alias("email", "x@example.com", b, 0.5, "test"), (False, a))
+
+    def test_auto_merge_and_cluster_reads(self) -> None:
+        a = self.resolver.resolve("twitter_handle", "owner_a")
+        b = self.resolver.resolve("twitter_handle", "owner_b")
+        self.resolver.add_alias(a.entity_id, "email", "shared@example.com")
+        events = self.resolver.add_alias(b.entity_id, "email", "shared@example.com")
+        self.assertEqual([event.event_type for event in events], ["EntityMerged"])
+
+        canonical = self.store.canonical_entity_id(a.entity_id)
+        self.assertEqual(canonical, self.store.canonical_entity_id(b.entity_id))
+        self.assertEqual(self.store.list_cluster_entity_ids(b.entity_id), sorted([a.entity_id, b.entity_id]))
+        self.assertEqual(
+            [row["normalized_value"] for row in self.store.list_aliases_for_entity(a.entity_id)],
+            ["shared@example.com", "owner_a", "owner_b"],
+        )
+        self.assertEqual(len(self.store.list_identifier_records_for_entity(b.entity_id)), 3)
+        self.assertEqual(self.store.get_entity(b.entity_id)["status"], "merged")
+
+    def test_merge_flattening_and_transitive_undo(self) -> None:
+        a = self.resolver.resolve("twitter_handle", "chain_a").entity_id
+        b = self.resolver.resolve("twitter_handle", "chain_b").entity_id
+        c = self.resolver.resolve("twitter_handle", "chain_c").entity_id
+        self.resolver.merge_entities(a, b, reason="dedupe")
+        self.resolver.merge_entities(b, c, reason="dedupe")
+        self.assertEqual(self.store.get_redirect_target(a), c)
+        self.assertEqual(self.store.get_redirect_origin(a), b)
+        self.assertIsNone(self.store.get_redirect_origin(c))
+        with self.assertRaises(ValueError):
+            self.store.merge_entities(a, c, "again", "test")
+
+        self.resolver.undo_merge(a, b)
+        self.assertEqual(self.resolver.resolve("twitter_handle", "chain_a").entity_id, a)
+        self.assertEqual(self.resolver.resolve("twitter_handle", "chain_c").entity_id, a)
+        self.assertEqual([row["merge_id"] for row in self.resolver.merge_history()], [1, 2, 3])
+
+    def test_filtered_merge_history_and_lineage(self) -> None:
+        a, b, c, d, e, unrelated, other = (self.store.create_entity("person") for _ in range(7))
+        self.resolver.merge_entities(a, b, reason="ab")
+        self.resolver.merge_entities(c, b, reason="cb")
+        self.resolver.merge_entities(b, d, reason="bd")
+        self.resolver.merge_entities(unrelated, other, reason="elsewhere")
+        self.resolver.merge_entities(e, d, reason="ed")
+
+        reasons = lambda records: [record["reason"] for record in records]
+        self.assertEqual(reasons(self.resolver.merge_history([b])), ["ab", "cb", "bd"])
+        self.assertEqual(reasons(self.resolver.merge_history([a, other])), ["ab", "elsewhere"])
+        self.assertEqual(reasons(self.resolver.merge_history([])), [])
+        self.assertEqual(len(self.resolver.merge_history()), 5)
+        self.assertEqual(reasons(self.resolver.merge_lineage(d)), ["ab", "cb", "bd", "ed"])
+        self.assertEqual(reasons(self.resolver.merge_lineage(b)), ["ab", "cb"])
+        self.assertEqual(self.resolver.merge_lineage(a), [])
+
+        lineage = canonical_lineage_snapshot(self.resolver, a)
+        self.assertEqual(lineage["redirect_chain"], [a, b, d])
+        self.assertEqual(reasons(lineage["merges"]), ["ab", "cb", "bd", "ed"])
+
+    def test_reassign_aliases(self) -> None:
+        a = self.resolver.resolve("twitter_handle", "move_a").entity_id
+        b = self.store.create_entity("person")
+        self.store.reassign_aliases(a, b)
+        self.assertEqual(self.store.find_alias("twitter_handle", "move_a")["entity_id"], b)
+        self.assertEqual(self.store.list_aliases_for_entity(a), [])
+        self.assertEqual(len(self.store.list_aliases_for_entity(b)), 1)
+
+    def test_failed_transaction_rolls_back(self) -> None:
+        kept = self.resolver.resolve("twitter_handle", "kept")
+        with self.assertRaises(RuntimeError):
+            with self.resolver.transaction():
+                other = self.resolver.resolve("twitter_handle", "discarded")
+                self.resolver.merge_entities(other.entity_id, kept.entity_id, reason="dedupe")
+                raise RuntimeError("boom")
+        self.assertIsNone(self.store.find_alias("twitter_handle", "discarded"))
+        self.assertIsNone(self.store.get_identifier("twitter_handle", "discarded"))
+        self.assertEqual(self.resolver.merge_history(), [])
+        self.assertEqual(self.store.list_cluster_entity_ids(kept.entity_id), [kept.entity_id])
+        self.assertEqual(self.resolver.drain_events()[-1].payload["entity_id"], kept.entity_id)
+
+    def test_inner_failure_only_rolls_back_savepoint(self) -> None:
+        with self.store.transaction():
+            outer = self.store.create_entity("person")
+            with self.assertRaises(RuntimeError):
+                with self.store.transaction():
+                    self.store.add_alias("email", "inner@example.com", outer, 0.5, "test")
+                    raise RuntimeError("boom")
+            self.store.add_alias("email", "outer@example.com", outer, 0.5, "test")
+        self.assertIsNone(self.store.find_alias("email", "inner@example.com"))
+        self.assertEqual(self.store.find_alias("email", "outer@example.com")["entity_id"], outer)
+
+    def test_resolve_many_matches_sequential_resolves(self) -> None:
+        existing = self.resolver.resolve("twitter_handle", "batch_existing")
+        results = self.resolver.resolve_many(
+            [
+                ("twitter_handle", "batch_existing", None),
+                ("twitter_handle", "batch_new", None),
+                ("twitter_handle", "@BATCH_NEW", None),
+            ]
+        )
+        self.assertEqual(results[0].entity_id, existing.entity_id)
+        self.assertTrue(results[1].created_new_entity)
+        self.assertEqual(results[1].entity_id, results[2].entity_id)
+        self.assertFalse(results[2].created_new_entity)
+        self.assertEqual(
+            set(self.store.find_aliases([("twitter_handle", "batch_new"), ("twitter_handle", "missing")])),
+            {("twitter_handle", "batch_new")},
+        )
+
+    def test_season_and_token_helpers(self) -> None:
+        old = resolve_player_wallet(self.resolver, wallet="0xOLD", chain="eth")
+        new = resolve_player_wallet(self.resolver, wallet="0xNEW", chain="eth")
+        token = resolve_token_entity(self.resolver, chain="eth", contract_address="0xtoken")
+        self.assertNotEqual(new.entity_id, token.entity_id)
+        self.resolver.merge_entities(old.entity_id, new.entity_id, reason="player dedupe")
+
+        reward = attribute_season_reward(self.resolver, {"chain": "ETH", "player_wallet": "0xold"})
+        self.assertEqual(reward.entity_id, new.entity_id)
+        lineage = canonical_lineage_snapshot(self.resolver, old.entity_id)
+        self.assertEqual(lineage["canonical_entity_id"], new.entity_id)
+        self.assertEqual(lineage["redirect_chain"], [old.entity_id, new.entity_id])
+
+    def test_snapshot_round_trip_through_both_formats(self) -> None:
+        a = self.resolver.resolve("twitter_handle", "snap_a")
+        b = self.resolver.resolve("twitter_handle", "snap_b")
+        self.resolver.merge_entities(a.entity_id, b.entity_id, reason="dedupe")
+        for name in ("snapshot.json", "snapshot.ndjson.gz"):
+            path = str(Path(self.tempdir.name) / name)
+            if name.endswith(".json"):
+                self.store.export_snapshot(path)
+            else:
+                self.store.export_snapshot_stream(path)
+            restored = self.make_store()
+            try:
+                counts = restored.import_snapshot(path)
+                self.assertEqual(counts["merge_records"], 1)
+                self.assertEqual(list(restored.iter_snapshot_rows()), list(self.store.iter_snapshot_rows()))
+                self.assertEqual(restored.canonical_entity_id(a.entity_id), b.entity_id)
+                with self.assertRaises(ValueError):
+                    restored.import_snapshot(path)
+            finally:
+                restored.close()
+
+
+class SQLiteStoreConformanceTests(StoreConformanceMixin, unittest.TestCase):
+    def make_store(self):
+        self.store_count = getattr(self, "store_count", 0) + 1
+        return SQLiteEntityStore(str(Path(self.tempdir.name) / f"entities_{self.store_count}.db"))
+
+
+class CachedSQLiteStoreConformanceTests(StoreConformanceMixin, unittest.TestCase):
+    def make_store(self):
+        self.store_count = getattr(self, "store_count", 0) + 1
+        return SQLiteEntityStore(
+            str(Path(self.tempdir.name) / f"cached_{self.store_count}.db"),
+            row_cache_size=128,
+            alias_filter=True,
+        )
+
+
+class IntegerKeySQLiteStoreConformanceTests(StoreConformanceMixin, unittest.TestCase):
+    def make_store(self):
+        self.store_count = getattr(self, "store_count", 0) + 1
+        return SQLiteEntityStore(
+            str(Path(self.tempdir.name) / f"integer_keys_{self.store_count}.db"),
+            integer_keys=True,
+            row_cache_size=128,
+            alias_filter=True,
+        )
+
+
+class EpochTimestampSQLiteStoreConformanceTests(StoreConformanceMixin, unittest.TestCase):
+    def make_store(self):
+        self.store_count = getattr(self, "store_count", 0) + 1
+        return SQLiteEntityStore(
+            str(Path(self.tempdir.name) / f"epoch_{self.store_count}.db"),
+            epoch_timestamps=True,
+        )
+
+
+class InMemoryStoreConformanceTests(StoreConformanceMixin, unittest.TestCase):
+    def make_store(self):
+        return InMemoryEntityStore()
+
+
+class ShardedStoreConformanceTests(StoreConformanceMixin, unittest.TestCase):
+    def make_store(self):
+        self.store_count = getattr(self, "store_count", 0) + 1
+        return ShardedEntityStore(str(Path(self.tempdir.name) / f"sharded_{self.store_count}"), shard_count=3)
+
+
+class InMemorySQLiteSyncTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tempdir.name) / "entities.db")
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def test_flush_to_and_load_from_sqlite(self) -> None:
+        memory = InMemoryEntityStore()
+        resolver = EntityResolver(memory)
+        a = resolver.resolve("twitter_handle", "sync_a")
+        b = resolver.resolve("twitter_handle", "sync_b")
+        resolver.add_alias(a.entity_id, "email", "sync@example.com")
+        resolver.merge_entities(a.entity_id, b.entity_id, reason="dedupe")
+
+        sqlite_store = SQLiteEntityStore(self.db_path)
+        try:
+            counts = memory.flush_to(sqlite_store)
+            self.assertEqual(counts["aliases"], 3)
+            self.assertEqual(list(sqlite_store.iter_snapshot_rows()), list(memory.iter_snapshot_rows()))
+            self.assertEqual(
+                EntityResolver(sqlite_store).resolve("email", "sync@example.com").entity_id, b.entity_id
+            )
+
+            reloaded = InMemoryEntityStore.load_from(sqlite_store)
+            self.assertEqual(list(reloaded.iter_snapshot_rows()), list(sqlite_store.iter_snapshot_rows()))
+            next_merge = reloaded.merge_entities(b.entity_id, reloaded.create_entity("person"), "later", "test")
+            self.assertEqual(next_merge, 2)
+        finally:
+            sqlite_store.close()
+
+    def test_bulk_load_into_an_empty_store_journals_one_undo_entry(self) -> None:
+        source = InMemoryEntityStore()
+        resolver = EntityResolver(source)
+        ids = [resolver.resolve("email", f"bulk{i}@example.com").entity_id for i in range(300)]
+        resolver.merge_entities(ids[0], ids[1], reason="dedupe")
+        rows = list(source.iter_snapshot_rows())
+
+        memory = InMemoryEntityStore()
+        with self.assertRaises(RuntimeError):
+            with memory.transaction():
+                memory.load_snapshot_rows(iter(rows), chunk_size=50)
+                self.assertEqual(len(memory._journal), 1)
+                self.assertEqual(memory.canonical_entity_id(ids[0]), ids[1])
+                raise RuntimeError("abort load")
+        self.assertEqual(list(memory.iter_snapshot_rows()), [])
+        memory.load_snapshot_rows(rows)
+        self.assertEqual(list(memory.iter_snapshot_rows()), rows)
+        self.assertEqual(memory.merge_entities(ids[2], ids[3], "later", "test"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+from metaspn_entities.context import _parse_iso
+from metaspn_entities.migrations import migrate_to_integer_keys
+from metaspn_entities.models import epoch_to_iso, frozen_clock, iso_to_epoch, utcnow_iso
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+PINNED = 1_767_225_600  # 2026-01-01T00:00:00+00:00
+
+
+class ClockTests(unittest.TestCase):
+    def test_frozen_clock_pins_nested_reads(self) -> None:
+        with frozen_clock(PINNED) as outer:
+            self.assertEqual(outer, PINNED)
+            with frozen_clock() as inner:
+                self.assertEqual(inner, PINNED)
+            self.assertEqual(utcnow_iso(), "2026-01-01T00:00:00+00:00")
+        self.assertNotEqual(utcnow_iso(), "2026-01-01T00:00:00+00:00")
+
+    def test_iso_and_epoch_round_trip(self) -> None:
+        self.assertEqual(iso_to_epoch(epoch_to_iso(PINNED)), PINNED)
+        self.assertEqual(iso_to_epoch("2026-01-01T00:00:00Z"), PINNED)
+        self.assertEqual(iso_to_epoch("2026-01-01T00:00:00"), PINNED)
+
+    def test_context_parses_epoch_and_iso_values(self) -> None:
+        expected = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.assertEqual(_parse_iso(PINNED), expected)
+        self.assertEqual(_parse_iso("2026-01-01T00:00:00Z"), expected)
+        self.assertIsNone(_parse_iso("not a timestamp"))
+
+    def test_resolver_batch_shares_one_timestamp(self) -> None:
+        resolver = EntityResolver(SQLiteEntityStore())
+        with frozen_clock(PINNED):
+            resolution = resolver.resolve("email", "clock@example.com")
+        expected = "2026-01-01T00:00:00+00:00"
+        self.assertEqual(resolver.store.get_entity(resolution.entity_id)["created_at"], expected)
+        self.assertEqual(resolver.store.get_identifier("email", "clock@example.com")["last_seen_at"], expected)
+        stamps = {value for event in resolver.drain_events() for key, value in event.payload.items() if key.endswith("_at")}
+        self.assertEqual(stamps, {expected})
+
+
+class EpochTimestampStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tempdir.name) / "entities.db")
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _populate(self, store: SQLiteEntityStore) -> str:
+        resolver = EntityResolver(store)
+        with frozen_clock(PINNED):
+            a = resolver.resolve("twitter_handle", "epoch").entity_id
+            b = resolver.resolve("email", "epoch@example.com").entity_id
+            resolver.merge_entities(b, a, reason="same person")
+        return a
+
+    def test_integers_on_disk_iso_at_the_api(self) -> None:
+        store = SQLiteEntityStore(self.db_path, epoch_timestamps=True)
+        try:
+            entity_id = self._populate(store)
+            raw_types = store.conn.execute(
+                "SELECT typeof(created_at), typeof(last_seen_at) FROM entities, identifiers LIMIT 1"
+            ).fetchone()
+            self.assertEqual(tuple(raw_types), ("integer", "integer"))
+            self.assertEqual(store.get_entity(entity_id)["created_at"], "2026-01-01T00:00:00+00:00")
+            self.assertEqual(store.list_merge_history()[0]["timestamp"], "2026-01-01T00:00:00+00:00")
+            rows = [row for table, row in store.iter_snapshot_rows() if table == "identifiers"]
+            self.assertEqual({row["first_seen_at"] for row in rows}, {"2026-01-01T00:00:00+00:00"})
+            # Conversion is per store connection: other connections, even with PARSE_DECLTYPES, see raw integers.
+            plain = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+            self.assertEqual(plain.execute("SELECT created_at FROM entities LIMIT 1").fetchone()[0], PINNED)
+            plain.close()
+        finally:
+            store.close()
+
+        reopened = SQLiteEntityStore(self.db_path)
+        try:
+            self.assertTrue(reopened.epoch_timestamps)
+        finally:
+            reopened.close()
+        with self.assertRaises(ValueError):
+            SQLiteEntityStore(self.db_path, epoch_timestamps=False)
+
+    def test_iso_snapshot_restores_into_epoch_store(self) -> None:
+        source = SQLiteEntityStore(self.db_path)
+        entity_id = self._populate(source)
+        snapshot = str(Path(self.tempdir.name) / "snapshot.ndjson")
+        source.export_snapshot_stream(snapshot)
+        expected = sorted(map(repr, source.iter_snapshot_rows()))
+        source.close()
+
+        restored = SQLiteEntityStore(str(Path(self.tempdir.name) / "restored.db"), epoch_timestamps=True)
+        try:
+            restored.import_snapshot(snapshot)
+            self.assertEqual(sorted(map(repr, restored.iter_snapshot_rows())), expected)
+            self.assertEqual(restored.conn.execute("SELECT typeof(created_at) FROM entities").fetchone()[0], "integer")
+            self.assertEqual(restored.canonical_entity_id(entity_id), entity_id)
+        finally:
+            restored.close()
+
+    def test_integer_key_migration_keeps_epoch_columns(self) -> None:
+        store = SQLiteEntityStore(self.db_path, epoch_timestamps=True)
+        entity_id = self._populate(store)
+        store.close()
+        migrate_to_integer_keys(self.db_path)
+
+        store = SQLiteEntityStore(self.db_path)
+        try:
+            self.assertTrue(store.integer_keys and store.epoch_timestamps)
+            self.assertEqual(store.find_alias("twitter_handle", "epoch")["created_at"], "2026-01-01T00:00:00+00:00")
+            self.assertEqual(store.get_entity(entity_id)["created_at"], "2026-01-01T00:00:00+00:00")
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
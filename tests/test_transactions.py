@@ -0,0 +1,97 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from metaspn_entities.adapter import resolve_normalized_social_signal
+from metaspn_entities.resolver import EntityResolver
+from metaspn_entities.sqlite_backend import SQLiteEntityStore
+
+
+class TransactionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tempdir.name) / "entities.db")
+        self.store = SQLiteEntityStore(self.db_path)
+        self.resolver = EntityResolver(self.store)
+        self.statements = []
+        self.store.conn.set_trace_callback(self.statements.append)
+
+    def tearDown(self) -> None:
+        self.store.conn.set_trace_callback(None)
+        self.store.close()
+        self.tempdir.cleanup()
+
+    def _commit_count(self) -> int:
+        return sum(1 for sql in self.statements if sql.strip().upper() == "COMMIT")
+
+    def _entity_count(self) -> int:
+        return int(self.store.conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0])
+
+    def test_resolve_commits_once(self) -> None:
+        self.resolver.resolve("twitter_handle", "single_commit")
+        self.assertEqual(self._commit_count(), 1)
+
+    def test_adapter_signal_commits_once(self) -> None:
+        signal = {
+            "source": "social.ingest",
+            "payload": {
+                "platform": "twitter",
+                "email": "batch@example.com",
+                "author_handle": "batch_author",
+                "profile_url": "https://example.com/batch_author",
+                "domain": "example.com",
+                "display_name": "Batch Author",
+            },
+        }
+        resolve_normalized_social_signal(self.resolver, signal)
+        self.assertEqual(self._commit_count(), 1)
+
+    def test_batched_resolutions_share_one_commit(self) -> None:
+        with self.resolver.transaction():
+            for i in range(10):
+                self.resolver.resolve("twitter_handle", f"batched_{i}")
+        self.assertEqual(self._commit_count(), 1)
+        self.assertEqual(self._entity_count(), 10)
+
+    def test_failed_batch_rolls_back_writes_and_events(self) -> None:
+        self.resolver.resolve("twitter_handle", "kept")
+        self.resolver.drain_events()
+
+        with self.assertRaises(RuntimeError):
+            with self.resolver.transaction():
+                self.resolver.resolve("twitter_handle", "discarded")
+                raise RuntimeError("abort batch")
+
+        self.assertEqual(self._entity_count(), 1)
+        self.assertIsNone(self.store.find_alias("twitter_handle", "discarded"))
+        self.assertEqual(self.resolver.drain_events(), [])
+
+    def test_merge_failure_mid_way_leaves_no_partial_state(self) -> None:
+        a = self.resolver.resolve("twitter_handle", "partial_a")
+        b = self.resolver.resolve("twitter_handle", "partial_b")
+        self.store.conn.execute(
+            "CREATE TRIGGER fail_merge BEFORE INSERT ON merge_records BEGIN SELECT RAISE(ABORT, 'boom'); END"
+        )
+
+        with self.assertRaises(Exception):
+            self.resolver.merge_entities(a.entity_id, b.entity_id, reason="dedupe")
+
+        self.assertIsNone(self.store.get_redirect_target(a.entity_id))
+        self.assertEqual(self.store.get_entity(a.entity_id)["status"], "active")
+        self.assertEqual(self.store.canonical_entity_id(a.entity_id), a.entity_id)
+
+    def test_inner_failure_only_rolls_back_savepoint(self) -> None:
+        with self.resolver.transaction():
+            self.resolver.resolve("twitter_handle", "outer_kept")
+            with self.assertRaises(RuntimeError):
+                with self.resolver.transaction():
+                    self.resolver.resolve("twitter_handle", "inner_discarded")
+                    raise RuntimeError("abort inner")
+
+        self.assertIsNotNone(self.store.find_alias("twitter_handle", "outer_kept"))
+        self.assertIsNone(self.store.find_alias("twitter_handle", "inner_discarded"))
+        self.assertEqual(self._commit_count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()